@@ -0,0 +1,94 @@
+"""
+Export the TESS XGBoost classifier in XGBoost's native UBJ format.
+
+Usage (from the backend directory):
+    python -m app.cli.export_xgb [--model models/tess_xgb_improved_model.pkl]
+
+Writes <model>.ubj next to the pickled model, tagged with the pickle's
+version so the service only uses it while it matches. Before saving, the
+exported booster is checked against the sklearn wrapper's predict_proba on
+the TESS catalog and on random inputs; the command fails if they disagree.
+With TESS_XGB_ENGINE=native (the default) the service takes the booster out
+of the pickle at startup when no up-to-date export exists, so this is
+optional but keeps workers from unpickling the sklearn wrapper.
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from app.services.prediction.booster import NativeBooster
+from app.services.prediction.cache import model_file_version
+from app.services.prediction.features import TESS_FEATURE_SPEC
+
+TESS_CSV = os.path.join(
+    os.path.dirname(__file__), "../../../exo-model/data/TESS exoplanet data.csv"
+)
+TOLERANCE = 1e-6
+
+
+def check_rows(n_features: int, random_rows: int) -> npt.NDArray[np.float32]:
+    """Catalog rows (when the catalog is available) plus random inputs"""
+    features = TESS_FEATURE_SPEC.compile()
+    parts = []
+    if os.path.exists(TESS_CSV):
+        df = pd.read_csv(TESS_CSV).dropna(subset=list(features.base_columns))
+        parts.append(features.from_frame(df))
+    rng = np.random.default_rng(0)
+    scale = np.abs(parts[0]).max(axis=0) if parts else np.ones(n_features)
+    parts.append(
+        (rng.standard_normal((random_rows, n_features)) * scale).astype(np.float32)
+    )
+    return np.concatenate(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0] if __doc__ else None
+    )
+    parser.add_argument(
+        "--model", help="pickled XGBClassifier (default: the service's)"
+    )
+    parser.add_argument(
+        "--random-rows", type=int, default=10000, help="Random inputs to check"
+    )
+    args = parser.parse_args(argv)
+
+    if args.model:
+        model_path = args.model
+    else:
+        from app.services.prediction import tess_prediction_service
+
+        model_path = tess_prediction_service.model_path
+    output = os.path.splitext(model_path)[0] + ".ubj"
+
+    start = time.perf_counter()
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    booster = NativeBooster.from_sklearn(model)
+
+    X = check_rows(int(model.n_features_in_), args.random_rows)
+    expected = model.predict_proba(X)
+    actual = booster.predict_proba(X)
+    max_error = float(np.abs(expected - actual).max())
+    print(f"Checked {len(X)} rows: max |predict_proba difference| = {max_error:.3g}")
+    if max_error > TOLERANCE:
+        sys.exit(f"Exported booster does not match {model_path}; not saved")
+
+    booster.save(output, model_file_version(model_path))
+    print(
+        f"{booster.booster.num_boosted_rounds()} rounds, {len(booster.classes_)} "
+        f"classes, {os.path.getsize(output) / 1e6:.1f} MB -> {output}"
+    )
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
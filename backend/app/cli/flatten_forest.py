@@ -0,0 +1,92 @@
+"""
+Flatten the Kepler Random Forest into the arrays used by the flat engine.
+
+Usage (from the backend directory):
+    python -m app.cli.flatten_forest [--model models/rf_model.joblib]
+
+Writes <model>.flat.npz next to the sklearn model, tagged with the model
+file's version so the service only uses it while it matches. Before saving,
+the flattened forest is checked against sklearn's predict_proba on the
+Kepler catalog and on random inputs; the command fails if they disagree.
+With KEPLER_RF_ENGINE=flat (the default) the service flattens the model in
+memory at startup when no up-to-date file exists, so this is optional but
+keeps workers from loading sklearn until a batch is large enough to be
+scored by it (KEPLER_RF_SKLEARN_MIN_ROWS).
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from joblib import load
+
+from app.services.prediction.cache import model_file_version
+from app.services.prediction.features import KEPLER_FEATURE_SPEC
+from app.services.prediction.forest import FlatForest
+
+KEPLER_CSV = os.path.join(
+    os.path.dirname(__file__), "../../../exo-model/data/kepler_exoplanets.csv"
+)
+TOLERANCE = 1e-12
+
+
+def check_rows(n_features: int, random_rows: int) -> npt.NDArray[np.float32]:
+    """Catalog rows (when the catalog is available) plus random inputs"""
+    features = KEPLER_FEATURE_SPEC.compile()
+    parts = []
+    if os.path.exists(KEPLER_CSV):
+        df = pd.read_csv(KEPLER_CSV).dropna(subset=list(features.base_columns))
+        parts.append(features.from_frame(df))
+    rng = np.random.default_rng(0)
+    scale = np.abs(parts[0]).max(axis=0) if parts else np.ones(n_features)
+    parts.append(
+        (rng.standard_normal((random_rows, n_features)) * scale).astype(np.float32)
+    )
+    return np.concatenate(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0] if __doc__ else None
+    )
+    parser.add_argument("--model", help="sklearn forest (default: the service's)")
+    parser.add_argument(
+        "--random-rows", type=int, default=10000, help="Random inputs to check"
+    )
+    args = parser.parse_args(argv)
+
+    if args.model:
+        model_path = args.model
+    else:
+        from app.services.prediction import prediction_service
+
+        model_path = prediction_service.model_path
+    output = os.path.splitext(model_path)[0] + ".flat.npz"
+
+    start = time.perf_counter()
+    model = load(model_path)
+    forest = FlatForest.from_sklearn(model, model_file_version(model_path))
+
+    X = check_rows(forest.n_features, args.random_rows)
+    expected = model.predict_proba(X)
+    actual = forest.predict_proba(X)
+    max_error = float(np.abs(expected - actual).max())
+    print(f"Checked {len(X)} rows: max |predict_proba difference| = {max_error:.3g}")
+    if max_error > TOLERANCE:
+        sys.exit(f"Flattened forest does not match {model_path}; not saved")
+
+    forest.save(output)
+    print(
+        f"{forest.n_trees} trees, {len(forest.left)} nodes, "
+        f"{forest.nbytes / 1e6:.1f} MB of arrays -> {output}"
+    )
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
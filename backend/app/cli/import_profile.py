@@ -0,0 +1,122 @@
+"""
+Break down the import time of a module by the modules it imports.
+
+Usage (from the backend directory):
+    python -m app.cli.import_profile [app.main] [--top 25] [--by package]
+
+Imports the module in fresh interpreters with -X importtime and prints the
+costliest modules, or top-level packages, keeping each module's best time
+over --repeat runs. "self" is the time spent running a module's own body,
+"cumulative" adds everything imported while it ran. Modules executed
+through importlib (the k2(keppler).py files) are not imports, so their time
+shows up in the self time of the module that executes them.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# name -> (self us, cumulative us, nesting depth)
+Profile = Dict[str, Tuple[int, int, int]]
+
+
+def profile_import(module: str) -> Tuple[Profile, List[str]]:
+    """Per-module import times of `module` and the order they were imported in"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    profile: Profile = {}
+    order = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        profile[name] = (int(self_us), int(cumulative_us), depth)
+        order.append(name)
+    return profile, order
+
+
+def best_of(module: str, repeat: int) -> Tuple[Profile, List[str]]:
+    """Lowest time seen for every module over `repeat` imports"""
+    best, order = profile_import(module)
+    for _ in range(repeat - 1):
+        profile, _ = profile_import(module)
+        for name, (self_us, cumulative_us, depth) in profile.items():
+            if name in best:
+                old_self, old_cumulative, _ = best[name]
+                best[name] = (
+                    min(old_self, self_us),
+                    min(old_cumulative, cumulative_us),
+                    depth,
+                )
+    return best, order
+
+
+def by_package(profile: Profile) -> Dict[str, Tuple[int, int]]:
+    """Self time and module count per top-level package"""
+    packages: Dict[str, Tuple[int, int]] = {}
+    for name, (self_us, _, _) in profile.items():
+        package = name.split(".")[0]
+        total, count = packages.get(package, (0, 0))
+        packages[package] = (total + self_us, count + 1)
+    return packages
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0] if __doc__ else None
+    )
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=25, help="Rows to print")
+    parser.add_argument(
+        "--by",
+        choices=["module", "package"],
+        default="module",
+        help="Report modules, or self time summed per top-level package",
+    )
+    parser.add_argument(
+        "--sort",
+        choices=["self", "cumulative"],
+        default="cumulative",
+        help="Order of the module report",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Imports to run")
+    args = parser.parse_args(argv)
+
+    profile, order = best_of(args.module, max(args.repeat, 1))
+    total_us = profile[args.module][1] if args.module in profile else 0
+    print(
+        f"import {args.module}: {total_us / 1000:.0f} ms, {len(profile)} modules "
+        f"(best of {args.repeat})"
+    )
+
+    if args.by == "package":
+        packages = sorted(by_package(profile).items(), key=lambda p: -p[1][0])
+        print(f"{'self ms':>8s} {'share':>6s} {'modules':>8s}  package")
+        for package, (self_us, count) in packages[: args.top]:
+            share = self_us / total_us if total_us else 0.0
+            print(f"{self_us / 1000:8.1f} {share:6.1%} {count:8d}  {package}")
+        return
+
+    column = 0 if args.sort == "self" else 1
+    ranked = sorted(order, key=lambda name: -profile[name][column])
+    print(f"{'self ms':>8s} {'cum ms':>8s}  module")
+    for name in ranked[: args.top]:
+        self_us, cumulative_us, depth = profile[name]
+        print(
+            f"{self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {'  ' * depth}{name}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Move inline prediction payloads into the content-addressed prediction_inputs table.
+
+Usage (from the backend directory, DATABASE_URL pointing at the database):
+    python -m app.cli.migrate_inputs [--batch-size 5000]
+
+For each prediction table this adds the input_hash column (and on SQLite
+rebuilds the table so input_data becomes nullable), then backfills in
+batches: every legacy input_data payload is hashed exactly as the API does,
+stored once in prediction_inputs, and the row is pointed at it with its
+inline JSON cleared. Inputs stored as JSON by earlier versions are then
+repacked into the binary features column. Each batch commits on its own, so
+the migration can be interrupted and re-run safely.
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Connection, Engine, Table, bindparam, inspect, select, update
+from sqlmodel import SQLModel
+
+from app.models import (
+    PredictionInput,
+    PredictionRecord,
+    PredictionRequest,
+    TessPredictionRecord,
+    TessPredictionRequest,
+)
+from app.services.prediction.inputs import CURRENT_SCHEMAS, input_rows
+from app.utilities.db import get_sync_engine
+from app.utilities.sql import insert_ignore
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+# (mission, record model, request model used to canonicalize the payload)
+TABLES: List[Tuple[str, Any, Type[BaseModel]]] = [
+    ("kepler", PredictionRecord, PredictionRequest),
+    ("tess", TessPredictionRecord, TessPredictionRequest),
+]
+
+
+def _migrate_schema(engine: Engine, table: Table) -> None:
+    """Bring an existing prediction table up to the input_hash schema"""
+    columns = {c["name"]: c for c in inspect(engine).get_columns(table.name)}
+    if "input_hash" in columns and columns["input_data"]["nullable"]:
+        return
+
+    log.info(f"Migrating schema of {table.name}")
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            if "input_hash" not in columns:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN input_hash VARCHAR "
+                    "REFERENCES prediction_inputs (input_hash)"
+                )
+                conn.exec_driver_sql(
+                    f"CREATE INDEX ix_{table.name}_input_hash "
+                    f"ON {table.name} (input_hash)"
+                )
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table.name} ALTER COLUMN input_data DROP NOT NULL"
+            )
+        elif engine.dialect.name == "sqlite":
+            _rebuild_sqlite_table(conn, table, list(columns))
+        else:
+            raise NotImplementedError(
+                f"Schema migration is not supported on {engine.dialect.name}"
+            )
+
+
+def _rebuild_sqlite_table(
+    conn: Connection, table: Table, old_columns: List[str]
+) -> None:
+    """SQLite cannot change column nullability, so copy into a fresh table"""
+    legacy = f"{table.name}_legacy"
+    conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {legacy}")
+    # Index names are global in SQLite; drop the old ones before recreating
+    indexes = conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND tbl_name = ? AND sql IS NOT NULL",
+        (legacy,),
+    ).scalars()
+    for name in list(indexes):
+        conn.exec_driver_sql(f"DROP INDEX {name}")
+    table.create(conn)
+    shared = ", ".join(c.name for c in table.columns if c.name in old_columns)
+    conn.exec_driver_sql(
+        f"INSERT INTO {table.name} ({shared}) SELECT {shared} FROM {legacy}"
+    )
+    conn.exec_driver_sql(f"DROP TABLE {legacy}")
+
+
+def _backfill(
+    engine: Engine,
+    mission: str,
+    table: Table,
+    request_model: Type[BaseModel],
+    batch_size: int,
+) -> int:
+    """Hash and move legacy payloads into prediction_inputs, batch by batch"""
+    inputs_table = PredictionInput.__table__  # type: ignore[attr-defined]
+    pending = (
+        select(table.c.id, table.c.input_data)
+        .where(table.c.input_hash.is_(None), table.c.input_data.is_not(None))
+        .order_by(table.c.id)
+        .limit(batch_size)
+    )
+    point_at_input = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(input_hash=bindparam("row_hash"), input_data=None)
+    )
+
+    migrated = 0
+    while True:
+        with engine.begin() as conn:
+            batch = conn.execute(pending).all()
+            if not batch:
+                return migrated
+
+            requests = [
+                request_model.model_validate(json.loads(payload))
+                for _, payload in batch
+            ]
+            hashes, inputs = input_rows(mission, requests)
+            updates = [
+                {"row_id": row_id, "row_hash": key}
+                for (row_id, _), key in zip(batch, hashes)
+            ]
+
+            conn.execute(insert_ignore(engine.dialect.name, inputs_table), inputs)
+            conn.execute(point_at_input, updates)
+
+        migrated += len(batch)
+        log.info(f"{table.name}: moved {migrated} payloads to prediction_inputs")
+
+
+def _migrate_inputs_schema(engine: Engine) -> None:
+    """Add the packed feature columns to an existing prediction_inputs table"""
+    columns = {c["name"] for c in inspect(engine).get_columns("prediction_inputs")}
+    blob = "BYTEA" if engine.dialect.name == "postgresql" else "BLOB"
+    with engine.begin() as conn:
+        if "schema_id" not in columns:
+            log.info("Adding prediction_inputs.schema_id")
+            conn.exec_driver_sql(
+                "ALTER TABLE prediction_inputs ADD COLUMN schema_id INTEGER"
+            )
+        if "features" not in columns:
+            log.info("Adding prediction_inputs.features")
+            conn.exec_driver_sql(
+                f"ALTER TABLE prediction_inputs ADD COLUMN features {blob}"
+            )
+
+
+def _pack_inputs(
+    engine: Engine, mission: str, request_model: Type[BaseModel], batch_size: int
+) -> int:
+    """Repack JSON payloads in prediction_inputs into the binary features column"""
+    table = PredictionInput.__table__  # type: ignore[attr-defined]
+    schema = CURRENT_SCHEMAS[mission]
+    pending = (
+        select(table.c.input_hash, table.c.input_data)
+        .where(
+            table.c.mission == mission,
+            table.c.features.is_(None),
+            table.c.input_data.is_not(None),
+        )
+        .limit(batch_size)
+    )
+    pack = (
+        update(table)
+        .where(table.c.input_hash == bindparam("row_hash"))
+        .values(
+            schema_id=schema.schema_id,
+            features=bindparam("row_features"),
+            input_data=None,
+        )
+    )
+
+    packed = 0
+    while True:
+        with engine.begin() as conn:
+            batch = conn.execute(pending).all()
+            if not batch:
+                return packed
+            conn.execute(
+                pack,
+                [
+                    {
+                        "row_hash": key,
+                        "row_features": schema.pack(
+                            request_model.model_validate(json.loads(payload))
+                        ),
+                    }
+                    for key, payload in batch
+                ],
+            )
+
+        packed += len(batch)
+        log.info(f"prediction_inputs: packed {packed} {mission} payloads")
+
+
+def migrate(engine: Engine, batch_size: int = 5000) -> Dict[str, int]:
+    """Run the schema migration and backfill for every prediction table"""
+    # Creates prediction_inputs (and anything else missing) without touching data
+    SQLModel.metadata.create_all(engine, checkfirst=True)
+
+    _migrate_inputs_schema(engine)
+
+    results = {}
+    for mission, record_model, request_model in TABLES:
+        table = record_model.__table__
+        _migrate_schema(engine, table)
+        results[table.name] = _backfill(
+            engine, mission, table, request_model, batch_size
+        )
+        results[f"prediction_inputs ({mission})"] = _pack_inputs(
+            engine, mission, request_model, batch_size
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0] if __doc__ else None
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Rows migrated per transaction"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = migrate(get_sync_engine(), args.batch_size)
+    for name, count in results.items():
+        print(f"{name}: {count} rows backfilled")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Publish a model version in MODEL_DIR/manifest.json.
+
+Usage (from the backend directory):
+    python -m app.cli.publish_model kepler_rf rf_model_2025_11.joblib --version 2025.11
+    python -m app.cli.publish_model --list
+
+Copy the new file into MODEL_DIR first. The manifest records its path
+(relative to MODEL_DIR), version and SHA-256, and is replaced atomically.
+Running workers switch to the new version on their next manifest check
+(MODEL_CHECK_INTERVAL_SECONDS), or at once through POST /models/{name}/reload.
+Keep the previous file until no worker serves it.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.services.prediction.cache import file_checksum
+from app.services.prediction.registry import MANIFEST_FILE
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"models": {}}
+    with open(path) as f:
+        manifest: Dict[str, Any] = json.load(f)
+    return manifest
+
+
+def write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0] if __doc__ else None
+    )
+    parser.add_argument("name", nargs="?", help="Model name, e.g. kepler_rf")
+    parser.add_argument("file", nargs="?", help="Model file in MODEL_DIR")
+    parser.add_argument("--version", help="Version label to publish")
+    parser.add_argument("--list", action="store_true", help="Show the manifest")
+    parser.add_argument("--model-dir", default=settings.model_dir)
+    args = parser.parse_args(argv)
+
+    manifest_path = os.path.join(args.model_dir, MANIFEST_FILE)
+    manifest = read_manifest(manifest_path)
+    if args.list:
+        for name, spec in sorted(manifest["models"].items()):
+            print(f"{name}: {spec['version']} {spec['path']} {spec['sha256'][:16]}")
+        return
+    if not (args.name and args.file and args.version):
+        parser.error("name, file and --version are required to publish")
+
+    from app.services.prediction import register_models
+
+    names = register_models()
+    if args.name not in names:
+        sys.exit(f"Unknown model '{args.name}', expected one of {names}")
+    path = os.path.abspath(os.path.join(args.model_dir, args.file))
+    if not os.path.isfile(path):
+        sys.exit(f"{path} does not exist")
+
+    with open(path, "rb") as f:
+        checksum = file_checksum(f)
+    manifest["models"][args.name] = {
+        "path": os.path.relpath(path, args.model_dir),
+        "version": args.version,
+        "sha256": checksum,
+    }
+    write_manifest(manifest_path, manifest)
+    print(f"Published {args.name} {args.version} ({checksum[:16]}) -> {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
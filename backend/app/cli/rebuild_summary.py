@@ -0,0 +1,101 @@
+"""
+Create the prediction_summary table and history indexes, then rebuild the counts.
+
+Usage (from the backend directory, DATABASE_URL pointing at the database):
+    python -m app.cli.rebuild_summary
+
+The API keeps prediction_summary (history totals and the /stats counts per
+class, confidence bin and day) up to date as predictions are written and
+deleted; run this once after upgrading an existing database, after adding
+a summary dimension, or whenever the counts need to be recomputed from the
+prediction tables. A prediction_summary table with older columns (e.g. from
+before the all-users counts were sharded) is dropped and created again; it
+only holds counts derived from the prediction tables. Indexes missing
+from existing prediction tables are created as well (CONCURRENTLY on
+PostgreSQL so writes are not blocked).
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Engine, Table, func, inspect, select
+from sqlalchemy.schema import CreateIndex
+from sqlmodel import SQLModel
+
+from app.models import PredictionRecord, PredictionSummary, TessPredictionRecord
+from app.services.prediction.summary import rebuild_summary
+from app.utilities.db import get_sync_engine
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+TABLES: List[Tuple[str, Any]] = [
+    ("kepler", PredictionRecord),
+    ("tess", TessPredictionRecord),
+]
+
+
+def _create_indexes(engine: Engine, table: Table) -> None:
+    """Create the table's declared indexes that an older schema lacks"""
+    existing = {index["name"] for index in inspect(engine).get_indexes(table.name)}
+    missing = [index for index in table.indexes if index.name not in existing]
+    if not missing:
+        return
+
+    if engine.dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for index in missing:
+                log.info(f"Creating index {index.name} concurrently")
+                index.dialect_options["postgresql"]["concurrently"] = True
+                conn.execute(CreateIndex(index))
+    else:
+        with engine.begin() as conn:
+            for index in missing:
+                log.info(f"Creating index {index.name}")
+                index.create(conn)
+
+
+def _drop_outdated_summary(engine: Engine, table: Table) -> None:
+    """Drop the summary table if its columns are not the current ones"""
+    if not inspect(engine).has_table(table.name):
+        return
+    columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    if columns != set(table.columns.keys()):
+        log.info(f"Dropping {table.name}: its columns are out of date")
+        table.drop(engine)
+
+
+def rebuild(engine: Engine) -> Dict[str, int]:
+    """Rebuild the summary of every mission, returning its all-users total"""
+    summary_table: Table = PredictionSummary.__table__  # type: ignore[attr-defined]
+    _drop_outdated_summary(engine, summary_table)
+    SQLModel.metadata.create_all(engine, tables=[summary_table])
+
+    totals: Dict[str, int] = {}
+    for mission, model in TABLES:
+        table: Table = model.__table__
+        _create_indexes(engine, table)
+        with engine.begin() as conn:
+            rebuild_summary(conn, mission, table)
+            totals[mission] = conn.execute(
+                select(func.count()).select_from(table)
+            ).scalar_one()
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0] if __doc__ else None
+    )
+    parser.parse_args(argv)
+
+    start = time.perf_counter()
+    for mission, total in rebuild(get_sync_engine()).items():
+        print(f"{mission}: {total} predictions counted")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,99 @@ class Settings:
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
 
+    prediction_batch_max_size: int = int(
+        os.getenv("PREDICTION_BATCH_MAX_SIZE", "10000")
+    )
+
+    tess_upload_chunk_rows: int = int(os.getenv("TESS_UPLOAD_CHUNK_ROWS", "5000"))
+
+    # Micro-batching of concurrent single-row predictions
+    microbatch_enabled: bool = os.getenv("MICROBATCH_ENABLED", "true").lower() == "true"
+    microbatch_window_ms: float = float(os.getenv("MICROBATCH_WINDOW_MS", "2"))
+    microbatch_max_size: int = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+
+    # Executor that runs inference off the event loop: thread, process or inline
+    inference_executor: str = os.getenv("INFERENCE_EXECUTOR", "thread")
+    inference_max_workers: int = int(os.getenv("INFERENCE_MAX_WORKERS", "4"))
+    inference_model_concurrency: int = int(
+        os.getenv("INFERENCE_MODEL_CONCURRENCY", "4")
+    )
+    inference_max_queue: int = int(os.getenv("INFERENCE_MAX_QUEUE", "256"))
+
+    # Model files: MODEL_DIR holds the artifacts and manifest.json naming the
+    # active version of each; workers check it for changes this often
+    model_dir: str = os.path.abspath(
+        os.getenv("MODEL_DIR", os.path.join(os.path.dirname(__file__), "../models"))
+    )
+    model_check_interval_seconds: float = float(
+        os.getenv("MODEL_CHECK_INTERVAL_SECONDS", "10")
+    )
+
+    # Kepler RF inference engine: flat (NumPy arrays) or sklearn
+    kepler_rf_engine: str = os.getenv("KEPLER_RF_ENGINE", "flat").lower()
+    # With the flat engine, batches of at least this many rows are scored by
+    # the sklearn forest instead: flat is faster up to ~256 rows, sklearn
+    # from ~384 (benchmarks/kepler_rf_engine.py). 0 keeps every batch flat
+    kepler_rf_sklearn_min_rows: int = int(
+        os.getenv("KEPLER_RF_SKLEARN_MIN_ROWS", "320")
+    )
+
+    # TESS XGBoost inference: native (Booster in-place prediction) or sklearn,
+    # with the threads each prediction call may use
+    tess_xgb_engine: str = os.getenv("TESS_XGB_ENGINE", "native").lower()
+    tess_xgb_nthread: int = int(os.getenv("TESS_XGB_NTHREAD", "1"))
+
+    # Kepler ensemble mode: weight of each model (registry name=weight; a
+    # model weighted 0 runs in shadow) and the default latency budget, after
+    # which models that have not answered are left out of the result
+    ensemble_weights: str = os.getenv(
+        "ENSEMBLE_WEIGHTS", "kepler_rf=0.6,kepler_xgb=0.4,kepler_ann=0"
+    )
+    ensemble_budget_ms: float = float(os.getenv("ENSEMBLE_BUDGET_MS", "250"))
+
+    # Kepler cascade mode: KOIs the false positive flags leave within this
+    # distance of the 0.5 threshold are escalated to the model or ensemble
+    cascade_margin: float = float(os.getenv("CASCADE_MARGIN", "0.4"))
+    cascade_escalate_to: str = os.getenv("CASCADE_ESCALATE_TO", "model").lower()
+
+    # Cache of prediction results keyed by feature vector and model version
+    prediction_cache_enabled: bool = (
+        os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+    )
+    prediction_cache_max_entries: int = int(
+        os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000")
+    )
+    prediction_cache_ttl_seconds: float = float(
+        os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300")
+    )
+
+    # Write-behind persistence of single predictions (records flushed in batches)
+    write_behind_enabled: bool = (
+        os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    )
+    write_behind_max_size: int = int(os.getenv("WRITE_BEHIND_MAX_SIZE", "10000"))
+    write_behind_flush_rows: int = int(os.getenv("WRITE_BEHIND_FLUSH_ROWS", "500"))
+    write_behind_flush_interval_ms: float = float(
+        os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "50")
+    )
+    # A flush that fails for any reason but a rejected row (e.g. a dropped
+    # connection) is retried this many times, the delay doubling each time
+    write_behind_max_retries: int = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "5"))
+    write_behind_retry_backoff_ms: float = float(
+        os.getenv("WRITE_BEHIND_RETRY_BACKOFF_MS", "100")
+    )
+
+    # Rows each all-users prediction count is spread over, so concurrent
+    # prediction writes do not queue on one row lock
+    summary_shards: int = int(os.getenv("SUMMARY_SHARDS", "16"))
+
+    # Rows deleted per transaction by background purges of prediction history
+    purge_chunk_rows: int = int(os.getenv("PURGE_CHUNK_ROWS", "5000"))
+
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR under
+    # gunicorn to aggregate them across workers
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
     logging_level: str = os.getenv("LOGGING_LEVEL", "INFO")
     root_path: str = os.getenv("ROOT_PATH", "/")
 
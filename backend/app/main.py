@@ -1,9 +1,15 @@
-import time
 from typing import Any, Callable, TypeVar, Dict, AsyncGenerator
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response
+from fastapi.exception_handlers import (
+    http_exception_handler,
+    request_validation_exception_handler,
+)
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.config import settings
+from app.utilities import metrics
 from app.utilities.logger import logger
 from app.routes.auth.auth import router as auth_router
 from app.routes.prediction.prediction import router as prediction_router
@@ -16,12 +22,11 @@ ExoVision API
 log = logger()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-
-    log.info("Starting ExoVision API...")
-    await init_models()
-
+def load_models() -> None:
+    """
+    Load the prediction models unless this process already has them (e.g.
+    gunicorn loaded them in the master before forking the workers)
+    """
     # Preload the K2 Keppler prediction model
     try:
         from app.services.prediction import prediction_service
@@ -31,6 +36,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         log.error(f"Failed to load K2 Keppler prediction model during startup: {e}")
 
+    # Preload the other Kepler ensemble models
+    try:
+        from app.services.prediction import prediction_service
+
+        prediction_service.load_ensemble()
+    except Exception as e:
+        log.error(f"Failed to load the Kepler ensemble models during startup: {e}")
+
     # Preload the TESS prediction model
     try:
         from app.services.prediction import tess_prediction_service
@@ -40,11 +53,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         log.error(f"Failed to load TESS prediction model during startup: {e}")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+
+    log.info("Starting ExoVision API...")
+    await init_models()
+
+    load_models()
     log.info("Startup complete.")
 
     yield
 
     log.info("Shutting down ExoVision API...")
+    from app.services.prediction.executor import inference_executor
+    from app.services.prediction.purge import purge_manager
+    from app.services.prediction.write_behind import write_behind_queue
+
+    # Persist queued prediction records before the DB connections go away
+    await write_behind_queue.drain()
+    await purge_manager.shutdown()
+    inference_executor.shutdown()
     await async_session().close_all()
     log.info("Shutdown complete.")
 
@@ -76,6 +105,31 @@ async def health_check() -> Dict[str, str]:
     return {"status": "ok", "message": "ExoVision API is running"}
 
 
+if settings.metrics_enabled:
+
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def prometheus_metrics() -> Response:
+        content, media_type = metrics.render()
+        return Response(content=content, media_type=media_type)
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_metrics_handler(
+    request: Request, exc: StarletteHTTPException
+) -> Response:
+    # Routes turn service errors into HTTPExceptions; count the original
+    metrics.count_error(request, exc.__context__ or exc)
+    return await http_exception_handler(request, exc)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_metrics_handler(
+    request: Request, exc: RequestValidationError
+) -> Response:
+    metrics.count_error(request, exc)
+    return await request_validation_exception_handler(request, exc)
+
+
 F = TypeVar("F", bound=Callable[..., Any])
 
 
@@ -83,9 +137,20 @@ F = TypeVar("F", bound=Callable[..., Any])
 async def process_time_log_middleware(
     request: Request, call_next: Callable[[Request], Any]
 ) -> Response:
-    start_time = time.time()
-    response: Response = await call_next(request)
-    process_time = str(round(time.time() - start_time, 3))
+    timings = metrics.start_request()
+    in_flight = metrics.IN_FLIGHT.labels(request.method)
+    in_flight.inc()
+    try:
+        response: Response = await call_next(request)
+    except Exception as e:
+        metrics.count_error(request, e)
+        metrics.observe_request(request, timings, 500)
+        raise
+    finally:
+        in_flight.dec()
+    process_time = str(
+        round(metrics.observe_request(request, timings, response.status_code), 3)
+    )
     response.headers["X-Process-Time"] = process_time
     log.info(
         "Method=%s Path=%s StatusCode=%s ProcessTime=%s",
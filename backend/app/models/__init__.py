@@ -5,6 +5,10 @@ import os
 import sys
 
 # Import models at top
+from app.models.inputs import PredictionInput
+from app.models.purge import PurgeJob, PurgeJobRecord
+from app.models.registry import ModelInfo
+from app.models.summary import PredictionStats, PredictionSummary
 from app.models.tess import (
     TessPredictionListResponse,
     TessPredictionRecord,
@@ -31,6 +35,10 @@ sys.modules["app.models.prediction"] = prediction
 # Export K2 Keppler models under 'prediction' namespace for backward compatibility
 PredictionRequest = k2_keppler_models.PredictionRequest
 PredictionResponse = k2_keppler_models.PredictionResponse
+PredictionBatchResponse = k2_keppler_models.PredictionBatchResponse
+EnsembleMemberResult = k2_keppler_models.EnsembleMemberResult
+EnsemblePredictionResponse = k2_keppler_models.EnsemblePredictionResponse
+CascadePredictionResponse = k2_keppler_models.CascadePredictionResponse
 PredictionRecord = k2_keppler_models.PredictionRecord
 PredictionListResponse = k2_keppler_models.PredictionListResponse
 
@@ -38,6 +46,10 @@ __all__ = [
     # K2 Keppler (aliased as Prediction for backward compatibility)
     "PredictionRequest",
     "PredictionResponse",
+    "PredictionBatchResponse",
+    "EnsembleMemberResult",
+    "EnsemblePredictionResponse",
+    "CascadePredictionResponse",
     "PredictionRecord",
     "PredictionListResponse",
     # TESS
@@ -45,6 +57,16 @@ __all__ = [
     "TessPredictionResponse",
     "TessPredictionRecord",
     "TessPredictionListResponse",
+    # Shared input payloads
+    "PredictionInput",
+    # Maintained counts
+    "PredictionSummary",
+    "PredictionStats",
+    # Background purge of prediction history
+    "PurgeJob",
+    "PurgeJobRecord",
+    # Served model versions
+    "ModelInfo",
     # User
     "User",
     # Module alias
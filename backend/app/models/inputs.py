@@ -0,0 +1,22 @@
+from typing import Optional
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class PredictionInput(SQLModel, table=True):
+    """
+    Content-addressed prediction input payload, shared by identical requests.
+
+    New rows store the feature values packed per `schema_id`; rows written
+    before that keep their JSON in `input_data`.
+    """
+
+    __tablename__ = "prediction_inputs"
+
+    input_hash: str = Field(primary_key=True, max_length=32)
+    mission: str = Field(nullable=False)  # kepler or tess
+    schema_id: Optional[int] = Field(default=None)  # layout of the packed features
+    features: Optional[bytes] = Field(default=None)  # packed feature values
+    input_data: Optional[str] = Field(default=None)  # legacy JSON string of inputs
+    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
@@ -1,6 +1,7 @@
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from pydantic import BaseModel, Field
+from sqlalchemy import Index
 from sqlmodel import Relationship
 from sqlmodel import SQLModel, Field as SQLField
 
@@ -116,17 +117,65 @@ class PredictionResponse(BaseModel):
     )
 
 
+class PredictionBatchResponse(BaseModel):
+    """Model for batch exoplanet prediction response"""
+
+    predictions: List[PredictionResponse]
+    total: int
+
+
+class EnsembleMemberResult(BaseModel):
+    """How one model of the ensemble did on a request"""
+
+    name: str = Field(..., description="Registry name of the model")
+    weight: float = Field(
+        ..., description="Weight in the combined score (0: run in shadow)"
+    )
+    status: str = Field(..., description="ok, timeout (over budget) or error")
+    probability: Optional[float] = Field(
+        default=None, description="The model's exoplanet probability"
+    )
+    latency_ms: float = Field(
+        ..., description="Time until it answered, or until it was dropped"
+    )
+    detail: Optional[str] = Field(default=None, description="Why it has no result")
+
+
+class EnsemblePredictionResponse(PredictionResponse):
+    """Model for an ensemble prediction, with the result of every member"""
+
+    members: List[EnsembleMemberResult]
+    budget_ms: float = Field(..., description="Latency budget the members had")
+
+
+class CascadePredictionResponse(PredictionResponse):
+    """Model for a cascade prediction, with the stage that made it"""
+
+    stage: str = Field(
+        ..., description="rules (false positive flags), model or ensemble"
+    )
+
+
 class PredictionRecord(SQLModel, table=True):
     """Database model for storing prediction records"""
 
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Keyset pagination of history, per user and across all users
+        Index("ix_predictions_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_predictions_created_id", "created_at", "id"),
+    )
 
     id: Optional[int] = SQLField(default=None, primary_key=True, index=True)
     prediction_id: str = SQLField(unique=True, index=True, nullable=False)
     user_id: Optional[int] = SQLField(default=None, foreign_key="users.id")
     prediction: int = SQLField(nullable=False)
     confidence: float = SQLField(nullable=False)
-    input_data: str = SQLField(nullable=False)  # JSON string of input features
+    input_hash: Optional[str] = SQLField(
+        default=None, foreign_key="prediction_inputs.input_hash", index=True
+    )
+    # Legacy inline JSON payload; new rows reference prediction_inputs instead
+    input_data: Optional[str] = SQLField(default=None)
     created_at: datetime = SQLField(default_factory=datetime.now, nullable=False)
 
     # Relationship to User
@@ -138,5 +187,8 @@ class PredictionListResponse(BaseModel):
 
     predictions: List[PredictionResponse]
     total: int
-    page: int
+    page: Optional[int] = None  # only for skip/limit paging
     size: int
+    next_cursor: Optional[str] = Field(
+        default=None, description="Pass as `cursor` to fetch the next page"
+    )
@@ -0,0 +1,75 @@
+from typing import Optional
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+from sqlalchemy import Index, text
+from sqlmodel import SQLModel, Field as SQLField
+
+# Statuses of a job that has not finished
+ACTIVE_STATUSES = ("pending", "running")
+
+_ACTIVE = text("status IN ('pending', 'running')")
+
+
+class PurgeJob(BaseModel):
+    """Progress of a background deletion of prediction history"""
+
+    job_id: str = Field(..., description="ID to poll for progress")
+    mission: str = Field(..., description="kepler or tess")
+    user_id: Optional[int] = Field(
+        default=None, description="User whose history is purged"
+    )
+    status: str = Field(
+        default="pending", description="pending, running, completed or failed"
+    )
+    total: int = Field(
+        default=0, description="Predictions to delete (estimated at start)"
+    )
+    deleted: int = Field(default=0, description="Predictions deleted so far")
+    created_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class PurgeJobRecord(SQLModel, table=True):
+    """
+    A purge job and its progress, shared by every worker: any of them can
+    report on it, and at most one job per mission and scope is active.
+    """
+
+    __tablename__ = "purge_jobs"
+    __table_args__ = (
+        Index(
+            "ux_purge_jobs_active_scope",
+            "mission",
+            "scope",
+            unique=True,
+            postgresql_where=_ACTIVE,
+            sqlite_where=_ACTIVE,
+        ),
+    )
+
+    job_id: str = SQLField(primary_key=True)
+    mission: str = SQLField(nullable=False)  # kepler or tess
+    scope: int = SQLField(nullable=False)  # user_id, or 0 for all users
+    status: str = SQLField(default="pending", nullable=False)
+    total: int = SQLField(default=0, nullable=False)
+    deleted: int = SQLField(default=0, nullable=False)
+    error: Optional[str] = SQLField(default=None)
+    created_at: datetime = SQLField(default_factory=datetime.now, nullable=False)
+    # Written with every chunk; an active job that stops updating lost its worker
+    updated_at: datetime = SQLField(default_factory=datetime.now, nullable=False)
+    finished_at: Optional[datetime] = SQLField(default=None)
+
+    def to_job(self) -> PurgeJob:
+        return PurgeJob(
+            job_id=self.job_id,
+            mission=self.mission,
+            user_id=self.scope or None,
+            status=self.status,
+            total=self.total,
+            deleted=self.deleted,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            error=self.error,
+        )
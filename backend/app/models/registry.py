@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ModelInfo(BaseModel):
+    """The version of a model a worker is serving"""
+
+    name: str = Field(..., description="Registry name, e.g. kepler_rf")
+    version: str = Field(..., description="Version from the manifest")
+    checksum: str = Field(..., description="SHA-256 of the model file")
+    path: str = Field(..., description="Model file")
+    loaded_at: datetime = Field(..., description="When this version was loaded")
+    load_ms: float = Field(..., description="Time taken to load it")
@@ -0,0 +1,42 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+from sqlmodel import SQLModel, Field as SQLField
+
+
+class PredictionSummary(SQLModel, table=True):
+    """
+    Prediction counts maintained on every insert and delete, so history
+    totals and statistics never need a scan of the prediction tables.
+
+    Every write touches the all-users rows, so each of those counts is split
+    over several shard rows (summed when read); concurrent writes then rarely
+    wait on the same row lock.
+    """
+
+    __tablename__ = "prediction_summary"
+
+    mission: str = SQLField(primary_key=True)  # kepler or tess
+    scope: int = SQLField(primary_key=True)  # user_id, or 0 for all users
+    dimension: str = SQLField(primary_key=True)  # total, class, confidence or day
+    key: str = SQLField(default="", primary_key=True)  # value within the dimension
+    shard: int = SQLField(default=0, primary_key=True)  # always 0 for one user
+    count: int = SQLField(default=0, nullable=False)
+
+
+class PredictionStats(BaseModel):
+    """Prediction statistics for a user or all users"""
+
+    mission: str
+    user_id: Optional[int] = None
+    total: int = 0
+    classes: Dict[str, int] = Field(
+        default_factory=dict, description="Predictions per predicted class"
+    )
+    confidence: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Confidence histogram keyed by bin lower bound (0.1 wide bins)",
+    )
+    daily: Dict[str, int] = Field(
+        default_factory=dict, description="Predictions per day (server local time)"
+    )
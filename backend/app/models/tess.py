@@ -1,6 +1,7 @@
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from pydantic import BaseModel, Field
+from sqlalchemy import Index
 from sqlmodel import Relationship
 from sqlmodel import SQLModel, Field as SQLField
 
@@ -40,13 +41,22 @@ class TessPredictionRecord(SQLModel, table=True):
     """Database model for storing TESS prediction records"""
 
     __tablename__ = "tess_predictions"
+    __table_args__ = (
+        # Keyset pagination of history, per user and across all users
+        Index("ix_tess_predictions_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_tess_predictions_created_id", "created_at", "id"),
+    )
 
     id: Optional[int] = SQLField(default=None, primary_key=True, index=True)
     prediction_id: str = SQLField(unique=True, index=True, nullable=False)
     user_id: Optional[int] = SQLField(default=None, foreign_key="users.id")
     prediction: str = SQLField(nullable=False)  # PC, FP, APC
     confidence: float = SQLField(nullable=False)
-    input_data: str = SQLField(nullable=False)  # JSON string of input features
+    input_hash: Optional[str] = SQLField(
+        default=None, foreign_key="prediction_inputs.input_hash", index=True
+    )
+    # Legacy inline JSON payload; new rows reference prediction_inputs instead
+    input_data: Optional[str] = SQLField(default=None)
     created_at: datetime = SQLField(default_factory=datetime.now, nullable=False)
 
     # Relationship to User
@@ -58,5 +68,8 @@ class TessPredictionListResponse(BaseModel):
 
     predictions: List[TessPredictionResponse]
     total: int
-    page: int
+    page: Optional[int] = None  # only for skip/limit paging
     size: int
+    next_cursor: Optional[str] = Field(
+        default=None, description="Pass as `cursor` to fetch the next page"
+    )
@@ -13,8 +13,9 @@ from app.services.auth.auth import (
 from app.utilities.jwt import create_access_token
 from app.config import settings
 from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 log = get_logger(__name__)
 
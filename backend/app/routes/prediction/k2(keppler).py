@@ -1,17 +1,31 @@
-from typing import Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional, Dict, Any, List, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.prediction import (
+    CascadePredictionResponse,
+    EnsemblePredictionResponse,
     PredictionRequest,
     PredictionResponse,
+    PredictionBatchResponse,
     PredictionListResponse,
 )
+from app.models.purge import PurgeJob
+from app.models.summary import PredictionStats
 from app.services.prediction import prediction_service
+from app.services.prediction.ensemble import EnsembleUnavailableError
+from app.services.prediction.executor import (
+    InferenceOverloadedError,
+    inference_executor,
+)
+from app.services.prediction.write_behind import write_behind_queue
 from app.utilities.db import get_db
+from app.utilities.http_cache import conditional_response, make_etag
 from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import TimedRoute
 
-router = APIRouter(prefix="/predictions", tags=["predictions"])
+router = APIRouter(prefix="/predictions", tags=["predictions"], route_class=TimedRoute)
 
 log = get_logger(__name__)
 
@@ -38,6 +52,13 @@ async def make_prediction(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Prediction model is not available",
         )
+    except InferenceOverloadedError as e:
+        log.warning(f"Inference overloaded: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service is overloaded, please retry",
+            headers={"Retry-After": "1"},
+        )
     except ImportError as e:
         log.error(f"Missing dependencies: {str(e)}")
         raise HTTPException(
@@ -58,6 +79,157 @@ async def make_prediction(
         )
 
 
+@router.post("/predict/batch", response_model=PredictionBatchResponse)
+async def make_batch_prediction(
+    requests: List[PredictionRequest],
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[int] = None,  # In a real app, this would come from JWT token
+) -> PredictionBatchResponse:
+    """
+    Make exoplanet predictions for a batch of KOIs.
+
+    All rows are scored with a single model call and stored in a single
+    transaction. Results are returned in the same order as the request.
+    """
+    if not requests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch must contain at least one prediction request",
+        )
+    if len(requests) > settings.prediction_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds the maximum of {settings.prediction_batch_max_size}",
+        )
+
+    try:
+        log.info(
+            f"Making batch prediction request of {len(requests)} rows for user_id: {user_id}"
+        )
+        predictions = await prediction_service.predict_batch(requests, db, user_id)
+        return PredictionBatchResponse(predictions=predictions, total=len(predictions))
+    except FileNotFoundError as e:
+        log.error(f"Model file not found: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction model is not available",
+        )
+    except InferenceOverloadedError as e:
+        log.warning(f"Inference overloaded: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service is overloaded, please retry",
+            headers={"Retry-After": "1"},
+        )
+    except ImportError as e:
+        log.error(f"Missing dependencies: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service dependencies are not installed",
+        )
+    except ValueError as e:  # Handle user not found
+        log.error(f"User validation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        log.error(f"Batch prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Batch prediction failed due to an internal error",
+        )
+
+
+@router.post("/predict/ensemble", response_model=EnsemblePredictionResponse)
+async def make_ensemble_prediction(
+    request: PredictionRequest,
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[int] = None,  # In a real app, this would come from JWT token
+    budget_ms: Optional[float] = Query(
+        None,
+        gt=0,
+        le=60000,
+        description="Latency budget; models slower than this are left out",
+    ),
+) -> EnsemblePredictionResponse:
+    """
+    Make an exoplanet prediction with the ensemble of the Kepler models.
+
+    The RF, XGBoost and ANN models score the same input concurrently and
+    their probabilities are combined with the configured weights. Models
+    that have not answered within the latency budget are left out. The
+    response lists every model's probability, latency and status.
+    """
+    try:
+        log.info(f"Making ensemble prediction request for user_id: {user_id}")
+        return await prediction_service.predict_ensemble(
+            request, db, user_id, budget_ms
+        )
+    except EnsembleUnavailableError as e:
+        log.error(f"Ensemble unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    except ValueError as e:  # Handle user not found
+        log.error(f"User validation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        log.error(f"Ensemble prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ensemble prediction failed due to an internal error",
+        )
+
+
+@router.post("/predict/cascade", response_model=CascadePredictionResponse)
+async def make_cascade_prediction(
+    request: PredictionRequest,
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[int] = None,  # In a real app, this would come from JWT token
+) -> CascadePredictionResponse:
+    """
+    Make an exoplanet prediction, using the models only when needed.
+
+    KOIs with a false positive flag set are answered from the flags alone;
+    the others are escalated to the RF model (or the ensemble, depending on
+    configuration). The response names the stage that answered.
+    """
+    try:
+        log.info(f"Making cascade prediction request for user_id: {user_id}")
+        return await prediction_service.predict_cascade(request, db, user_id)
+    except FileNotFoundError as e:
+        log.error(f"Model file not found: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction model is not available",
+        )
+    except (InferenceOverloadedError, EnsembleUnavailableError) as e:
+        log.warning(f"Inference unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service is overloaded, please retry",
+            headers={"Retry-After": "1"},
+        )
+    except ValueError as e:  # Handle user not found
+        log.error(f"User validation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        log.error(f"Cascade prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Cascade prediction failed due to an internal error",
+        )
+
+
 @router.get("/", response_model=PredictionListResponse)
 async def get_predictions(
     db: AsyncSession = Depends(get_db),
@@ -66,27 +238,42 @@ async def get_predictions(
     limit: int = Query(
         100, ge=1, le=1000, description="Maximum number of records to return"
     ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page (keyset paging)"
+    ),
 ) -> PredictionListResponse:
     """
     Get prediction history.
 
     Returns a paginated list of previous predictions made by the user
     (or all predictions if user_id is None and user has admin privileges).
+    Follow `next_cursor` for constant-cost paging; skip/limit is still
+    supported but gets slower on deep pages.
     """
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either cursor or skip, not both",
+        )
+
     try:
         log.info(
-            f"Getting predictions for user_id: {user_id}, skip: {skip}, limit: {limit}"
+            f"Getting predictions for user_id: {user_id}, skip: {skip}, limit: {limit}, cursor: {cursor}"
         )
-        predictions = await prediction_service.get_predictions(db, user_id, skip, limit)
+        predictions, next_cursor = await prediction_service.get_prediction_page(
+            db, user_id, limit, cursor=cursor, skip=skip
+        )
+        total = await prediction_service.count_predictions(db, user_id)
 
         return PredictionListResponse(
             predictions=predictions,
-            total=len(
-                predictions
-            ),  # In a real app, you'd want to count total separately
-            page=skip // limit + 1,
+            total=total,
+            page=None if cursor else skip // limit + 1,
             size=len(predictions),
+            next_cursor=next_cursor,
         )
+    except ValueError as e:  # Malformed cursor
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         log.error(f"Failed to get predictions: {str(e)}")
         raise HTTPException(
@@ -95,25 +282,87 @@ async def get_predictions(
         )
 
 
+@router.get("/stats", response_model=PredictionStats)
+async def get_prediction_stats(
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[int] = None,  # In a real app, this would come from JWT token
+    days: int = Query(30, ge=1, le=366, description="Days of daily volume to return"),
+) -> PredictionStats:
+    """
+    Get prediction statistics.
+
+    Counts per predicted class, a confidence histogram and daily volumes for
+    the user (or all users if user_id is None), read from counts maintained
+    as predictions are written and deleted.
+    """
+    try:
+        log.info(f"Getting prediction stats for user_id: {user_id}")
+        return await prediction_service.get_stats(db, user_id, days)
+    except Exception as e:
+        log.error(f"Failed to get prediction stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve prediction statistics",
+        )
+
+
+@router.get("/health", tags=["Health"])
+async def prediction_service_health() -> Dict[str, Any]:
+    """
+    Check if the K2 Keppler prediction service is available.
+    """
+    try:
+        return {
+            "status": "healthy",
+            "service": "K2 Keppler Prediction Service",
+            "model_path": prediction_service.model_path,
+            "model_loaded": prediction_service.model is not None,
+            "engine": settings.kepler_rf_engine,
+            "micro_batching": prediction_service.batcher.stats(),
+            "cache": prediction_service.cache.stats(),
+            "ensemble": prediction_service.ensemble.stats(),
+            "cascade": prediction_service.cascade.stats(),
+            "executor": inference_executor.stats(),
+            "write_behind": write_behind_queue.stats(),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service unhealthy: {str(e)}",
+        )
+
+
 @router.get("/{prediction_id}", response_model=PredictionResponse)
 async def get_prediction_by_id(
     prediction_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user_id: Optional[int] = None,  # In a real app, this would come from JWT token
-) -> PredictionResponse:
+) -> Union[PredictionResponse, Response]:
     """
     Get a specific prediction by ID.
+
+    Responses carry ETag and Last-Modified; a matching If-None-Match (or
+    If-Modified-Since) returns 304 Not Modified with no body.
     """
     try:
-        predictions = await prediction_service.get_predictions(db, user_id)
-
-        for prediction in predictions:
-            if prediction.prediction_id == prediction_id:
-                return prediction
+        prediction = await prediction_service.get_prediction(db, prediction_id, user_id)
+        if prediction is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Prediction not found"
+            )
 
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Prediction not found"
+        etag = make_etag(
+            prediction.prediction_id,
+            prediction.prediction,
+            prediction.confidence,
+            prediction.timestamp.isoformat(),
+        )
+        not_modified = conditional_response(
+            request, response, etag, prediction.timestamp
         )
+        return not_modified or prediction
     except HTTPException:
         raise
     except Exception as e:
@@ -159,18 +408,21 @@ async def delete_prediction(
         )
 
 
-@router.delete("/")
+@router.delete("/", status_code=status.HTTP_202_ACCEPTED, response_model=PurgeJob)
 async def delete_all_predictions(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
     user_id: Optional[int] = None,  # In a real app, this would come from JWT token
     confirm: bool = Query(
         False, description="Set to true to confirm deletion of all predictions"
     ),
-) -> Dict[str, Any]:
+) -> PurgeJob:
     """
     Delete all predictions for the user.
 
-    This is a destructive operation and requires confirmation.
+    This is a destructive operation and requires confirmation. The deletion
+    runs in the background; poll the returned job (see the Location header)
+    for progress.
     """
     if not confirm:
         raise HTTPException(
@@ -180,26 +432,27 @@ async def delete_all_predictions(
 
     try:
         log.info(f"Deleting all predictions for user_id: {user_id}")
-
-        # Get all predictions first
-        predictions = await prediction_service.get_predictions(db, user_id, 0, 10000)
-
-        # Delete each prediction
-        deleted_count = 0
-        for prediction in predictions:
-            success = await prediction_service.delete_prediction(
-                db, prediction.prediction_id, user_id
-            )
-            if success:
-                deleted_count += 1
-
-        return {
-            "message": f"Successfully deleted {deleted_count} predictions",
-            "deleted_count": deleted_count,
-        }
+        job = await prediction_service.purge_predictions(user_id)
+        response.headers["Location"] = str(
+            request.url_for("get_purge_job", job_id=job.job_id)
+        )
+        return job
     except Exception as e:
         log.error(f"Failed to delete all predictions for user_id {user_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete predictions",
         )
+
+
+@router.get("/purge/{job_id}", response_model=PurgeJob)
+async def get_purge_job(job_id: str) -> PurgeJob:
+    """
+    Get the progress of a background deletion started by DELETE /predictions/.
+    """
+    job = await prediction_service.get_purge(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Purge job not found"
+        )
+    return job
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.models.registry import ModelInfo
+from app.services.prediction import prediction_service, tess_prediction_service
+from app.services.prediction.registry import model_registry
+from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import TimedRoute
+
+router = APIRouter(prefix="/models", tags=["Models"], route_class=TimedRoute)
+
+log = get_logger(__name__)
+
+# Services by registry name, to drop their cached results on reload (the
+# ensemble's results are not cached)
+services: Dict[str, Any] = {
+    service.model_name: service
+    for service in (prediction_service, tess_prediction_service)
+}
+
+
+@router.get("/", response_model=List[ModelInfo])
+async def list_models() -> List[ModelInfo]:
+    """
+    Versions of the models this worker is serving, with their checksum and
+    how long they took to load.
+    """
+    return model_registry.info()
+
+
+@router.post("/{name}/reload", response_model=ModelInfo)
+async def reload_model(name: str) -> ModelInfo:
+    """
+    Load the version of a model the manifest names now and swap it in.
+
+    Requests already running finish on the previous version. Other workers
+    pick up the new version on their next periodic manifest check.
+    """
+    if name not in model_registry.names():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown model '{name}'"
+        )
+    try:
+        loaded = await asyncio.to_thread(model_registry.load, name)
+    except (FileNotFoundError, ValueError) as e:
+        log.error(f"Reload of {name} rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Model not reloaded: {str(e)}",
+        )
+    except Exception as e:
+        log.error(f"Reload of {name} failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Model reload failed due to an internal error",
+        )
+    service = services.get(name)
+    if service is not None:
+        service.cache.invalidate()
+    return loaded.info()
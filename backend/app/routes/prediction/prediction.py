@@ -6,7 +6,7 @@ import os
 from fastapi import APIRouter
 
 # Import TESS router
-from app.routes.prediction import tess
+from app.routes.prediction import models, tess
 
 # Handle k2(keppler).py import with special characters
 spec = importlib.util.spec_from_file_location(
@@ -25,3 +25,6 @@ router.include_router(k2_keppler_routes.router)
 
 # Include TESS prediction routes
 router.include_router(tess.router)
+
+# Include model version and reload routes
+router.include_router(models.router)
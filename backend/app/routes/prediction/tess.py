@@ -1,17 +1,32 @@
-from typing import Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import csv
+from typing import Optional, Dict, Any, Literal, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+
 from app.models.tess import (
     TessPredictionRequest,
     TessPredictionResponse,
     TessPredictionListResponse,
 )
+from app.models.purge import PurgeJob
+from app.models.summary import PredictionStats
 from app.services.prediction.tess import tess_prediction_service
+from app.utilities.csv_stream import DuplexStreamingResponse, iter_lines, read_header
+from app.services.prediction.executor import (
+    InferenceOverloadedError,
+    inference_executor,
+)
+from app.services.prediction.write_behind import write_behind_queue
 from app.utilities.db import get_db
+from app.utilities.http_cache import conditional_response, make_etag
 from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import TimedRoute
 
-router = APIRouter(prefix="/tess/predictions", tags=["TESS Predictions"])
+router = APIRouter(
+    prefix="/tess/predictions", tags=["TESS Predictions"], route_class=TimedRoute
+)
 
 log = get_logger(__name__)
 
@@ -41,6 +56,13 @@ async def make_tess_prediction(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="TESS prediction model is not available",
         )
+    except InferenceOverloadedError as e:
+        log.warning(f"Inference overloaded: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="TESS prediction service is overloaded, please retry",
+            headers={"Retry-After": "1"},
+        )
     except ImportError as e:
         log.error(f"Missing dependencies: {str(e)}")
         raise HTTPException(
@@ -61,6 +83,47 @@ async def make_tess_prediction(
         )
 
 
+@router.post("/predict/upload")
+async def score_tess_catalog(
+    request: Request,
+    output_format: Literal["csv", "ndjson"] = Query(
+        "csv", alias="format", description="Response format: csv or ndjson"
+    ),
+) -> DuplexStreamingResponse:
+    """
+    Score a whole TOI catalog file in the TESS Exoplanet Archive CSV layout.
+
+    Send the raw CSV as the request body (e.g. `curl --data-binary @toi.csv`).
+    The body is read incrementally and scored chunk by chunk; results are
+    streamed back as they are produced, so memory stays flat for any file size.
+    Scored rows are not stored in the prediction history. Rows that cannot
+    be scored (a value that is not a number, a malformed line) are reported
+    in the error column instead of failing the response.
+    """
+    lines = iter_lines(request.stream())
+    try:
+        header = await read_header(lines)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    columns = next(csv.reader([header]))
+    missing = [c for c in tess_prediction_service.feature_columns if c not in columns]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV is missing required columns: {', '.join(missing)}",
+        )
+
+    log.info(f"Streaming TESS catalog scoring as {output_format}")
+    media_type = "text/csv" if output_format == "csv" else "application/x-ndjson"
+    return DuplexStreamingResponse(
+        tess_prediction_service.stream_scores(
+            header, lines, output_format, settings.tess_upload_chunk_rows
+        ),
+        media_type=media_type,
+    )
+
+
 @router.get("/", response_model=TessPredictionListResponse)
 async def get_tess_predictions(
     db: AsyncSession = Depends(get_db),
@@ -69,29 +132,42 @@ async def get_tess_predictions(
     limit: int = Query(
         100, ge=1, le=1000, description="Maximum number of records to return"
     ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page (keyset paging)"
+    ),
 ) -> TessPredictionListResponse:
     """
     Get TESS prediction history.
 
     Returns a paginated list of previous TESS predictions made by the user
     (or all predictions if user_id is None and user has admin privileges).
+    Follow `next_cursor` for constant-cost paging; skip/limit is still
+    supported but gets slower on deep pages.
     """
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either cursor or skip, not both",
+        )
+
     try:
         log.info(
-            f"Getting TESS predictions for user_id: {user_id}, skip: {skip}, limit: {limit}"
+            f"Getting TESS predictions for user_id: {user_id}, skip: {skip}, limit: {limit}, cursor: {cursor}"
         )
-        predictions = await tess_prediction_service.get_predictions(
-            db, user_id, skip, limit
+        predictions, next_cursor = await tess_prediction_service.get_prediction_page(
+            db, user_id, limit, cursor=cursor, skip=skip
         )
+        total = await tess_prediction_service.count_predictions(db, user_id)
 
         return TessPredictionListResponse(
             predictions=predictions,
-            total=len(
-                predictions
-            ),  # In a real app, you'd want to count total separately
-            page=skip // limit + 1,
+            total=total,
+            page=None if cursor else skip // limit + 1,
             size=len(predictions),
+            next_cursor=next_cursor,
         )
+    except ValueError as e:  # Malformed cursor
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         log.error(f"Failed to get TESS predictions: {str(e)}")
         raise HTTPException(
@@ -100,25 +176,89 @@ async def get_tess_predictions(
         )
 
 
+@router.get("/stats", response_model=PredictionStats)
+async def get_tess_prediction_stats(
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[int] = None,  # In a real app, this would come from JWT token
+    days: int = Query(30, ge=1, le=366, description="Days of daily volume to return"),
+) -> PredictionStats:
+    """
+    Get TESS prediction statistics.
+
+    Counts per predicted class, a confidence histogram and daily volumes for
+    the user (or all users if user_id is None), read from counts maintained
+    as predictions are written and deleted.
+    """
+    try:
+        log.info(f"Getting TESS prediction stats for user_id: {user_id}")
+        return await tess_prediction_service.get_stats(db, user_id, days)
+    except Exception as e:
+        log.error(f"Failed to get TESS prediction stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve TESS prediction statistics",
+        )
+
+
+@router.get("/health", tags=["Health"])
+async def tess_service_health() -> Dict[str, Any]:
+    """
+    Check if the TESS prediction service is available.
+    """
+    try:
+        model_path = tess_prediction_service.model_path
+        return {
+            "status": "healthy",
+            "service": "TESS Prediction Service",
+            "model_path": model_path,
+            "model_loaded": tess_prediction_service.model is not None,
+            "engine": settings.tess_xgb_engine,
+            "micro_batching": tess_prediction_service.batcher.stats(),
+            "cache": tess_prediction_service.cache.stats(),
+            "executor": inference_executor.stats(),
+            "write_behind": write_behind_queue.stats(),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service unhealthy: {str(e)}",
+        )
+
+
 @router.get("/{prediction_id}", response_model=TessPredictionResponse)
 async def get_tess_prediction_by_id(
     prediction_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user_id: Optional[int] = None,  # In a real app, this would come from JWT token
-) -> TessPredictionResponse:
+) -> Union[TessPredictionResponse, Response]:
     """
     Get a specific TESS prediction by ID.
+
+    Responses carry ETag and Last-Modified; a matching If-None-Match (or
+    If-Modified-Since) returns 304 Not Modified with no body.
     """
     try:
-        predictions = await tess_prediction_service.get_predictions(db, user_id)
-
-        for prediction in predictions:
-            if prediction.prediction_id == prediction_id:
-                return prediction
+        prediction = await tess_prediction_service.get_prediction(
+            db, prediction_id, user_id
+        )
+        if prediction is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="TESS prediction not found",
+            )
 
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="TESS prediction not found"
+        etag = make_etag(
+            prediction.prediction_id,
+            prediction.prediction,
+            prediction.confidence,
+            prediction.timestamp.isoformat(),
+        )
+        not_modified = conditional_response(
+            request, response, etag, prediction.timestamp
         )
+        return not_modified or prediction
     except HTTPException:
         raise
     except Exception as e:
@@ -167,21 +307,53 @@ async def delete_tess_prediction(
         )
 
 
-@router.get("/health", tags=["Health"])
-async def tess_service_health() -> Dict[str, Any]:
+@router.delete("/", status_code=status.HTTP_202_ACCEPTED, response_model=PurgeJob)
+async def delete_all_tess_predictions(
+    request: Request,
+    response: Response,
+    user_id: Optional[int] = None,  # In a real app, this would come from JWT token
+    confirm: bool = Query(
+        False, description="Set to true to confirm deletion of all TESS predictions"
+    ),
+) -> PurgeJob:
     """
-    Check if the TESS prediction service is available.
+    Delete all TESS predictions for the user.
+
+    This is a destructive operation and requires confirmation. The deletion
+    runs in the background; poll the returned job (see the Location header)
+    for progress.
     """
+    if not confirm:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please set confirm=true to delete all TESS predictions",
+        )
+
     try:
-        model_path = tess_prediction_service.model_path
-        return {
-            "status": "healthy",
-            "service": "TESS Prediction Service",
-            "model_path": model_path,
-            "model_loaded": tess_prediction_service.model is not None,
-        }
+        log.info(f"Deleting all TESS predictions for user_id: {user_id}")
+        job = await tess_prediction_service.purge_predictions(user_id)
+        response.headers["Location"] = str(
+            request.url_for("get_tess_purge_job", job_id=job.job_id)
+        )
+        return job
     except Exception as e:
+        log.error(
+            f"Failed to delete all TESS predictions for user_id {user_id}: {str(e)}"
+        )
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Service unhealthy: {str(e)}",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete TESS predictions",
+        )
+
+
+@router.get("/purge/{job_id}", response_model=PurgeJob)
+async def get_tess_purge_job(job_id: str) -> PurgeJob:
+    """
+    Get the progress of a background deletion started by DELETE /tess/predictions/.
+    """
+    job = await tess_prediction_service.get_purge(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Purge job not found"
         )
+    return job
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import select
 from app.models.user import User
+from app.services.auth.user_cache import known_users
 from app.utilities.jwt import hash_password, verify_password
 from datetime import datetime
 from app.utilities.logger import logger as get_logger
@@ -36,6 +37,7 @@ async def signup_user(db: AsyncSession, name: str, email: str, password: str) ->
         db.add(new_user)
         await db.commit()
         await db.refresh(new_user)
+        known_users.add(new_user.id)
         log.info(f"User created successfully: {email} (ID: {new_user.id})")
         return new_user
     except HTTPException:
@@ -0,0 +1,52 @@
+from typing import Any, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.user import User
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+
+class KnownUsers:
+    """
+    In-process set of user ids known to exist, so the prediction write path
+    does not query the users table on every request.
+
+    Ids are added on signup or after one successful lookup and removed when
+    a User is deleted through the ORM. The users.id foreign key remains the
+    source of truth: a prediction that still violates it (e.g. the user was
+    deleted by another worker) is rejected at commit and its id evicted.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Set[int] = set()
+
+    def add(self, user_id: Optional[int]) -> None:
+        if user_id is not None:
+            self._ids.add(user_id)
+
+    def discard(self, user_id: Optional[int]) -> None:
+        if user_id is not None:
+            self._ids.discard(user_id)
+
+    async def exists(self, db: AsyncSession, user_id: int) -> bool:
+        """Whether the user exists, querying the database only on a cache miss"""
+        if user_id in self._ids:
+            return True
+
+        result = await db.execute(select(User.id).where(User.id == user_id))
+        if result.scalar_one_or_none() is None:
+            return False
+        self._ids.add(user_id)
+        return True
+
+
+known_users = KnownUsers()
+
+
+@event.listens_for(User, "after_delete")
+def _forget_deleted_user(mapper: Any, connection: Any, target: User) -> None:
+    known_users.discard(target.id)
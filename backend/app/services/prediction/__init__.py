@@ -3,21 +3,66 @@
 import importlib.util
 import os
 import sys
+from typing import TYPE_CHECKING, Any, List
 
-# Import TESS prediction service at top
-from app.services.prediction.tess import tess_prediction_service
+# The registry and the services (with the pandas and model library imports
+# behind them) load on first access, so importing a submodule such as forest,
+# e.g. from a CLI or an executor process, does not build them
+if TYPE_CHECKING:
+    from app.services.prediction.registry import model_registry
+    from app.services.prediction.tess import tess_prediction_service
 
-# Handle k2(keppler).py import with special characters
-spec = importlib.util.spec_from_file_location(
-    "k2_keppler", os.path.join(os.path.dirname(__file__), "k2(keppler).py")
-)
-if spec is None or spec.loader is None:
-    raise ImportError("Failed to load k2(keppler).py service module")
-k2_keppler = importlib.util.module_from_spec(spec)
-sys.modules["k2_keppler"] = k2_keppler
-spec.loader.exec_module(k2_keppler)
+    prediction_service: Any
 
-# Import prediction service from k2_keppler module
-prediction_service = k2_keppler.prediction_service
 
-__all__ = ["prediction_service", "tess_prediction_service"]
+def _load_k2_keppler() -> Any:
+    """Handle k2(keppler).py import with special characters"""
+    if "k2_keppler" in sys.modules:
+        return sys.modules["k2_keppler"]
+    spec = importlib.util.spec_from_file_location(
+        "k2_keppler", os.path.join(os.path.dirname(__file__), "k2(keppler).py")
+    )
+    if spec is None or spec.loader is None:
+        raise ImportError("Failed to load k2(keppler).py service module")
+    k2_keppler = importlib.util.module_from_spec(spec)
+    sys.modules["k2_keppler"] = k2_keppler
+    spec.loader.exec_module(k2_keppler)
+    return k2_keppler
+
+
+def __getattr__(name: str) -> Any:
+    if name == "model_registry":
+        from app.services.prediction.registry import model_registry
+
+        value: Any = model_registry
+    elif name == "tess_prediction_service":
+        from app.services.prediction.tess import tess_prediction_service
+
+        value = tess_prediction_service
+    elif name == "prediction_service":
+        # Import prediction service from k2_keppler module
+        value = _load_k2_keppler().prediction_service
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def register_models() -> List[str]:
+    """
+    Create the prediction services, which register their models, and return
+    the registered model names
+    """
+    from app.services.prediction.registry import model_registry
+
+    for name in ("prediction_service", "tess_prediction_service"):
+        __getattr__(name)
+    return model_registry.names()
+
+
+__all__ = [
+    "model_registry",
+    "prediction_service",
+    "register_models",
+    "tess_prediction_service",
+]
@@ -0,0 +1,135 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import BATCHER_QUEUE_DEPTH, observe_batcher_config
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class MicroBatcher(Generic[T]):
+    """
+    Coalesce concurrent single-row inferences into one vectorized model call.
+
+    Rows submitted within `window_ms` of the first pending row (or until
+    `max_batch_size` rows are pending) are stacked into one matrix and passed
+    to the async `infer`, which must return one result per row in the same
+    order. Batches are dispatched as tasks, so a new window can fill while the
+    previous batch is still running. The window, batch size limit and
+    queue depth are exported as Prometheus gauges labelled with `name`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        infer: Callable[[npt.NDArray[np.float32]], Awaitable[Sequence[T]]],
+        window_ms: float = 2.0,
+        max_batch_size: int = 64,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.infer = infer
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.enabled = enabled and max_batch_size > 1
+
+        self._pending: List[Tuple[npt.NDArray[np.float32], asyncio.Future[T]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._queue_depth = BATCHER_QUEUE_DEPTH.labels(name)
+        observe_batcher_config(name, window_ms, max_batch_size)
+
+        self.batches_total = 0
+        self.rows_total = 0
+        self.last_batch_size = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, row: npt.NDArray[np.float32]) -> T:
+        """Queue one feature row and wait for its result"""
+        if not self.enabled:
+            return (await self._run(np.atleast_2d(row)))[0]
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[T] = loop.create_future()
+        self._pending.append((row, future))
+        self._queue_depth.set(len(self._pending))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        self._queue_depth.set(0)
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(
+        self, batch: List[Tuple[npt.NDArray[np.float32], asyncio.Future[T]]]
+    ) -> None:
+        try:
+            results = await self._run(np.stack([row for row, _ in batch]))
+        except Exception as e:
+            log.error(f"Micro-batch inference failed for {self.name}: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self, matrix: npt.NDArray[np.float32]) -> Sequence[T]:
+        results = await self.infer(matrix)
+        self.batches_total += 1
+        self.rows_total += len(matrix)
+        self.last_batch_size = len(matrix)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Batcher configuration and counters for health/metrics endpoints"""
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "batches_total": self.batches_total,
+            "rows_total": self.rows_total,
+            "last_batch_size": self.last_batch_size,
+            "mean_batch_size": (
+                self.rows_total / self.batches_total if self.batches_total else 0.0
+            ),
+        }
@@ -0,0 +1,74 @@
+import json
+from typing import Any, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+
+class NativeBooster:
+    """
+    An XGBoost classifier served from a native Booster rather than the
+    sklearn wrapper: predict_proba runs in-place prediction on the float32
+    feature matrix with a fixed thread count, with no wrapper parameter
+    handling or DMatrix per call. Probabilities come out in the same class
+    order (and with the same best_iteration cut-off) as
+    XGBClassifier.predict_proba.
+    """
+
+    def __init__(self, booster: Any, n_threads: int = 1) -> None:
+        self.booster = booster
+        self.n_threads = n_threads
+        booster.set_param({"nthread": n_threads})
+
+        learner = json.loads(booster.save_config())["learner"]
+        self.objective: str = learner["objective"]["name"]
+        n_classes = int(learner["learner_model_param"]["num_class"])
+        self.classes_ = np.arange(max(n_classes, 2))
+
+        # The sklearn wrapper stops at the early-stopping best iteration
+        best_iteration = booster.attr("best_iteration")
+        self.iteration_range: Tuple[int, int] = (
+            (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+        )
+
+    @classmethod
+    def load(cls, path: str, n_threads: int = 1) -> "NativeBooster":
+        """Load a model saved in XGBoost's native JSON or UBJ format"""
+        import xgboost
+
+        booster = xgboost.Booster()
+        booster.load_model(path)
+        return cls(booster, n_threads)
+
+    @classmethod
+    def from_sklearn(cls, model: Any, n_threads: int = 1) -> "NativeBooster":
+        """Take the booster out of a fitted XGBClassifier"""
+        return cls(model.get_booster().copy(), n_threads)
+
+    @property
+    def source_version(self) -> str:
+        """Version of the model file this booster was exported from, if recorded"""
+        return str(self.booster.attr("source_version") or "")
+
+    def save(self, path: str, source_version: str = "") -> None:
+        """Save in native format (.ubj or .json), tagged with source_version"""
+        if source_version:
+            self.booster.set_attr(source_version=source_version)
+        self.booster.save_model(path)
+
+    def predict_proba(self, X: npt.ArrayLike) -> npt.NDArray[np.float32]:
+        """Class probabilities per row, in class index order"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.objective == "multi:softmax":
+            # softmax only predicts the class; probabilities come from margins
+            margin = self.booster.inplace_predict(
+                X, iteration_range=self.iteration_range, predict_type="margin"
+            )
+            exp = np.exp(margin - margin.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+
+        proba = self.booster.inplace_predict(X, iteration_range=self.iteration_range)
+        if proba.ndim == 1:
+            # binary:logistic predicts P(class 1) only
+            return np.vstack([1.0 - proba, proba]).T
+        return proba
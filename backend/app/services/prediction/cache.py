@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generic,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def file_checksum(f: BinaryIO) -> str:
+    """SHA-256 of an open file's content"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: f.read(1 << 20), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def model_file_version(path: str) -> str:
+    """Short content hash of a model file, used to version cached results"""
+    with open(path, "rb") as f:
+        return file_checksum(f)[:16]
+
+
+class PredictionCache(Generic[T]):
+    """
+    Bounded LRU cache of prediction results with a TTL and single-flight.
+
+    Keys are a canonical hash of the float32 feature row plus the model
+    version, so a changed model never serves stale results. Concurrent
+    misses for the same key share one in-flight computation instead of
+    each running inference.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 300.0,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_entries > 0
+
+        self._entries: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future[T]] = {}
+        # Bumped on invalidate() so in-flight results from an old model are dropped
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(row: npt.NDArray[np.float32], model_version: str) -> str:
+        """Canonical cache key for one feature row"""
+        # Adding 0.0 folds -0.0 into 0.0 so equal values hash equally
+        canonical = np.ascontiguousarray(row, dtype=np.float32) + np.float32(0.0)
+        digest = hashlib.blake2b(canonical.tobytes(), digest_size=16).hexdigest()
+        return f"{model_version}:{digest}"
+
+    def lookup(self, key: str) -> Optional[T]:
+        """Return a fresh cached result (counting a hit) or None"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def store(self, key: str, value: T) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached result for key, computing it at most once at a time"""
+        if not self.enabled:
+            return await compute()
+
+        cached = self.lookup(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # Shield so a cancelled waiter does not cancel everyone else's result
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        generation = self._generation
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved; the leader re-raises it below
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        future.set_result(value)
+        if generation == self._generation:
+            self.store(key, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop every cached result (e.g. after a model reload)"""
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+        self.invalidations += 1
+        log.info(f"Prediction cache invalidated for {self.name}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache configuration and counters for health/metrics endpoints"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,187 @@
+import io
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+Activation = Callable[[npt.NDArray[np.float32]], npt.NDArray[np.float32]]
+
+
+def _sigmoid(x: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    # exp(-log(1 + exp(-x))): no overflow for large negative inputs
+    return np.exp(-np.logaddexp(np.float32(0), -x))
+
+
+def _softmax(x: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    exp = np.exp(x - x.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+# Keras activations supported, keyed by their config name
+ACTIVATIONS: Dict[str, Activation] = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, np.float32(0)),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+# Layers that do nothing at inference time
+INFERENCE_NOOP_LAYERS = ("InputLayer", "Dropout")
+
+
+@dataclass
+class DenseLayer:
+    kernel: npt.NDArray[np.float32]  # (inputs, units)
+    bias: npt.NDArray[np.float32]  # (units,)
+    activation: str
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _layer_configs(model_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if model_config["class_name"] != "Sequential":
+        raise ValueError(f"Only Sequential models are supported, got {model_config}")
+    layers: List[Dict[str, Any]] = model_config["config"]["layers"]
+    for layer in layers:
+        kind = layer["class_name"]
+        if kind not in INFERENCE_NOOP_LAYERS + ("Dense", "Activation"):
+            raise ValueError(f"Unsupported layer type '{kind}'")
+        activation = layer["config"].get("activation", "linear")
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation '{activation}'")
+    return layers
+
+
+def _build_layers(
+    layers: List[Dict[str, Any]],
+    weights: Callable[[int, Dict[str, Any]], Tuple[Any, Any]],
+) -> List[DenseLayer]:
+    """Dense layers (with any Activation layers folded in) in model order"""
+    dense: List[DenseLayer] = []
+    for position, layer in enumerate(layers):
+        config = layer["config"]
+        if layer["class_name"] == "Dense":
+            kernel, bias = weights(position, config)
+            kernel = np.asarray(kernel, dtype=np.float32)
+            if bias is None:
+                bias = np.zeros(kernel.shape[1], dtype=np.float32)
+            dense.append(
+                DenseLayer(
+                    kernel=np.ascontiguousarray(kernel),
+                    bias=np.asarray(bias, dtype=np.float32),
+                    activation=config.get("activation", "linear"),
+                )
+            )
+        elif layer["class_name"] == "Activation":
+            if not dense or dense[-1].activation != "linear":
+                raise ValueError("Activation layers must follow a linear Dense layer")
+            dense[-1].activation = config["activation"]
+    if not dense:
+        raise ValueError("The model has no Dense layers")
+    return dense
+
+
+class DenseNetwork:
+    """
+    A Keras Sequential model of Dense layers evaluated with NumPy.
+
+    Weights are read straight from a Keras .keras archive or legacy .h5 file,
+    so serving the model needs h5py but not TensorFlow. Dropout (and the
+    input layer) are no-ops at inference; every layer runs in float32, as
+    Keras does, so outputs match TensorFlow to float32 rounding.
+    """
+
+    def __init__(self, layers: List[DenseLayer]) -> None:
+        for previous, layer in zip(layers, layers[1:]):
+            if previous.kernel.shape[1] != layer.kernel.shape[0]:
+                raise ValueError("Dense layer shapes do not chain")
+        self.layers = layers
+        self.n_features = layers[0].kernel.shape[0]
+        self.n_outputs = layers[-1].kernel.shape[1]
+        self.classes_ = np.arange(max(self.n_outputs, 2))
+
+    @classmethod
+    def load(cls, path: str) -> "DenseNetwork":
+        """Load a .keras (Keras 3) or .h5 (legacy HDF5) model file"""
+        if os.path.splitext(path)[1] == ".keras":
+            return cls.load_keras(path)
+        return cls.load_h5(path)
+
+    @classmethod
+    def load_keras(cls, path: str) -> "DenseNetwork":
+        import h5py
+
+        with zipfile.ZipFile(path) as archive:
+            layers = _layer_configs(json.loads(archive.read("config.json")))
+            weights_file = io.BytesIO(archive.read("model.weights.h5"))
+
+        # Keras 3 stores the weights of each layer under the snake-cased class
+        # name, numbered in model order (dense, dense_1, ...)
+        paths: Dict[int, str] = {}
+        seen: Dict[str, int] = {}
+        for position, layer in enumerate(layers):
+            base = _snake_case(layer["class_name"])
+            count = seen.get(base, 0)
+            seen[base] = count + 1
+            paths[position] = f"layers/{base}_{count}" if count else f"layers/{base}"
+
+        with h5py.File(weights_file, "r") as f:
+
+            def weights(position: int, config: Dict[str, Any]) -> Tuple[Any, Any]:
+                variables = f[paths[position]]["vars"]
+                bias = variables["1"][()] if config.get("use_bias", True) else None
+                return variables["0"][()], bias
+
+            return cls(_build_layers(layers, weights))
+
+    @classmethod
+    def load_h5(cls, path: str) -> "DenseNetwork":
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            layers = _layer_configs(json.loads(f.attrs["model_config"]))
+            group = f["model_weights"]
+
+            def weights(position: int, config: Dict[str, Any]) -> Tuple[Any, Any]:
+                layer = group[config["name"]]
+                names = [
+                    name.decode() if isinstance(name, bytes) else name
+                    for name in layer.attrs["weight_names"]
+                ]
+                by_kind = {
+                    name.rsplit("/", 1)[-1].split(":")[0]: layer[name][()]
+                    for name in names
+                }
+                return by_kind["kernel"], by_kind.get("bias")
+
+            return cls(_build_layers(layers, weights))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(layer.kernel.nbytes + layer.bias.nbytes for layer in self.layers)
+
+    def forward(self, X: npt.ArrayLike) -> npt.NDArray[np.float32]:
+        """Output of the last layer for every row"""
+        h = np.asarray(X, dtype=np.float32)
+        if h.ndim != 2 or h.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected input of shape (rows, {self.n_features}), got {h.shape}"
+            )
+        for layer in self.layers:
+            h = ACTIVATIONS[layer.activation](h @ layer.kernel + layer.bias)
+        return h
+
+    def predict_proba(self, X: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        """Class probabilities per row (a single sigmoid unit is P(class 1))"""
+        output = self.forward(X).astype(np.float64)
+        if self.n_outputs == 1:
+            return np.hstack([1.0 - output, output])
+        return output
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+import numpy.typing as npt
+
+from app.models.prediction import EnsembleMemberResult
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+# Scores the given member's columns of the shared matrix: P(class 1) per row
+MemberScorer = Callable[[str, npt.NDArray[np.float32]], Awaitable[List[float]]]
+
+
+class EnsembleUnavailableError(Exception):
+    """Raised when no weighted member of an ensemble produced a result"""
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse "name=weight,name=weight" (e.g. ENSEMBLE_WEIGHTS) into a dict"""
+    weights: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, sep, weight = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid ensemble weight '{item}', expected name=weight")
+        weights[name.strip()] = float(weight)
+        if weights[name.strip()] < 0:
+            raise ValueError(f"Ensemble weight of {name.strip()} is negative")
+    return weights
+
+
+@dataclass(frozen=True)
+class EnsembleMember:
+    """A model of the ensemble and the columns of the shared matrix it reads"""
+
+    name: str
+    weight: float
+    columns: npt.NDArray[np.intp]
+
+
+@dataclass
+class EnsembleResult:
+    """Combined probability per row, each member's and how each member did"""
+
+    probabilities: List[float]
+    members: List[EnsembleMemberResult]
+    member_probabilities: Dict[str, List[float]]
+
+
+class ModelEnsemble:
+    """
+    Weighted average of several models' probabilities, within a time budget.
+
+    Every member is scored concurrently on its columns of one shared feature
+    matrix. Members still running when the budget runs out are dropped from
+    the result (their calls finish in the background) and the weights of the
+    members that answered are renormalized. A weight of 0 runs the member in
+    shadow: it is timed and reported but does not count.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[str],
+        member_columns: Dict[str, Sequence[str]],
+        weights: Dict[str, float],
+        budget_ms: float = 250.0,
+    ) -> None:
+        self.name = name
+        self.columns = tuple(columns)
+        self.budget_ms = budget_ms
+
+        unknown = set(weights) - set(member_columns)
+        if unknown:
+            raise ValueError(f"Unknown {name} ensemble members: {sorted(unknown)}")
+        if not any(weight > 0 for weight in weights.values()):
+            raise ValueError(f"The {name} ensemble needs a member with a weight")
+        index = {column: i for i, column in enumerate(self.columns)}
+        self.members = [
+            EnsembleMember(
+                name=member,
+                weight=weight,
+                columns=np.array(
+                    [index[column] for column in member_columns[member]],
+                    dtype=np.intp,
+                ),
+            )
+            for member, weight in weights.items()
+        ]
+
+        self._background: Set[asyncio.Task[List[float]]] = set()
+        self.requests_total = 0
+        self.counts: Dict[str, Dict[str, int]] = {
+            member.name: {"ok": 0, "timeout": 0, "error": 0} for member in self.members
+        }
+
+    def member(self, name: str) -> EnsembleMember:
+        for member in self.members:
+            if member.name == name:
+                return member
+        raise KeyError(f"Unknown {self.name} ensemble member '{name}'")
+
+    def member_input(
+        self, name: str, matrix: npt.NDArray[np.float32]
+    ) -> npt.NDArray[np.float32]:
+        """The member's columns of the shared matrix, in its feature order"""
+        return np.ascontiguousarray(matrix[:, self.member(name).columns])
+
+    async def run(
+        self,
+        score: MemberScorer,
+        matrix: npt.NDArray[np.float32],
+        budget_ms: Optional[float] = None,
+    ) -> EnsembleResult:
+        """Score the matrix with every member and combine what came back in time"""
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+        finished_ms: Dict[str, float] = {}
+
+        def timed(name: str) -> "asyncio.Task[List[float]]":
+            task = asyncio.ensure_future(score(name, matrix))
+            task.add_done_callback(
+                lambda _: finished_ms.setdefault(
+                    name, (time.perf_counter() - start) * 1000
+                )
+            )
+            return task
+
+        tasks = {member.name: timed(member.name) for member in self.members}
+        await asyncio.wait(tasks.values(), timeout=budget_ms / 1000)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        results: List[EnsembleMemberResult] = []
+        member_probabilities: Dict[str, List[float]] = {}
+        total = np.zeros(len(matrix), dtype=np.float64)
+        total_weight = 0.0
+        for member in self.members:
+            task = tasks[member.name]
+            result = EnsembleMemberResult(
+                name=member.name,
+                weight=member.weight,
+                status="ok",
+                latency_ms=finished_ms.get(member.name, elapsed_ms),
+            )
+            if not task.done():
+                # Not cancelled: the pool call cannot be interrupted, and it
+                # must keep holding the model's concurrency slot until it ends
+                self._background.add(task)
+                task.add_done_callback(self._discard_background)
+                result.status = "timeout"
+                result.detail = f"No result within {budget_ms:g} ms"
+            elif task.exception() is not None:
+                result.status = "error"
+                result.detail = str(task.exception()) or type(task.exception()).__name__
+                log.warning(f"Ensemble member {member.name} failed: {result.detail}")
+            else:
+                member_probabilities[member.name] = task.result()
+                probabilities = np.asarray(task.result(), dtype=np.float64)
+                if len(probabilities) == 1:
+                    result.probability = float(probabilities[0])
+                if member.weight > 0:
+                    total += member.weight * probabilities
+                    total_weight += member.weight
+            self.counts[member.name][result.status] += 1
+            results.append(result)
+
+        self.requests_total += 1
+        if total_weight == 0:
+            raise EnsembleUnavailableError(
+                f"No weighted {self.name} ensemble member produced a result "
+                f"within {budget_ms:g} ms"
+            )
+        return EnsembleResult(
+            (total / total_weight).tolist(), results, member_probabilities
+        )
+
+    def _discard_background(self, task: "asyncio.Task[List[float]]") -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning(f"Dropped ensemble member call failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Members, weights and per-member outcome counts for health endpoints"""
+        return {
+            "budget_ms": self.budget_ms,
+            "weights": {member.name: member.weight for member in self.members},
+            "requests_total": self.requests_total,
+            "members": {name: dict(counts) for name, counts in self.counts.items()},
+            "background": len(self._background),
+        }
@@ -0,0 +1,143 @@
+import asyncio
+import importlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+EXECUTOR_MODES = ("thread", "process", "inline")
+
+
+class InferenceOverloadedError(Exception):
+    """Raised when a model's inference queue is full"""
+
+
+class ServiceCall:
+    """
+    Picklable reference to a method of a global prediction service.
+
+    Process pool workers cannot receive the service objects themselves (they
+    hold the model and asyncio state), so they resolve the service by name from
+    `app.services.prediction` on first use and keep their own copy loaded.
+    """
+
+    def __init__(self, service_name: str, method_name: str) -> None:
+        self.service_name = service_name
+        self.method_name = method_name
+
+    def __call__(self, *args: Any) -> Any:
+        services = importlib.import_module("app.services.prediction")
+        service = getattr(services, self.service_name)
+        return getattr(service, self.method_name)(*args)
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound preprocessing and inference off the asyncio event loop.
+
+    Each model gets at most `model_concurrency` calls running at once and at
+    most `max_queue` calls waiting or running; further calls are rejected with
+    InferenceOverloadedError instead of piling up behind the pool.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 4,
+        model_concurrency: int = 4,
+        max_queue: int = 256,
+    ) -> None:
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(
+                f"Unknown inference executor mode '{mode}', expected one of {EXECUTOR_MODES}"
+            )
+        self.mode = mode
+        self.max_workers = max_workers
+        self.model_concurrency = model_concurrency
+        self.max_queue = max_queue
+
+        self._pool: Optional[Executor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._queued: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self.rejected_total = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            log.info(f"Started {self.mode} inference pool ({self.max_workers} workers)")
+        return self._pool
+
+    def _get_semaphore(self, model_name: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop that first waits on them
+            self._loop = loop
+            self._semaphores = {}
+        if model_name not in self._semaphores:
+            self._semaphores[model_name] = asyncio.Semaphore(self.model_concurrency)
+        return self._semaphores[model_name]
+
+    async def run(self, model_name: str, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on the pool under the model's concurrency limit"""
+        if self.mode == "inline":
+            return fn(*args)
+
+        queued = self._queued.get(model_name, 0)
+        if queued >= self.max_queue:
+            self.rejected_total += 1
+            raise InferenceOverloadedError(
+                f"Inference queue for {model_name} is full ({self.max_queue} pending)"
+            )
+
+        self._queued[model_name] = queued + 1
+        try:
+            async with self._get_semaphore(model_name):
+                self._running[model_name] = self._running.get(model_name, 0) + 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_pool(), fn, *args)
+                finally:
+                    self._running[model_name] -= 1
+        finally:
+            self._queued[model_name] -= 1
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Executor configuration and per-model load for health endpoints"""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "model_concurrency": self.model_concurrency,
+            "max_queue": self.max_queue,
+            "running": dict(self._running),
+            "queued": {
+                name: count - self._running.get(name, 0)
+                for name, count in self._queued.items()
+            },
+            "rejected_total": self.rejected_total,
+        }
+
+
+# Global instance shared by all prediction services
+inference_executor = InferenceExecutor(
+    mode=settings.inference_executor,
+    max_workers=settings.inference_max_workers,
+    model_concurrency=settings.inference_model_concurrency,
+    max_queue=settings.inference_max_queue,
+)
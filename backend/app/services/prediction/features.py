@@ -0,0 +1,223 @@
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+Transform = Callable[[npt.NDArray[np.float64]], npt.NDArray[np.float64]]
+
+
+def _log_plus_one(values: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    # log(x + 1) rather than np.log1p: this is the exact form used in training
+    return np.log(np.add(values, 1.0))
+
+
+# Transforms available to derived features, keyed by name
+TRANSFORMS: Dict[str, Transform] = {
+    "log_plus_one": _log_plus_one,
+}
+
+
+@dataclass(frozen=True)
+class DerivedFeature:
+    """A model feature computed from one base column"""
+
+    name: str
+    source: str
+    transform: str
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    Declarative description of a model's input features.
+
+    The model input is `base_columns` (taken from the request as-is) followed by
+    `derived` features, unless `order` gives an explicit column order.
+    """
+
+    base_columns: Tuple[str, ...]
+    derived: Tuple[DerivedFeature, ...] = ()
+    order: Optional[Tuple[str, ...]] = None
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return self.order or self.base_columns + tuple(d.name for d in self.derived)
+
+    def compile(self) -> "CompiledFeatureSpec":
+        return CompiledFeatureSpec(self)
+
+
+@dataclass
+class CompiledFeatureSpec:
+    """
+    A FeatureSpec resolved into index maps and vectorized NumPy steps.
+
+    Every entry point gathers the base columns into a float64 matrix once and
+    writes the float32 model input into a (optionally preallocated) buffer, so
+    the same code path serves one row or a million.
+    """
+
+    spec: FeatureSpec
+    columns: Tuple[str, ...] = field(init=False)
+    base_columns: Tuple[str, ...] = field(init=False)
+    _base_slots: npt.NDArray[np.intp] = field(init=False, repr=False)
+    _steps: List[Tuple[int, int, Transform]] = field(init=False, repr=False)
+    _getter: Callable[[Any], Any] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.columns = self.spec.columns
+        self.base_columns = self.spec.base_columns
+
+        derived_names = [d.name for d in self.spec.derived]
+        expected = set(self.base_columns) | set(derived_names)
+        if len(self.columns) != len(expected) or set(self.columns) != expected:
+            raise ValueError(f"Feature order {self.columns} does not match the spec")
+
+        slot = {name: i for i, name in enumerate(self.columns)}
+        base_index = {name: i for i, name in enumerate(self.base_columns)}
+        self._base_slots = np.array(
+            [slot[name] for name in self.base_columns], dtype=np.intp
+        )
+        self._steps = []
+        for derived in self.spec.derived:
+            if derived.source not in base_index:
+                raise ValueError(f"Unknown source column '{derived.source}'")
+            if derived.transform not in TRANSFORMS:
+                raise ValueError(f"Unknown feature transform '{derived.transform}'")
+            self._steps.append(
+                (
+                    base_index[derived.source],
+                    slot[derived.name],
+                    TRANSFORMS[derived.transform],
+                )
+            )
+        self._getter = operator.attrgetter(*self.base_columns)
+
+    def allocate(self, rows: int) -> npt.NDArray[np.float32]:
+        return np.empty((rows, len(self.columns)), dtype=np.float32)
+
+    def from_base(
+        self,
+        base: npt.NDArray[np.float64],
+        out: Optional[npt.NDArray[np.float32]] = None,
+    ) -> npt.NDArray[np.float32]:
+        """Build model input from a (rows, base_columns) matrix"""
+        if out is None:
+            out = self.allocate(len(base))
+        out[:, self._base_slots] = base
+        for source, target, transform in self._steps:
+            out[:, target] = transform(base[:, source])
+        return out
+
+    def from_models(
+        self,
+        items: Sequence[Any],
+        out: Optional[npt.NDArray[np.float32]] = None,
+    ) -> npt.NDArray[np.float32]:
+        """Build model input from request objects (e.g. pydantic models)"""
+        base = np.array([self._getter(item) for item in items], dtype=np.float64)
+        return self.from_base(base.reshape(len(items), len(self.base_columns)), out)
+
+    def from_frame(
+        self, df: Any, out: Optional[npt.NDArray[np.float32]] = None
+    ) -> npt.NDArray[np.float32]:
+        """Build model input from a pandas DataFrame containing the base columns"""
+        base = df[list(self.base_columns)].to_numpy(dtype=np.float64)
+        return self.from_base(base, out)
+
+
+# Features expected by the Kepler RF model (keep same as trained)
+KEPLER_FEATURE_SPEC = FeatureSpec(
+    base_columns=(
+        "koi_fpflag_nt",
+        "koi_fpflag_ss",
+        "koi_fpflag_co",
+        "koi_fpflag_ec",
+        "koi_period",
+        "koi_time0bk",
+        "koi_impact",
+        "koi_duration",
+        "koi_depth",
+        "koi_prad",
+        "koi_teq",
+        "koi_insol",
+        "koi_model_snr",
+        "koi_tce_plnt_num",
+        "koi_steff",
+        "koi_slogg",
+        "koi_srad",
+        "ra",
+        "dec",
+        "koi_kepmag",
+    ),
+)
+
+# Features of the full Kepler XGBoost model (xgb_full_train): the RF features
+# and the uncertainties of the measured ones, in training order. The ensemble
+# builds this matrix once and gives each member its own columns of it
+KEPLER_FULL_FEATURE_SPEC = FeatureSpec(
+    base_columns=(
+        "koi_fpflag_nt",
+        "koi_fpflag_ss",
+        "koi_fpflag_co",
+        "koi_fpflag_ec",
+        "koi_period",
+        "koi_period_err1",
+        "koi_period_err2",
+        "koi_time0bk",
+        "koi_time0bk_err1",
+        "koi_time0bk_err2",
+        "koi_impact",
+        "koi_impact_err1",
+        "koi_impact_err2",
+        "koi_duration",
+        "koi_duration_err1",
+        "koi_duration_err2",
+        "koi_depth",
+        "koi_depth_err1",
+        "koi_depth_err2",
+        "koi_prad",
+        "koi_prad_err1",
+        "koi_prad_err2",
+        "koi_teq",
+        "koi_insol",
+        "koi_insol_err1",
+        "koi_insol_err2",
+        "koi_model_snr",
+        "koi_tce_plnt_num",
+        "koi_steff",
+        "koi_steff_err1",
+        "koi_steff_err2",
+        "koi_slogg",
+        "koi_slogg_err1",
+        "koi_slogg_err2",
+        "koi_srad",
+        "koi_srad_err1",
+        "koi_srad_err2",
+        "ra",
+        "dec",
+        "koi_kepmag",
+    ),
+)
+
+# Features expected by the TESS XGBoost model: 9 base features followed by
+# the log transforms applied in training
+TESS_FEATURE_SPEC = FeatureSpec(
+    base_columns=(
+        "pl_orbper",
+        "pl_trandurh",
+        "pl_trandep",
+        "pl_rade",
+        "pl_insol",
+        "pl_eqt",
+        "st_teff",
+        "st_logg",
+        "st_rad",
+    ),
+    derived=(
+        DerivedFeature("pl_orbper_log", "pl_orbper", "log_plus_one"),
+        DerivedFeature("pl_trandep_log", "pl_trandep", "log_plus_one"),
+    ),
+)
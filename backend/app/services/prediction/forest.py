@@ -0,0 +1,274 @@
+import io
+import mmap
+import os
+import struct
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+# Rows evaluated together: small enough for the per-(tree, row) node indexes
+# to stay in cache
+EVAL_CHUNK_ROWS = 256
+
+# Arrays stored in a flattened forest file, besides the metadata
+ARRAY_FIELDS = ("feature", "threshold", "left", "right", "value", "roots", "classes")
+
+# Array data in saved files starts on this boundary, so mapped arrays are
+# aligned; the zip entries are padded with an extra field (as zipalign does)
+FILE_ALIGN = 64
+ALIGN_EXTRA_ID = 0xD935
+
+
+def _map_arrays(path: str, names: Tuple[str, ...]) -> Dict[str, npt.NDArray[Any]]:
+    """Read-only views of arrays stored uncompressed in an .npz file"""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in names:
+            info = zf.getinfo(f"{name}.npy")
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Cannot memory-map compressed array '{name}'")
+            # Local file header: 30 bytes, then the name and extra field
+            name_len, extra_len = struct.unpack_from(
+                "<HH", buffer, info.header_offset + 26
+            )
+            start = info.header_offset + 30 + name_len + extra_len
+            header = io.BytesIO(buffer[start : start + 65536])
+            version = np.lib.format.read_magic(header)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(header)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(header)
+            array = np.frombuffer(
+                buffer,
+                dtype=dtype,
+                count=int(np.prod(shape)),
+                offset=start + header.tell(),
+            )
+            arrays[name] = array.reshape(shape, order="F" if fortran else "C")
+    return arrays
+
+
+@dataclass
+class FlatForest:
+    """
+    A fitted sklearn tree ensemble classifier flattened into contiguous arrays.
+
+    The nodes of every tree are concatenated: `feature`/`threshold` hold the
+    split of each node, `left`/`right` the global index of its children and
+    `value` its class fractions (leaves point at themselves). A batch walks
+    all trees level by level, one vectorized step per level for every
+    (tree, row) traversal not yet at a leaf. Splits compare the float32 input against the float64 threshold and
+    tree fractions are summed in tree order, exactly as sklearn does.
+    """
+
+    feature: npt.NDArray[np.int32]
+    threshold: npt.NDArray[np.float64]
+    left: npt.NDArray[np.int32]
+    right: npt.NDArray[np.int32]
+    value: npt.NDArray[np.float64]  # (nodes, classes)
+    roots: npt.NDArray[np.int32]  # first node of each tree
+    classes: npt.NDArray[Any]
+    max_depth: int
+    n_features: int
+    source_version: str = ""  # version of the model file this was built from
+
+    # Derived lookup tables for the evaluator
+    _children: npt.NDArray[np.int32] = field(init=False, repr=False)
+    _is_leaf: npt.NDArray[np.bool_] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # children[2 * node + went_left] is the next node of a traversal
+        self._children = np.empty(2 * len(self.left), dtype=np.int32)
+        self._children[0::2] = self.right
+        self._children[1::2] = self.left
+        self._is_leaf = self.left == np.arange(len(self.left))
+
+    @property
+    def classes_(self) -> npt.NDArray[Any]:
+        """sklearn-compatible alias of `classes`"""
+        return self.classes
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAY_FIELDS)
+
+    @classmethod
+    def from_sklearn(cls, model: Any, source_version: str = "") -> "FlatForest":
+        """Flatten a fitted RandomForestClassifier (or ExtraTreesClassifier)"""
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests can be flattened")
+
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value[:, 0, :])
+
+        value = np.concatenate(values).astype(np.float64)
+        if np.any(value.sum(axis=1) > 1.0 + 1e-9):
+            # Trees from sklearn < 1.4 store class counts rather than fractions
+            value = value / value.sum(axis=1, keepdims=True)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.ascontiguousarray(value),
+            roots=offsets[:-1].astype(np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=int(model.n_features_in_),
+            source_version=source_version,
+        )
+
+    def predict_proba(self, X: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        """Class probabilities per row, in the order of `classes`"""
+        # Trees are evaluated on float32 inputs, as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected input of shape (rows, {self.n_features}), got {X.shape}"
+            )
+        out = np.empty((len(X), len(self.classes)), dtype=np.float64)
+        for start in range(0, len(X), EVAL_CHUNK_ROWS):
+            chunk = X[start : start + EVAL_CHUNK_ROWS]
+            out[start : start + len(chunk)] = self._predict_chunk(chunk)
+        return out
+
+    def _predict_chunk(self, X: npt.NDArray[np.float32]) -> npt.NDArray[np.float64]:
+        n_rows, n_trees = len(X), self.n_trees
+        # One entry per (tree, row), tree-major; `active` holds the entries
+        # still at a split, so each level only touches unfinished traversals
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(
+            np.arange(n_rows, dtype=np.int32) * self.n_features, n_trees
+        )
+        flat_X = X.ravel()
+
+        active = np.flatnonzero(~self._is_leaf[nodes])
+        current, offsets = nodes[active], row_offsets[active]
+        while len(active):
+            went_left = (
+                flat_X[offsets + self.feature[current]] <= self.threshold[current]
+            )
+            current = self._children[2 * current + went_left]
+            nodes[active] = current
+            split = ~self._is_leaf[current]
+            active, current, offsets = active[split], current[split], offsets[split]
+
+        leaf_values = self.value[nodes].reshape(n_trees, n_rows, -1)
+        # Sum tree by tree (cumsum is sequential) to round like sklearn does
+        return np.cumsum(leaf_values, axis=0)[-1] / n_trees
+
+    def predict(self, X: npt.ArrayLike) -> npt.NDArray[Any]:
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path: str) -> None:
+        """
+        Write an uncompressed .npz file with every array 64-byte aligned. The
+        file is replaced atomically: processes that mapped the old one keep it.
+        """
+        arrays: Dict[str, Any] = {name: getattr(self, name) for name in ARRAY_FIELDS}
+        arrays.update(
+            max_depth=np.int64(self.max_depth),
+            n_features=np.int64(self.n_features),
+            source_version=np.str_(self.source_version),
+        )
+        tmp_path = f"{path}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as zf:
+            assert zf.fp is not None
+            for name, array in arrays.items():
+                data = io.BytesIO()
+                np.lib.format.write_array(data, np.asanyarray(array))
+                info = zipfile.ZipInfo(f"{name}.npy", date_time=(1980, 1, 1, 0, 0, 0))
+                # .npy headers are padded to 64 bytes, so aligning the end of
+                # the local file header aligns the array data
+                header_end = zf.fp.tell() + 30 + len(info.filename) + 4
+                padding = -header_end % FILE_ALIGN
+                info.extra = struct.pack("<HH", ALIGN_EXTRA_ID, padding) + bytes(
+                    padding
+                )
+                zf.writestr(info, data.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, memory_map: bool = False) -> "FlatForest":
+        """
+        Load a saved forest. With memory_map the arrays are read-only views of the
+        file, so every process that loads it shares the same physical pages.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if memory_map:
+                arrays = _map_arrays(path, ARRAY_FIELDS)
+            else:
+                arrays = {name: data[name] for name in ARRAY_FIELDS}
+            return cls(
+                **arrays,
+                max_depth=int(data["max_depth"]),
+                n_features=int(data["n_features"]),
+                source_version=str(data["source_version"]),
+            )
+
+
+class SizedForest:
+    """
+    A FlatForest for small batches and the sklearn forest it was built from
+    for batches of `sklearn_min_rows` rows or more, where sklearn's compiled
+    per-tree walk overtakes the flat arrays (benchmarks/kepler_rf_engine.py
+    measures the crossover). Both return identical probabilities. The sklearn
+    forest is loaded on the first large batch; 0 keeps every batch flat.
+    """
+
+    def __init__(
+        self,
+        flat: FlatForest,
+        load_sklearn: Callable[[], Any],
+        sklearn_min_rows: int,
+        sklearn: Optional[Any] = None,
+    ) -> None:
+        self.flat = flat
+        self.sklearn_min_rows = sklearn_min_rows
+        self._load_sklearn = load_sklearn
+        self._sklearn = sklearn
+        self._lock = threading.Lock()
+
+    @property
+    def classes_(self) -> npt.NDArray[Any]:
+        return self.flat.classes
+
+    def uses_sklearn(self, rows: int) -> bool:
+        return 0 < self.sklearn_min_rows <= rows
+
+    def sklearn(self) -> Any:
+        """The sklearn forest, loaded once by the first caller"""
+        if self._sklearn is None:
+            with self._lock:
+                if self._sklearn is None:
+                    self._sklearn = self._load_sklearn()
+        return self._sklearn
+
+    def predict_proba(self, X: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        X = np.asarray(X, dtype=np.float32)
+        if self.uses_sklearn(len(X)):
+            return np.asarray(self.sklearn().predict_proba(X), dtype=np.float64)
+        return self.flat.predict_proba(X)
+
+    def predict(self, X: npt.ArrayLike) -> npt.NDArray[Any]:
+        return self.flat.classes[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,179 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel
+from sqlalchemy import Table, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import PredictionRequest, TessPredictionRequest
+from app.models.inputs import PredictionInput
+from app.utilities.sql import insert_ignore
+
+
+@dataclass(frozen=True)
+class InputSchema:
+    """Layout of a packed input: request fields in order, little-endian float64"""
+
+    schema_id: int
+    mission: str
+    columns: Tuple[str, ...]
+    dtype: np.dtype[Any] = np.dtype("<f8")
+
+    @property
+    def row_bytes(self) -> int:
+        return len(self.columns) * self.dtype.itemsize
+
+    def pack(self, payload: BaseModel) -> bytes:
+        values = [getattr(payload, column) for column in self.columns]
+        return np.asarray(values, dtype=self.dtype).tobytes()
+
+
+# Published layouts are never changed, since stored blobs are read with the
+# layout their schema_id names: when a request model gains or loses fields,
+# register a new id (with the old columns spelled out for the old one).
+INPUT_SCHEMAS: Dict[int, InputSchema] = {
+    schema.schema_id: schema
+    for schema in (
+        InputSchema(1, "kepler", tuple(PredictionRequest.model_fields)),
+        InputSchema(2, "tess", tuple(TessPredictionRequest.model_fields)),
+    )
+}
+# Layout new inputs are written with
+CURRENT_SCHEMAS: Dict[str, InputSchema] = {
+    "kepler": INPUT_SCHEMAS[1],
+    "tess": INPUT_SCHEMAS[2],
+}
+
+# (schema_id, features, input_data) as stored in prediction_inputs
+StoredInput = Tuple[Optional[int], Optional[bytes], Optional[str]]
+
+
+def input_hash(mission: str, payload: BaseModel) -> str:
+    """
+    Content address of a request payload: a hash of its field values in
+    declaration order, so equal payloads share one prediction_inputs row.
+    """
+    values = np.array(list(payload.model_dump().values()), dtype=np.float64)
+    # Adding 0.0 folds -0.0 into 0.0 so equal values hash equally
+    digest = hashlib.blake2b(mission.encode() + b"\0", digest_size=16)
+    digest.update((values + 0.0).tobytes())
+    return digest.hexdigest()
+
+
+def input_rows(
+    mission: str, payloads: Sequence[BaseModel]
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Return the input hash of each payload, in order, and the prediction_inputs
+    rows for them (one per distinct hash).
+    """
+    schema = CURRENT_SCHEMAS[mission]
+    hashes = [input_hash(mission, payload) for payload in payloads]
+    now = datetime.now()
+    rows = {
+        key: {
+            "input_hash": key,
+            "mission": mission,
+            "schema_id": schema.schema_id,
+            "features": schema.pack(payload),
+            "input_data": None,
+            "created_at": now,
+        }
+        for key, payload in zip(hashes, payloads)
+    }
+    return hashes, list(rows.values())
+
+
+async def store_inputs(
+    db: AsyncSession, mission: str, payloads: Sequence[BaseModel]
+) -> List[str]:
+    """
+    Insert any payloads not yet stored and return the input hash of each
+    payload, in order. Runs inside the caller's transaction.
+    """
+    hashes, rows = input_rows(mission, payloads)
+    await insert_inputs(db, rows)
+    return hashes
+
+
+async def insert_inputs(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert prediction_inputs rows, skipping hashes that already exist"""
+    table = PredictionInput.__table__  # type: ignore[attr-defined]
+    await db.execute(insert_ignore(db.get_bind().dialect.name, table), rows)
+
+
+def decode_inputs(
+    schema: InputSchema, rows: Sequence[StoredInput]
+) -> npt.NDArray[np.float64]:
+    """
+    Decode stored inputs into a (rows, schema.columns) matrix. Rows packed
+    with this schema are read straight from their blobs in one pass; legacy
+    JSON rows and rows packed with another layout are mapped by field name,
+    with missing fields (and rows without any stored input) left as NaN.
+    """
+    out = np.full((len(rows), len(schema.columns)), np.nan)
+    packed = [
+        i
+        for i, (schema_id, blob, _) in enumerate(rows)
+        if schema_id == schema.schema_id and blob is not None
+    ]
+    if packed:
+        blobs = b"".join(rows[i][1] or b"" for i in packed)
+        matrix = np.frombuffer(blobs, dtype=schema.dtype)
+        out[packed] = matrix.reshape(len(packed), len(schema.columns))
+        if len(packed) == len(rows):
+            return out
+
+    column_index = {column: i for i, column in enumerate(schema.columns)}
+    done = set(packed)
+    for i, (schema_id, blob, input_data) in enumerate(rows):
+        if i in done:
+            continue
+        values: Dict[str, Any]
+        if schema_id is not None and blob is not None:
+            other = INPUT_SCHEMAS[schema_id]
+            values = dict(zip(other.columns, np.frombuffer(blob, dtype=other.dtype)))
+        elif input_data is not None:
+            values = json.loads(input_data)
+        else:
+            continue
+        for column, value in values.items():
+            if column in column_index:
+                out[i, column_index[column]] = value
+    return out
+
+
+async def load_input_matrix(
+    db: AsyncSession, mission: str, records: Table, user_id: Optional[int] = None
+) -> Tuple[List[str], npt.NDArray[np.float64]]:
+    """
+    Read the inputs of a mission's prediction records, oldest first, as the
+    prediction ids and a (rows, request fields) matrix. Records that still
+    carry inline JSON and inputs stored before packing are read transparently.
+    """
+    inputs = PredictionInput.__table__  # type: ignore[attr-defined]
+    query = (
+        select(
+            records.c.prediction_id,
+            inputs.c.schema_id,
+            inputs.c.features,
+            func.coalesce(inputs.c.input_data, records.c.input_data),
+        )
+        .select_from(
+            records.outerjoin(inputs, records.c.input_hash == inputs.c.input_hash)
+        )
+        .order_by(records.c.id)
+    )
+    if user_id:
+        query = query.where(records.c.user_id == user_id)
+
+    rows = (await db.execute(query)).all()
+    matrix = decode_inputs(
+        CURRENT_SCHEMAS[mission], [(row[1], row[2], row[3]) for row in rows]
+    )
+    return [row[0] for row in rows], matrix
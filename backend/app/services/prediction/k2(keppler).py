@@ -1,135 +1,336 @@
+import asyncio
 import os
-import json
 import uuid
-from typing import Any, List, Optional, cast
+from datetime import date, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple, cast
 import numpy as np
 import numpy.typing as npt
-import pandas as pd
-from sqlalchemy import desc
+from sqlalchemy import desc, literal, tuple_
+from sqlalchemy import select as sa_select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
-from app.models.user import User
-
-from joblib import load  # for sklearn models
+from sqlmodel import col, select
+from app.services.auth.user_cache import known_users
 
+from app.models.purge import PurgeJob
+from app.models.summary import PredictionStats
 from app.models.prediction import (
+    CascadePredictionResponse,
+    EnsemblePredictionResponse,
     PredictionRequest,
     PredictionResponse,
     PredictionRecord,
 )
+from app.config import settings
+from app.services.prediction.batching import MicroBatcher
+from app.services.prediction.cache import PredictionCache
+from app.services.prediction.executor import ServiceCall, inference_executor
+from app.services.prediction.booster import NativeBooster
+from app.services.prediction.cascade import FlagRules, ModelCascade
+from app.services.prediction.dense import DenseNetwork
+from app.services.prediction.ensemble import ModelEnsemble, parse_weights
+from app.services.prediction.features import (
+    KEPLER_FEATURE_SPEC,
+    KEPLER_FULL_FEATURE_SPEC,
+)
+from app.services.prediction.forest import FlatForest, SizedForest
+from app.services.prediction.inputs import load_input_matrix, store_inputs
+from app.services.prediction.purge import purge_manager
+from app.services.prediction.registry import model_registry
+from app.services.prediction.summary import get_stats, get_total, update_summary
+from app.services.prediction.write_behind import (
+    commit_predictions,
+    persist_prediction,
+)
 from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import stage_timer
+from app.utilities.pagination import decode_cursor, encode_cursor
+
+# pandas only types the catalog scoring path (app.cli.score)
+if TYPE_CHECKING:
+    import pandas as pd
 
 log = get_logger(__name__)
 
 
-def find_model_file() -> str:
-    """Find the Random Forest model file in various possible locations"""
-    possible_paths = [
-        os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "../../models/rf_model.joblib"
-        ),
-        os.path.join(os.getcwd(), "models/rf_model.joblib"),
-        "/app/models/rf_model.joblib",  # Docker path
-        os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "../../../models/rf_model.joblib",
-        ),
-        "/home/mrzoro/Desktop/Hackathon/exovision/backend/models/rf_model.joblib",
-    ]
+# Registry name of the RF model, and its file when the manifest does not list it
+MODEL_NAME = "kepler_rf"
+DEFAULT_MODEL_FILE = "rf_model.joblib"
+
+# The other Kepler models, served by the ensemble mode
+XGB_MODEL_NAME = "kepler_xgb"
+DEFAULT_XGB_MODEL_FILE = "xgb_full_train.joblib"
+ANN_MODEL_NAME = "kepler_ann"
+DEFAULT_ANN_MODEL_FILE = "kepler_ann.keras"
 
-    for path in possible_paths:
-        abs_path = os.path.abspath(path)
-        if os.path.exists(abs_path):
-            return abs_path
 
-    raise FileNotFoundError(
-        f"Model file 'rf_model.joblib' not found in any expected locations: {possible_paths}"
-    )
+def flat_model_path(model_path: str) -> str:
+    """Where the flattened copy of a forest model file is kept"""
+    return os.path.splitext(model_path)[0] + ".flat.npz"
 
 
 class PredictionService:
     def __init__(self) -> None:
-        self.model = None
-        self.model_path = find_model_file()
-        # Features expected by the RF model (keep same as trained)
-        self.feature_columns = [
-            "koi_fpflag_nt",
-            "koi_fpflag_ss",
-            "koi_fpflag_co",
-            "koi_fpflag_ec",
-            "koi_period",
-            "koi_time0bk",
-            "koi_impact",
-            "koi_duration",
-            "koi_depth",
-            "koi_prad",
-            "koi_teq",
-            "koi_insol",
-            "koi_model_snr",
-            "koi_tce_plnt_num",
-            "koi_steff",
-            "koi_slogg",
-            "koi_srad",
-            "ra",
-            "dec",
-            "koi_kepmag",
-        ]
+        self.model_name = MODEL_NAME
+        model_registry.register(MODEL_NAME, DEFAULT_MODEL_FILE, self._load_model_file)
+        # Features expected by the RF model, compiled once into index maps
+        self.features = KEPLER_FEATURE_SPEC.compile()
+        self.feature_columns = list(self.features.base_columns)
+
+        # Ensemble mode: every member reads its columns of one matrix of the
+        # full feature set (the RF and ANN use the RF features)
+        model_registry.register(
+            XGB_MODEL_NAME, DEFAULT_XGB_MODEL_FILE, self._load_xgb_file
+        )
+        model_registry.register(
+            ANN_MODEL_NAME, DEFAULT_ANN_MODEL_FILE, self._load_ann_file
+        )
+        self.full_features = KEPLER_FULL_FEATURE_SPEC.compile()
+        self.ensemble = ModelEnsemble(
+            "kepler",
+            self.full_features.columns,
+            {
+                MODEL_NAME: self.features.columns,
+                XGB_MODEL_NAME: self.full_features.columns,
+                ANN_MODEL_NAME: self.features.columns,
+            },
+            parse_weights(settings.ensemble_weights),
+            budget_ms=settings.ensemble_budget_ms,
+        )
+        self._model_columns = np.array(
+            [self.full_features.columns.index(c) for c in self.features.columns]
+        )
+
+        # Cascade mode: the false positive flags answer flagged KOIs, the rest
+        # are escalated to the RF model or the ensemble
+        if settings.cascade_escalate_to not in ("model", "ensemble"):
+            raise ValueError(
+                f"Unknown CASCADE_ESCALATE_TO: {settings.cascade_escalate_to}"
+            )
+        self.cascade = ModelCascade(
+            "kepler",
+            FlagRules(self.full_features.columns),
+            settings.cascade_escalate_to,
+            margin=settings.cascade_margin,
+        )
+
+        # Identifier columns echoed back when scoring catalog files
+        self.id_columns = ["rowid", "kepid", "kepoi_name"]
+
+        # Coalesces concurrent single-row predictions into one model call
+        self.batcher: MicroBatcher[Tuple[int, float]] = MicroBatcher(
+            "kepler_rf",
+            self._infer_rows,
+            window_ms=settings.microbatch_window_ms,
+            max_batch_size=settings.microbatch_max_size,
+            enabled=settings.microbatch_enabled,
+        )
+
+        # Results keyed by feature row and model version; cleared on reload
+        self.cache: PredictionCache[Tuple[int, float]] = PredictionCache(
+            "kepler_rf",
+            max_entries=settings.prediction_cache_max_entries,
+            ttl_seconds=settings.prediction_cache_ttl_seconds,
+            enabled=settings.prediction_cache_enabled,
+        )
+
+    @property
+    def model(self) -> Any:
+        """The active model, or None before it is first loaded"""
+        loaded = model_registry.active(MODEL_NAME)
+        return loaded.model if loaded is not None else None
+
+    @property
+    def model_path(self) -> str:
+        return model_registry.path(MODEL_NAME)
+
+    async def model_version(self) -> str:
+        """
+        Checksum of the active model file, used to version cached results.
+        Before the first load, the model is loaded off the event loop.
+        """
+        return (await model_registry.resolve(MODEL_NAME)).tag
 
     def load_model(self) -> Any:
-        """Load the trained Random Forest model"""
-        if self.model is None:
-            log.info(f"Loading RF model from: {self.model_path}")
-            if not os.path.exists(self.model_path):
-                raise FileNotFoundError(f"RF model not found at {self.model_path}")
+        """The trained Random Forest model, switching to a new version if published"""
+        return model_registry.get(MODEL_NAME).model
+
+    def _load_model_file(self, path: str, version: str) -> Any:
+        """Load an RF model file for the configured engine"""
+        engine = settings.kepler_rf_engine
+        if engine == "flat":
+            model = self._load_flat_model(path, version)
+        elif engine == "sklearn":
+            from joblib import load  # for sklearn models
+
+            model = load(path)
+        else:
+            raise ValueError(f"Unknown KEPLER_RF_ENGINE: {engine}")
+        log.info(f"RF model loaded successfully from {path} ({engine})")
+        return model
+
+    def _load_flat_model(self, model_path: str, version: str) -> SizedForest:
+        """
+        Load the flattened forest, converting the sklearn model if needed.
+        Large batches go to the sklearn model, loaded when first needed.
+        """
+        from joblib import load  # for sklearn models
+
+        min_rows = settings.kepler_rf_sklearn_min_rows
+        load_sklearn = partial(load, model_path)
+        path = flat_model_path(model_path)
+        if os.path.exists(path):
+            # Mapped from the file, so workers share the arrays' pages
+            forest = FlatForest.load(path, memory_map=True)
+            if forest.source_version == version:
+                return SizedForest(forest, load_sklearn, min_rows)
+            log.warning(f"Ignoring {path}: it was built from another model file")
+        log.info(
+            "Flattening the RF model in memory; run python -m app.cli.flatten_forest "
+            "to save the arrays and skip this at startup"
+        )
+        model = load(model_path)
+        return SizedForest(
+            FlatForest.from_sklearn(model, version),
+            load_sklearn,
+            min_rows,
+            sklearn=model if min_rows > 0 else None,
+        )
+
+    def _load_xgb_file(self, path: str, version: str) -> NativeBooster:
+        """Load the full-feature XGBoost model as a native booster"""
+        from joblib import load  # for sklearn models
+
+        # One thread per call: the ensemble already runs its members in parallel
+        model = NativeBooster.from_sklearn(load(path))
+        log.info(f"XGBoost model loaded successfully from {path}")
+        return model
+
+    def _load_ann_file(self, path: str, version: str) -> DenseNetwork:
+        """Load the Keras ANN's weights for the NumPy forward pass"""
+        model = DenseNetwork.load(path)
+        log.info(f"ANN model loaded successfully from {path}")
+        return model
+
+    def load_ensemble(self) -> None:
+        """Load every ensemble member, logging the ones that cannot be served"""
+        for member in self.ensemble.members:
             try:
-                self.model = load(self.model_path)
-                log.info(f"RF model loaded successfully from {self.model_path}")
+                model_registry.get(member.name)
             except Exception as e:
-                log.error(f"Failed to load RF model: {str(e)}")
-                raise
-        return self.model
+                log.warning(f"Ensemble member {member.name} is unavailable: {e}")
+
+    def reload_model(self) -> None:
+        """Load the model's published version now and drop cached results"""
+        model_registry.load(MODEL_NAME)
+        self.cache.invalidate()
 
     def preprocess_input(self, data: PredictionRequest) -> npt.NDArray[np.float32]:
         """Preprocess input for RF prediction"""
-        input_dict = data.model_dump()
-        df = pd.DataFrame([input_dict])
-        df = df[self.feature_columns]
-        return df.values.astype(np.float32)
+        return self.preprocess_batch([data])
+
+    def preprocess_batch(
+        self, data: Sequence[PredictionRequest]
+    ) -> npt.NDArray[np.float32]:
+        """Preprocess a batch of inputs into a single RF feature matrix"""
+        return self.features.from_models(data)
+
+    def preprocess_frame(self, df: "pd.DataFrame") -> npt.NDArray[np.float32]:
+        """Select the RF features from a frame of KOI rows"""
+        return self.features.from_frame(df)
+
+    def score_matrix(
+        self, model: Any, input_data: npt.NDArray[np.float32]
+    ) -> Tuple[List[int], List[float]]:
+        """Return the predicted class and class-1 probability for every row"""
+        prediction_proba = model.predict_proba(input_data)[
+            :, 1
+        ]  # probability of class 1
+        confidences = prediction_proba.tolist()
+        return [1 if confidence > 0.5 else 0 for confidence in confidences], confidences
+
+    def _score_rows(
+        self, input_data: npt.NDArray[np.float32]
+    ) -> List[Tuple[int, float]]:
+        """Score a feature matrix and return (prediction, confidence) per row"""
+        model = self.load_model()
+        predictions, confidences = self.score_matrix(model, input_data)
+        return list(zip(predictions, confidences))
+
+    def _score_batch(
+        self, data: Sequence[PredictionRequest]
+    ) -> List[Tuple[int, float]]:
+        """Preprocess and score a batch of inputs"""
+        return self._score_rows(self.preprocess_batch(data))
+
+    async def _infer_rows(
+        self, input_data: npt.NDArray[np.float32]
+    ) -> List[Tuple[int, float]]:
+        """Score a feature matrix on the inference executor"""
+        return await inference_executor.run(
+            "kepler_rf", ServiceCall("prediction_service", "_score_rows"), input_data
+        )
+
+    def _score_member(self, name: str, matrix: npt.NDArray[np.float32]) -> List[float]:
+        """Class-1 probability of one ensemble member for every shared matrix row"""
+        model = model_registry.get(name).model
+        proba = model.predict_proba(self.ensemble.member_input(name, matrix))
+        return cast(List[float], proba[:, 1].tolist())
+
+    async def _infer_member(
+        self, name: str, matrix: npt.NDArray[np.float32]
+    ) -> List[float]:
+        """Score an ensemble member on the inference executor"""
+        return await inference_executor.run(
+            name, ServiceCall("prediction_service", "_score_member"), name, matrix
+        )
+
+    async def _predict_row(
+        self, input_row: npt.NDArray[np.float32]
+    ) -> Tuple[int, float]:
+        """Score one feature row through the result cache and micro-batcher"""
+        return await self.cache.get_or_compute(
+            self.cache.key(input_row, await self.model_version()),
+            lambda: self.batcher.submit(input_row),
+        )
+
+    async def _escalate(self, matrix: npt.NDArray[np.float32]) -> List[float]:
+        """Class-1 probability of full-feature rows the cascade could not settle"""
+        if self.cascade.escalate_to == "ensemble":
+            return (await self.ensemble.run(self._infer_member, matrix)).probabilities
+        rows = np.ascontiguousarray(matrix[:, self._model_columns])
+        scores = await asyncio.gather(*(self._predict_row(row) for row in rows))
+        return [confidence for _, confidence in scores]
+
+    async def _ensure_user_exists(
+        self, db: AsyncSession, user_id: Optional[int]
+    ) -> None:
+        """Raise ValueError if a user_id is given but no such user exists"""
+        if user_id and not await known_users.exists(db, user_id):
+            raise ValueError(f"User with ID {user_id} does not exist")
 
     async def predict(
         self, data: PredictionRequest, db: AsyncSession, user_id: Optional[int] = None
     ) -> PredictionResponse:
         """Make a prediction using Random Forest"""
         try:
-            model = self.load_model()
-            input_data = self.preprocess_input(data)
-
-            prediction_proba = model.predict_proba(input_data)[
-                :, 1
-            ]  # probability of class 1
-            confidence = float(prediction_proba[0])
-            prediction = 1 if confidence > 0.5 else 0
+            with stage_timer("kepler", "preprocess"):
+                input_data = self.preprocess_input(data)
+            with stage_timer("kepler", "inference"):
+                prediction, confidence = await self._predict_row(input_data[0])
 
             prediction_id = str(uuid.uuid4())
 
-            if user_id:
-                user_query = select(User).where(User.id == user_id)
-                user_result = await db.execute(user_query)
-                user = user_result.scalar_one_or_none()
-                if not user:
-                    raise ValueError(f"User with ID {user_id} does not exist")
+            await self._ensure_user_exists(db, user_id)
 
             prediction_record = PredictionRecord(
                 prediction_id=prediction_id,
                 user_id=user_id,
                 prediction=prediction,
                 confidence=confidence,
-                input_data=json.dumps(data.model_dump()),
             )
-
-            db.add(prediction_record)
-            await db.commit()
-            await db.refresh(prediction_record)
+            with stage_timer("kepler", "db_commit"):
+                await persist_prediction(db, "kepler", data, prediction_record)
 
             log.info(
                 f"RF Prediction: ID={prediction_id}, Result={prediction}, Confidence={confidence}"
@@ -146,6 +347,154 @@ class PredictionService:
             log.error(f"Prediction failed: {str(e)}")
             raise
 
+    async def predict_ensemble(
+        self,
+        data: PredictionRequest,
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+    ) -> EnsemblePredictionResponse:
+        """
+        Make a prediction with the weighted ensemble of the Kepler models,
+        dropping members that do not answer within the latency budget
+        """
+        try:
+            with stage_timer("kepler", "preprocess"):
+                matrix = self.full_features.from_models([data])
+            with stage_timer("kepler", "inference"):
+                result = await self.ensemble.run(self._infer_member, matrix, budget_ms)
+            confidence = result.probabilities[0]
+            prediction = 1 if confidence > 0.5 else 0
+
+            prediction_id = str(uuid.uuid4())
+
+            await self._ensure_user_exists(db, user_id)
+
+            prediction_record = PredictionRecord(
+                prediction_id=prediction_id,
+                user_id=user_id,
+                prediction=prediction,
+                confidence=confidence,
+            )
+            with stage_timer("kepler", "db_commit"):
+                await persist_prediction(db, "kepler", data, prediction_record)
+
+            log.info(
+                f"Ensemble Prediction: ID={prediction_id}, Result={prediction}, Confidence={confidence}"
+            )
+
+            return EnsemblePredictionResponse(
+                prediction=prediction,
+                confidence=confidence,
+                prediction_id=prediction_id,
+                timestamp=prediction_record.created_at,
+                members=result.members,
+                budget_ms=(self.ensemble.budget_ms if budget_ms is None else budget_ms),
+            )
+
+        except Exception as e:
+            log.error(f"Ensemble prediction failed: {str(e)}")
+            raise
+
+    async def predict_cascade(
+        self, data: PredictionRequest, db: AsyncSession, user_id: Optional[int] = None
+    ) -> CascadePredictionResponse:
+        """
+        Make a prediction from the false positive flags when they settle it,
+        escalating to the RF model (or the ensemble) otherwise
+        """
+        try:
+            with stage_timer("kepler", "preprocess"):
+                matrix = self.full_features.from_models([data])
+            with stage_timer("kepler", "inference"):
+                confidences, stages = await self.cascade.run(matrix, self._escalate)
+            confidence = confidences[0]
+            prediction = 1 if confidence > 0.5 else 0
+
+            prediction_id = str(uuid.uuid4())
+
+            await self._ensure_user_exists(db, user_id)
+
+            prediction_record = PredictionRecord(
+                prediction_id=prediction_id,
+                user_id=user_id,
+                prediction=prediction,
+                confidence=confidence,
+            )
+            with stage_timer("kepler", "db_commit"):
+                await persist_prediction(db, "kepler", data, prediction_record)
+
+            log.info(
+                f"Cascade Prediction: ID={prediction_id}, Result={prediction}, Confidence={confidence}, Stage={stages[0]}"
+            )
+
+            return CascadePredictionResponse(
+                prediction=prediction,
+                confidence=confidence,
+                prediction_id=prediction_id,
+                timestamp=prediction_record.created_at,
+                stage=stages[0],
+            )
+
+        except Exception as e:
+            log.error(f"Cascade prediction failed: {str(e)}")
+            raise
+
+    async def predict_batch(
+        self,
+        data: Sequence[PredictionRequest],
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+    ) -> List[PredictionResponse]:
+        """Make predictions for a batch of inputs with a single RF call"""
+        try:
+            # One vectorized call over the whole batch, off the event loop; the
+            # features are built there too, so preprocessing counts as inference
+            with stage_timer("kepler", "inference"):
+                scores = await inference_executor.run(
+                    "kepler_rf", ServiceCall("prediction_service", "_score_batch"), data
+                )
+
+            await self._ensure_user_exists(db, user_id)
+
+            with stage_timer("kepler", "db_commit"):
+                # Identical payloads in the batch share one prediction_inputs row
+                input_hashes = await store_inputs(db, "kepler", data)
+
+                prediction_records = [
+                    PredictionRecord(
+                        prediction_id=str(uuid.uuid4()),
+                        user_id=user_id,
+                        prediction=prediction,
+                        confidence=confidence,
+                        input_hash=input_hash,
+                    )
+                    for input_hash, (prediction, confidence) in zip(
+                        input_hashes, scores
+                    )
+                ]
+
+                # Persist the whole batch in a single transaction
+                db.add_all(prediction_records)
+                await update_summary(db, "kepler", prediction_records)
+                await commit_predictions(db, user_id)
+
+            log.info(f"RF Batch Prediction: {len(prediction_records)} rows")
+
+            return [
+                PredictionResponse(
+                    prediction=record.prediction,
+                    confidence=record.confidence,
+                    prediction_id=record.prediction_id,
+                    timestamp=record.created_at,
+                )
+                for record in prediction_records
+            ]
+
+        except Exception as e:
+            log.error(f"Batch prediction failed: {str(e)}")
+            raise
+
     async def get_predictions(
         self,
         db: AsyncSession,
@@ -154,32 +503,109 @@ class PredictionService:
         limit: int = 100,
     ) -> List[PredictionResponse]:
         """Get prediction history"""
+        predictions, _ = await self.get_prediction_page(db, user_id, limit, skip=skip)
+        return predictions
+
+    async def get_prediction_page(
+        self,
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[List[PredictionResponse], Optional[str]]:
+        """
+        Get one page of prediction history, newest first, and the cursor of
+        the next page (None on the last page). With a cursor the page is
+        found by a keyset seek on (user_id, created_at, id) instead of OFFSET.
+        """
         try:
-            query = select(PredictionRecord)
+            # sqlmodel's select is only typed for up to four columns
+            query = sa_select(
+                col(PredictionRecord.id),
+                col(PredictionRecord.prediction),
+                col(PredictionRecord.confidence),
+                col(PredictionRecord.prediction_id),
+                col(PredictionRecord.created_at),
+            )
             if user_id:
-                query = query.where(PredictionRecord.user_id == user_id)
+                query = query.where(col(PredictionRecord.user_id) == user_id)
+            if cursor:
+                created_at, row_id = decode_cursor(cursor)
+                query = query.where(
+                    tuple_(col(PredictionRecord.created_at), col(PredictionRecord.id))
+                    < tuple_(literal(created_at), literal(row_id))
+                )
             query = (
-                query.offset(skip)
-                .limit(limit)
-                .order_by(desc(cast(Any, PredictionRecord.created_at)))
+                query.order_by(
+                    desc(cast(Any, PredictionRecord.created_at)),
+                    desc(cast(Any, PredictionRecord.id)),
+                )
+                .offset(skip)
+                .limit(limit + 1)
             )
 
             result = await db.execute(query)
-            predictions = result.scalars().all()
+            rows = result.all()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
 
-            return [
+            predictions = [
                 PredictionResponse(
-                    prediction=pred.prediction,
-                    confidence=pred.confidence,
-                    prediction_id=pred.prediction_id,
-                    timestamp=pred.created_at,
+                    prediction=row.prediction,
+                    confidence=row.confidence,
+                    prediction_id=row.prediction_id,
+                    timestamp=row.created_at,
                 )
-                for pred in predictions
+                for row in rows
             ]
+            return predictions, next_cursor
         except Exception as e:
             log.error(f"Failed to get predictions: {str(e)}")
             raise
 
+    async def count_predictions(
+        self, db: AsyncSession, user_id: Optional[int] = None
+    ) -> int:
+        """Total predictions for a user (or all users) from the maintained summary"""
+        return await get_total(db, "kepler", user_id)
+
+    async def get_stats(
+        self, db: AsyncSession, user_id: Optional[int] = None, days: int = 30
+    ) -> PredictionStats:
+        """Class counts, confidence histogram and daily volume of predictions"""
+        since = date.today() - timedelta(days=days - 1)
+        return await get_stats(db, "kepler", user_id, ("0", "1"), since)
+
+    async def get_prediction(
+        self, db: AsyncSession, prediction_id: str, user_id: Optional[int] = None
+    ) -> Optional[PredictionResponse]:
+        """Get one prediction by ID (a lookup on the unique prediction_id index)"""
+        try:
+            query = select(
+                PredictionRecord.prediction,
+                PredictionRecord.confidence,
+                PredictionRecord.created_at,
+            ).where(PredictionRecord.prediction_id == prediction_id)
+            if user_id:
+                query = query.where(PredictionRecord.user_id == user_id)
+            result = await db.execute(query)
+            row = result.one_or_none()
+            if row is None:
+                return None
+
+            return PredictionResponse(
+                prediction=row.prediction,
+                confidence=row.confidence,
+                prediction_id=prediction_id,
+                timestamp=row.created_at,
+            )
+        except Exception as e:
+            log.error(f"Failed to get prediction {prediction_id}: {str(e)}")
+            raise
+
     async def delete_prediction(
         self, db: AsyncSession, prediction_id: str, user_id: Optional[int] = None
     ) -> bool:
@@ -195,6 +621,7 @@ class PredictionService:
 
             if prediction:
                 await db.delete(prediction)
+                await update_summary(db, "kepler", [prediction], sign=-1)
                 await db.commit()
                 log.info(f"Deleted prediction ID={prediction_id}")
                 return True
@@ -204,6 +631,22 @@ class PredictionService:
             log.error(f"Failed to delete prediction: {str(e)}")
             raise
 
+    async def get_input_matrix(
+        self, db: AsyncSession, user_id: Optional[int] = None
+    ) -> Tuple[List[str], npt.NDArray[np.float64]]:
+        """Prediction ids and stored request inputs (one row each) for re-scoring"""
+        return await load_input_matrix(
+            db, "kepler", PredictionRecord.__table__, user_id
+        )
+
+    async def purge_predictions(self, user_id: Optional[int] = None) -> PurgeJob:
+        """Start deleting all predictions of a user (or everyone) in the background"""
+        return await purge_manager.start("kepler", PredictionRecord.__table__, user_id)
+
+    async def get_purge(self, job_id: str) -> Optional[PurgeJob]:
+        """Progress of a purge, whichever worker runs it"""
+        return await purge_manager.get(job_id, "kepler")
+
 
 # Global instance
 prediction_service = PredictionService()
@@ -0,0 +1,228 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Optional, Set
+
+from sqlalchemy import Table, delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import col
+
+from app.config import settings
+from app.models.purge import ACTIVE_STATUSES, PurgeJob, PurgeJobRecord
+from app.services.prediction.summary import (
+    RECORD_COLUMNS,
+    get_total,
+    update_summary,
+)
+from app.services.prediction.write_behind import write_behind_queue
+from app.utilities.logger import logger as get_logger
+
+log = get_logger(__name__)
+
+# How long a purge waits for queued write-behind records to reach the table
+WRITE_BEHIND_FLUSH_TIMEOUT_S = 5.0
+
+# An active job not updated for this long lost its worker (a chunk commits
+# well within it) and is marked failed
+STALE_JOB_SECONDS = 300.0
+
+# Finished jobs are kept this long for polling
+FINISHED_JOB_RETENTION = timedelta(days=7)
+
+
+class PurgeManager:
+    """
+    Deletes a user's (or everyone's) prediction history in the background.
+
+    Each chunk is one set-based DELETE ... WHERE id IN (SELECT id ... LIMIT n)
+    whose RETURNING rows update the summary counts in the same transaction.
+    Chunks commit on their own, so progress is visible while the job runs,
+    locks stay short, and a purge interrupted by a restart can simply be
+    started again. Only rows that existed when the job started are deleted.
+
+    Jobs are rows of purge_jobs, so any worker can report on a job another
+    one runs. A unique index over the active jobs keeps a second purge of
+    the same scope from starting, whichever worker receives it; progress is
+    committed with each chunk.
+    """
+
+    def __init__(self, chunk_rows: int = 5000) -> None:
+        self.chunk_rows = max(1, chunk_rows)
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+    async def start(
+        self, mission: str, table: Table, user_id: Optional[int]
+    ) -> PurgeJob:
+        """Start a purge, or return the one already running for the same scope"""
+        scope = user_id or 0
+        async with self._get_session_factory()() as db:
+            await self._expire_stale(
+                db,
+                col(PurgeJobRecord.mission) == mission,
+                col(PurgeJobRecord.scope) == scope,
+            )
+            await db.execute(
+                delete(PurgeJobRecord).where(
+                    col(PurgeJobRecord.finished_at)
+                    < datetime.now() - FINISHED_JOB_RETENTION
+                )
+            )
+            await db.commit()
+
+            record = PurgeJobRecord(
+                job_id=str(uuid.uuid4()), mission=mission, scope=scope
+            )
+            db.add(record)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another request (on any worker) started one first
+                await db.rollback()
+                active = (
+                    await db.execute(
+                        select(PurgeJobRecord).where(
+                            col(PurgeJobRecord.mission) == mission,
+                            col(PurgeJobRecord.scope) == scope,
+                            col(PurgeJobRecord.status).in_(ACTIVE_STATUSES),
+                        )
+                    )
+                ).scalar_one()
+                return active.to_job()
+
+        job = record.to_job()
+        task = asyncio.get_running_loop().create_task(
+            self._run(job.job_id, mission, job.user_id, table)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def get(self, job_id: str, mission: str) -> Optional[PurgeJob]:
+        async with self._get_session_factory()() as db:
+            await self._expire_stale(db, col(PurgeJobRecord.job_id) == job_id)
+            await db.commit()
+            record = await db.get(PurgeJobRecord, job_id)
+            if record is None or record.mission != mission:
+                return None
+            return record.to_job()
+
+    async def _expire_stale(self, db: AsyncSession, *where: Any) -> None:
+        """Mark active jobs whose worker stopped updating them as failed"""
+        now = datetime.now()
+        await db.execute(
+            update(PurgeJobRecord)
+            .where(
+                *where,
+                col(PurgeJobRecord.status).in_(ACTIVE_STATUSES),
+                col(PurgeJobRecord.updated_at)
+                < now - timedelta(seconds=STALE_JOB_SECONDS),
+            )
+            .values(
+                status="failed",
+                error="The worker running the purge stopped",
+                finished_at=now,
+            )
+        )
+
+    async def _update(self, db: AsyncSession, job_id: str, **values: Any) -> None:
+        await db.execute(
+            update(PurgeJobRecord)
+            .where(col(PurgeJobRecord.job_id) == job_id)
+            .values(updated_at=datetime.now(), **values)
+        )
+
+    async def _run(
+        self, job_id: str, mission: str, user_id: Optional[int], table: Table
+    ) -> None:
+        deleted_total = 0
+        try:
+            async with self._get_session_factory()() as db:
+                await self._update(db, job_id, status="running")
+                await db.commit()
+
+                if not await write_behind_queue.flush(WRITE_BEHIND_FLUSH_TIMEOUT_S):
+                    log.warning(f"Purge {job_id} started with write-behind backlog")
+
+                scope = select(table.c.id)
+                if user_id:
+                    scope = scope.where(table.c.user_id == user_id)
+
+                total = await get_total(db, mission, user_id)
+                max_id = (
+                    await db.execute(select(func.max(scope.subquery().c.id)))
+                ).scalar_one_or_none()
+                if max_id is not None:
+                    scope = scope.where(table.c.id <= max_id)
+                await self._update(db, job_id, total=total)
+                await db.commit()
+
+                while max_id is not None:
+                    chunk = scope.order_by(table.c.id).limit(self.chunk_rows)
+                    result = await db.execute(
+                        delete(table)
+                        .where(table.c.id.in_(chunk.scalar_subquery()))
+                        .returning(*(table.c[name] for name in RECORD_COLUMNS))
+                    )
+                    deleted = result.mappings().all()
+                    if not deleted:
+                        break
+                    await update_summary(db, mission, deleted, sign=-1)
+                    deleted_total += len(deleted)
+                    # Progress commits with the chunk it reports
+                    await self._update(
+                        db,
+                        job_id,
+                        deleted=deleted_total,
+                        total=max(total, deleted_total),
+                    )
+                    await db.commit()
+
+                await self._update(
+                    db,
+                    job_id,
+                    status="completed",
+                    total=deleted_total,
+                    finished_at=datetime.now(),
+                )
+                await db.commit()
+            log.info(
+                f"Purge {job_id} deleted {deleted_total} {mission} predictions "
+                f"for user_id: {user_id}"
+            )
+        except asyncio.CancelledError:
+            await self._fail(job_id, "Cancelled on shutdown")
+            raise
+        except Exception as e:
+            log.error(f"Purge {job_id} failed: {str(e)}")
+            await self._fail(job_id, str(e))
+
+    async def _fail(self, job_id: str, error: str) -> None:
+        try:
+            async with self._get_session_factory()() as db:
+                await self._update(
+                    db, job_id, status="failed", error=error, finished_at=datetime.now()
+                )
+                await db.commit()
+        except Exception as e:
+            # Left active, the job is expired once it goes stale
+            log.error(f"Cannot mark purge {job_id} failed: {str(e)}")
+
+    def _get_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            # Imported lazily so the services do not create an engine on import
+            from app.utilities.db import async_session
+
+            self._session_factory = async_session
+        return self._session_factory
+
+    async def shutdown(self) -> None:
+        """Cancel running purges; committed chunks stay deleted"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+purge_manager = PurgeManager(chunk_rows=settings.purge_chunk_rows)
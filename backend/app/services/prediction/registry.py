@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.registry import ModelInfo
+from app.services.prediction.cache import file_checksum
+from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import observe_model_load
+
+log = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+# Builds a model from its file; also gets the file's short checksum, which
+# tags derived artifacts (flattened forests, native boosters)
+Loader = Callable[[str, str], Any]
+
+# (inode, size, mtime) of a model file, to notice it being replaced
+FileStat = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """Where a model's active version is and what it must hash to"""
+
+    path: str
+    version: str
+    sha256: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """One loaded version of a model; never changed once built"""
+
+    name: str
+    entry: ManifestEntry
+    checksum: str
+    file_stat: FileStat
+    model: Any
+    loaded_at: datetime
+    load_seconds: float
+
+    @property
+    def version(self) -> str:
+        return self.entry.version
+
+    @property
+    def tag(self) -> str:
+        """Short checksum, used to version cached results"""
+        return self.checksum[:16]
+
+    def info(self) -> ModelInfo:
+        return ModelInfo(
+            name=self.name,
+            version=self.version,
+            checksum=self.checksum,
+            path=self.entry.path,
+            loaded_at=self.loaded_at,
+            load_ms=self.load_seconds * 1000,
+        )
+
+
+def _file_stat(path: str) -> FileStat:
+    st = os.stat(path)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ModelRegistry:
+    """
+    Loads each model once and serves it until a new version is published.
+
+    The manifest (MODEL_DIR/manifest.json) names the file, version and
+    SHA-256 of each model; models it does not list use their default file
+    name, versioned as "unversioned". A new version is loaded next to the
+    active one, checked against the manifest checksum and swapped in with
+    a single assignment, so calls that already took the old model finish
+    with it. `get` looks for a new version at most every
+    `check_interval_seconds` and loads it in the calling thread; other
+    threads keep using the active version meanwhile.
+    """
+
+    def __init__(self, model_dir: str, check_interval_seconds: float = 10.0) -> None:
+        self.model_dir = model_dir
+        self.check_interval_seconds = check_interval_seconds
+
+        self._defaults: Dict[str, str] = {}
+        self._loaders: Dict[str, Loader] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._active: Dict[str, LoadedModel] = {}
+        self._checked_at: Dict[str, float] = {}
+        # Versions that failed to load are not retried until they change
+        self._failed: Dict[str, Tuple[ManifestEntry, FileStat]] = {}
+        self._manifest_stat: Optional[FileStat] = None
+        self._manifest: Dict[str, ManifestEntry] = {}
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.model_dir, MANIFEST_FILE)
+
+    def register(self, name: str, default_file: str, loader: Loader) -> None:
+        """Declare a model, the file it uses without a manifest and its loader"""
+        self._defaults[name] = default_file
+        self._loaders[name] = loader
+        self._locks.setdefault(name, threading.Lock())
+
+    def names(self) -> List[str]:
+        return list(self._loaders)
+
+    def _read_manifest(self) -> Dict[str, ManifestEntry]:
+        """Manifest entries, parsed again only when the file changes"""
+        try:
+            stat = _file_stat(self.manifest_path)
+        except FileNotFoundError:
+            self._manifest_stat, self._manifest = None, {}
+            return self._manifest
+        if stat != self._manifest_stat:
+            with open(self.manifest_path) as f:
+                models = json.load(f)["models"]
+            self._manifest = {
+                name: ManifestEntry(
+                    path=os.path.join(self.model_dir, spec["path"]),
+                    version=str(spec["version"]),
+                    sha256=spec.get("sha256"),
+                )
+                for name, spec in models.items()
+            }
+            self._manifest_stat = stat
+        return self._manifest
+
+    def entry(self, name: str) -> ManifestEntry:
+        """The version of a model the manifest currently names"""
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        entry = self._read_manifest().get(name)
+        if entry is None:
+            entry = ManifestEntry(
+                path=os.path.join(self.model_dir, self._defaults[name]),
+                version="unversioned",
+            )
+        return entry
+
+    def path(self, name: str) -> str:
+        """File of the active version, or of the one that would be loaded"""
+        loaded = self._active.get(name)
+        return loaded.entry.path if loaded is not None else self.entry(name).path
+
+    def active(self, name: str) -> Optional[LoadedModel]:
+        """The active version, without loading or checking for a new one"""
+        return self._active.get(name)
+
+    def current(self, name: str) -> LoadedModel:
+        """The active version, loading the model on first use"""
+        return self._active.get(name) or self._load_first(name)
+
+    async def resolve(self, name: str) -> LoadedModel:
+        """`current` for the event loop: a first load runs in a worker thread"""
+        loaded = self._active.get(name)
+        if loaded is None:
+            loaded = await asyncio.to_thread(self.current, name)
+        return loaded
+
+    def get(self, name: str) -> LoadedModel:
+        """
+        The active version, switching to a newly published one first if the
+        check is due. Reads the disk, so call it off the event loop.
+        """
+        loaded = self._active.get(name)
+        if loaded is None:
+            return self._load_first(name)
+        if not self._check_due(name):
+            return loaded
+
+        try:
+            entry = self.entry(name)
+            published = entry, _file_stat(entry.path)
+        except Exception as e:
+            log.warning(f"Cannot check {name} for a new version: {str(e)}")
+            return loaded
+        if published in ((loaded.entry, loaded.file_stat), self._failed.get(name)):
+            return loaded
+
+        lock = self._locks[name]
+        if not lock.acquire(blocking=False):
+            # Another thread is loading it; keep serving the active version
+            return loaded
+        try:
+            return self._load_locked(name)
+        except Exception as e:
+            self._failed[name] = published
+            log.error(f"Keeping {name} {loaded.version}, new version failed: {e}")
+            return loaded
+        finally:
+            lock.release()
+
+    def load(self, name: str) -> LoadedModel:
+        """Load the version the manifest names now and make it active"""
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        with self._locks[name]:
+            return self._load_locked(name)
+
+    def _load_first(self, name: str) -> LoadedModel:
+        """
+        Load a model that is not active yet. Callers that waited on the lock
+        while another thread loaded it get that version instead of loading
+        it again.
+        """
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        with self._locks[name]:
+            return self._active.get(name) or self._load_locked(name)
+
+    def _check_due(self, name: str) -> bool:
+        if self.check_interval_seconds <= 0:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at.get(name, 0.0) < self.check_interval_seconds:
+            return False
+        self._checked_at[name] = now
+        return True
+
+    def _load_locked(self, name: str) -> LoadedModel:
+        entry = self.entry(name)
+        log.info(f"Loading {name} {entry.version} from {entry.path}")
+        start = time.perf_counter()
+        with open(entry.path, "rb") as f:
+            file_stat = _file_stat(entry.path)
+            checksum = file_checksum(f)
+        if entry.sha256 and checksum != entry.sha256.lower():
+            raise ValueError(
+                f"{entry.path} does not match the manifest checksum of "
+                f"{name} {entry.version}"
+            )
+
+        model = self._loaders[name](entry.path, checksum[:16])
+        loaded = LoadedModel(
+            name=name,
+            entry=entry,
+            checksum=checksum,
+            file_stat=file_stat,
+            model=model,
+            loaded_at=datetime.now(),
+            load_seconds=time.perf_counter() - start,
+        )
+        # Swap: callers holding the previous version keep it until they finish
+        self._active[name] = loaded
+        self._checked_at[name] = time.monotonic()
+        self._failed.pop(name, None)
+        observe_model_load(name, loaded.load_seconds)
+        log.info(
+            f"{name} {entry.version} ({loaded.tag}) active, "
+            f"loaded in {loaded.load_seconds * 1000:.0f} ms"
+        )
+        return loaded
+
+    def info(self) -> List[ModelInfo]:
+        """The loaded versions, for the models endpoint"""
+        return [loaded.info() for loaded in self._active.values()]
+
+
+model_registry = ModelRegistry(
+    settings.model_dir, check_interval_seconds=settings.model_check_interval_seconds
+)
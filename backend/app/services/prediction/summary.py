@@ -0,0 +1,193 @@
+import random
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Connection, Table, delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.summary import PredictionStats, PredictionSummary
+from app.utilities.sql import upsert_add
+
+# Scope of the rows that count every prediction, whoever made it
+ALL_USERS = 0
+
+# Dimensions counted per scope: the total, and per predicted class, confidence
+# bucket (lower bound of a 0.1 wide bin) and server-local day of creation
+TOTAL = "total"
+CLASS = "class"
+CONFIDENCE = "confidence"
+DAY = "day"
+CONFIDENCE_BUCKETS = 10
+
+# Record columns summary_deltas reads
+RECORD_COLUMNS = ("user_id", "prediction", "confidence", "created_at")
+
+# Rows read per batch when rebuilding
+REBUILD_BATCH_ROWS = 10000
+
+SUMMARY_KEYS = ("mission", "scope", "dimension", "key", "shard")
+
+
+def _summary_table() -> Table:
+    return PredictionSummary.__table__  # type: ignore[attr-defined]
+
+
+def _field(record: Any, name: str) -> Any:
+    """Read a column from an ORM record or a plain row mapping"""
+    return record[name] if isinstance(record, Mapping) else getattr(record, name)
+
+
+def confidence_bucket(confidence: float) -> str:
+    """Histogram bin of a confidence, named by its lower bound (e.g. 0.9)"""
+    # Rounding first keeps values like 0.3 (2.9999... * 10) in their own bin
+    index = int(round(confidence * CONFIDENCE_BUCKETS, 9))
+    index = min(max(index, 0), CONFIDENCE_BUCKETS - 1)
+    return f"{index / CONFIDENCE_BUCKETS:.1f}"
+
+
+def _count_records(
+    counts: "Counter[Tuple[int, str, str]]", records: Iterable[Any], sign: int
+) -> None:
+    for record in records:
+        user_id = _field(record, "user_id")
+        created_at = _field(record, "created_at")
+        keys = [
+            (TOTAL, ""),
+            (CLASS, str(_field(record, "prediction"))),
+            (CONFIDENCE, confidence_bucket(_field(record, "confidence"))),
+            (DAY, created_at.date().isoformat()),
+        ]
+        scopes = (ALL_USERS, user_id) if user_id else (ALL_USERS,)
+        for scope in scopes:
+            for dimension, key in keys:
+                counts[(scope, dimension, key)] += sign
+
+
+def _summary_rows(
+    mission: str, counts: "Counter[Tuple[int, str, str]]", shard: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Rows for the counts, the all-users ones in `shard`; sorted, so that
+    concurrent writes lock the rows they share in the same order
+    """
+    return [
+        {
+            "mission": mission,
+            "scope": scope,
+            "dimension": dim,
+            "key": key,
+            "shard": shard if scope == ALL_USERS else 0,
+            "count": n,
+        }
+        for (scope, dim, key), n in sorted(counts.items())
+        if n
+    ]
+
+
+def summary_deltas(
+    mission: str, records: Sequence[Any], sign: int = 1, shard: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Summary rows to add for inserted (sign=1) or deleted (sign=-1) prediction
+    records (ORM objects or dicts with RECORD_COLUMNS). Each record counts
+    towards all users, in the given shard, and towards its own user.
+    """
+    counts: Counter[Tuple[int, str, str]] = Counter()
+    _count_records(counts, records, sign)
+    return _summary_rows(mission, counts, shard)
+
+
+async def update_summary(
+    db: AsyncSession, mission: str, records: Sequence[Any], sign: int = 1
+) -> None:
+    """
+    Apply the summary deltas for records inside the caller's transaction,
+    to the all-users rows of a random shard
+    """
+    shard = random.randrange(max(settings.summary_shards, 1))
+    rows = summary_deltas(mission, records, sign, shard)
+    if rows:
+        stmt = upsert_add(
+            db.get_bind().dialect.name, _summary_table(), SUMMARY_KEYS, ["count"]
+        )
+        await db.execute(stmt, rows)
+
+
+async def get_total(db: AsyncSession, mission: str, user_id: Optional[int]) -> int:
+    """Number of predictions for a user (or all users) from the summary"""
+    table = _summary_table()
+    result = await db.execute(
+        select(func.sum(table.c.count)).where(
+            table.c.mission == mission,
+            table.c.scope == (user_id or ALL_USERS),
+            table.c.dimension == TOTAL,
+            table.c.key == "",
+        )
+    )
+    return int(result.scalar_one_or_none() or 0)
+
+
+async def get_stats(
+    db: AsyncSession,
+    mission: str,
+    user_id: Optional[int],
+    classes: Sequence[str],
+    since: date,
+) -> PredictionStats:
+    """
+    Statistics for a user (or all users) read from the summary: counts per
+    class (every class in `classes` is listed), the confidence histogram and
+    daily volumes from `since` on.
+    """
+    table = _summary_table()
+    result = await db.execute(
+        select(table.c.dimension, table.c.key, func.sum(table.c.count))
+        .where(
+            table.c.mission == mission,
+            table.c.scope == (user_id or ALL_USERS),
+            or_(table.c.dimension != DAY, table.c.key >= since.isoformat()),
+        )
+        .group_by(table.c.dimension, table.c.key)
+    )
+
+    stats = PredictionStats(
+        mission=mission,
+        user_id=user_id,
+        classes={label: 0 for label in classes},
+        confidence={
+            f"{i / CONFIDENCE_BUCKETS:.1f}": 0 for i in range(CONFIDENCE_BUCKETS)
+        },
+    )
+    for dimension, key, count in result.all():
+        if dimension == TOTAL:
+            stats.total = count
+        elif dimension == CLASS:
+            stats.classes[key] = count
+        elif dimension == CONFIDENCE:
+            stats.confidence[key] = count
+        elif dimension == DAY and count:
+            stats.daily[key] = count
+    stats.daily = dict(sorted(stats.daily.items()))
+    return stats
+
+
+def rebuild_summary(conn: Connection, mission: str, records: Table) -> None:
+    """
+    Recompute every summary row for a mission from its prediction table,
+    counting records exactly as the incremental updates do
+    """
+    table = _summary_table()
+    conn.execute(delete(table).where(table.c.mission == mission))
+
+    counts: Counter[Tuple[int, str, str]] = Counter()
+    result = conn.execution_options(yield_per=REBUILD_BATCH_ROWS).execute(
+        select(*(records.c[name] for name in RECORD_COLUMNS))
+    )
+    for records_batch in result.mappings().partitions():
+        _count_records(counts, records_batch, 1)
+
+    rows = _summary_rows(mission, counts)
+    for i in range(0, len(rows), REBUILD_BATCH_ROWS):
+        conn.execute(insert(table), rows[i : i + REBUILD_BATCH_ROWS])
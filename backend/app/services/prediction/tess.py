@@ -1,14 +1,26 @@
+import io
 import os
+import csv
 import json
 import uuid
-from typing import Any, List, Optional, cast
+from datetime import date, timedelta
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
 import numpy as np
 import numpy.typing as npt
-import pandas as pd
-from sqlalchemy import desc
+from sqlalchemy import desc, literal, tuple_
+from sqlalchemy import select as sa_select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
-from app.models.user import User
+from sqlmodel import col, select
+from app.services.auth.user_cache import known_users
 
 import pickle  # for loading .pkl files
 
@@ -17,55 +29,58 @@ from app.models.tess import (
     TessPredictionResponse,
     TessPredictionRecord,
 )
+from app.models.purge import PurgeJob
+from app.models.summary import PredictionStats
+from app.utilities.csv_stream import iter_line_chunks
+from app.config import settings
+from app.services.prediction.batching import MicroBatcher
+from app.services.prediction.booster import NativeBooster
+from app.services.prediction.cache import PredictionCache
+from app.services.prediction.executor import ServiceCall, inference_executor
+from app.services.prediction.features import TESS_FEATURE_SPEC
+from app.services.prediction.inputs import load_input_matrix
+from app.services.prediction.purge import purge_manager
+from app.services.prediction.registry import model_registry
+from app.services.prediction.summary import get_stats, get_total, update_summary
+from app.services.prediction.write_behind import persist_prediction
 from app.utilities.logger import logger as get_logger
+from app.utilities.metrics import stage_timer
+from app.utilities.pagination import decode_cursor, encode_cursor
+
+# pandas is only needed to parse uploads; importing it lazily keeps it off
+# the worker startup path
+if TYPE_CHECKING:
+    import pandas as pd
 
 log = get_logger(__name__)
 
 
-def find_model_file() -> str:
-    """Find the TESS XGBoost model file in various possible locations"""
-    possible_paths = [
-        os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "../../models/tess_xgb_improved_model.pkl",
-        ),
-        os.path.join(os.getcwd(), "models/tess_xgb_improved_model.pkl"),
-        "/app/models/tess_xgb_improved_model.pkl",  # Docker path
-        os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "../../../models/tess_xgb_improved_model.pkl",
-        ),
-        "/home/mrzoro/Desktop/Hackathon/exovision/backend/models/tess_xgb_improved_model.pkl",
-    ]
-
-    for path in possible_paths:
-        abs_path = os.path.abspath(path)
-        if os.path.exists(abs_path):
-            return abs_path
-
-    raise FileNotFoundError(
-        f"Model file 'tess_xgb_improved_model.pkl' not found in any expected locations: {possible_paths}"
-    )
+# Registry name of the XGBoost model, and its file when the manifest does not
+# list it
+MODEL_NAME = "tess_xgb"
+DEFAULT_MODEL_FILE = "tess_xgb_improved_model.pkl"
+
+
+def native_model_path(model_path: str) -> str:
+    """Where the native XGBoost (UBJ) export of a pickled model is kept"""
+    return os.path.splitext(model_path)[0] + ".ubj"
 
 
 class TessPredictionService:
     def __init__(self) -> None:
-        """Initialize the TESS prediction service and load the model."""
-        self.model_path = find_model_file()
-        self.model = self.load_model()
-
-        # Base feature columns (9 features - before log transforms)
-        self.feature_columns = [
-            "pl_orbper",
-            "pl_trandurh",
-            "pl_trandep",
-            "pl_rade",
-            "pl_insol",
-            "pl_eqt",
-            "st_teff",
-            "st_logg",
-            "st_rad",
-        ]
+        """Initialize the TESS prediction service; the model loads on first use."""
+        self.model_name = MODEL_NAME
+        model_registry.register(MODEL_NAME, DEFAULT_MODEL_FILE, self._load_model_file)
+
+        # Base features plus log transforms, compiled once into index maps
+        self.features = TESS_FEATURE_SPEC.compile()
+        self.feature_columns = list(self.features.base_columns)
+
+        # Final feature order expected by the model (base + log transforms)
+        self.model_columns = list(self.features.columns)
+
+        # Identifier columns echoed back when scoring uploaded catalog files
+        self.id_columns = ["rowid", "toi", "tid"]
 
         # Class labels mapping for TESS predictions (6 classes in alphabetical order by sklearn LabelEncoder)
         # The LabelEncoder sorts classes alphabetically: APC, CP, FA, FP, KP, PC
@@ -78,63 +93,146 @@ class TessPredictionService:
             5: "PC",  # Planet Candidate
         }
 
+        # Coalesces concurrent single-row predictions into one model call
+        self.batcher: MicroBatcher[Tuple[str, float]] = MicroBatcher(
+            "tess_xgb",
+            self._infer_rows,
+            window_ms=settings.microbatch_window_ms,
+            max_batch_size=settings.microbatch_max_size,
+            enabled=settings.microbatch_enabled,
+        )
+
+        # Results keyed by feature row and model version; cleared on reload
+        self.cache: PredictionCache[Tuple[str, float]] = PredictionCache(
+            "tess_xgb",
+            max_entries=settings.prediction_cache_max_entries,
+            ttl_seconds=settings.prediction_cache_ttl_seconds,
+            enabled=settings.prediction_cache_enabled,
+        )
+
+    @property
+    def model(self) -> Any:
+        """The active model, or None before it is first loaded"""
+        loaded = model_registry.active(MODEL_NAME)
+        return loaded.model if loaded is not None else None
+
+    @property
+    def model_path(self) -> str:
+        return model_registry.path(MODEL_NAME)
+
+    async def model_version(self) -> str:
+        """
+        Checksum of the active model file, used to version cached results.
+        Before the first load, the model is loaded off the event loop.
+        """
+        return (await model_registry.resolve(MODEL_NAME)).tag
+
     def load_model(self) -> Any:
-        """Load the trained XGBoost model"""
-        log.info(f"Loading TESS XGBoost model from: {self.model_path}")
-        if not os.path.exists(self.model_path):
-            raise FileNotFoundError(
-                f"TESS XGBoost model not found at {self.model_path}"
-            )
-        try:
-            # Try loading with different pickle protocols
-            with open(self.model_path, "rb") as f:
-                try:
-                    model = pickle.load(f)
-                except Exception as e:
-                    # If pickle fails, try joblib
-                    log.warning(f"Pickle loading failed ({e}), trying joblib...")
-                    from joblib import load
-
-                    f.seek(0)  # Reset file pointer
-                    model = load(f)
-
-            log.info(f"TESS XGBoost model loaded successfully from {self.model_path}")
-            return model
-        except Exception as e:
-            log.error(f"Failed to load TESS XGBoost model: {str(e)}")
-            raise
+        """The trained XGBoost model, switching to a new version if published"""
+        return model_registry.get(MODEL_NAME).model
+
+    def _load_model_file(self, path: str, version: str) -> Any:
+        """Load a TESS XGBoost model file for the configured engine"""
+        engine = settings.tess_xgb_engine
+        if engine == "native":
+            model = self._load_native_model(path, version)
+        elif engine == "sklearn":
+            model = self._load_pickled_model(path)
+        else:
+            raise ValueError(f"Unknown TESS_XGB_ENGINE: {engine}")
+        log.info(f"TESS XGBoost model loaded successfully from {path} ({engine})")
+        return model
+
+    def _load_pickled_model(self, path: str) -> Any:
+        """Unpickle the sklearn-wrapper XGBClassifier"""
+        # Try loading with different pickle protocols
+        with open(path, "rb") as f:
+            try:
+                return pickle.load(f)
+            except Exception as e:
+                # If pickle fails, try joblib
+                log.warning(f"Pickle loading failed ({e}), trying joblib...")
+                from joblib import load
+
+                f.seek(0)  # Reset file pointer
+                return load(f)
+
+    def _load_native_model(self, model_path: str, version: str) -> NativeBooster:
+        """Load the native booster export, taking it from the pickle if needed"""
+        n_threads = settings.tess_xgb_nthread
+        path = native_model_path(model_path)
+        if os.path.exists(path):
+            booster = NativeBooster.load(path, n_threads)
+            if booster.source_version == version:
+                return booster
+            log.warning(f"Ignoring {path}: it was exported from another model file")
+        log.info(
+            "Using the booster of the pickled TESS model; run python -m "
+            "app.cli.export_xgb to load the native format directly at startup"
+        )
+        return NativeBooster.from_sklearn(
+            self._load_pickled_model(model_path), n_threads
+        )
+
+    def reload_model(self) -> None:
+        """Load the model's published version now and drop cached results"""
+        model_registry.load(MODEL_NAME)
+        self.cache.invalidate()
 
     def preprocess_input(self, data: TessPredictionRequest) -> npt.NDArray[np.float32]:
         """Preprocess input for XGBoost prediction"""
-        import numpy as np
-
-        input_dict = data.model_dump()
-        df = pd.DataFrame([input_dict])
-
-        # Ensure columns are in the correct order (base features)
-        df = df[self.feature_columns]
-
-        # Add log-transformed features as expected by the model
-        df["pl_orbper_log"] = np.log(df["pl_orbper"] + 1)
-        df["pl_trandep_log"] = np.log(df["pl_trandep"] + 1)
-
-        # Reorder to match model's expected feature order
-        final_columns = [
-            "pl_orbper",
-            "pl_trandurh",
-            "pl_trandep",
-            "pl_rade",
-            "pl_insol",
-            "pl_eqt",
-            "st_teff",
-            "st_logg",
-            "st_rad",
-            "pl_orbper_log",
-            "pl_trandep_log",
+        return self.features.from_models([data])
+
+    def preprocess_frame(self, df: "pd.DataFrame") -> npt.NDArray[np.float32]:
+        """Apply the TESS feature transform to a frame of base features"""
+        return self.features.from_frame(df)
+
+    def score_matrix(
+        self, model: Any, input_data: npt.NDArray[np.float32]
+    ) -> Tuple[List[str], List[float]]:
+        """Return the predicted label and its probability for every row"""
+        prediction_proba = model.predict_proba(input_data)
+        # Get the class with highest probability
+        predicted_class_idx = np.argmax(prediction_proba, axis=1)
+        confidences = prediction_proba[
+            np.arange(len(predicted_class_idx)), predicted_class_idx
         ]
-        df = df[final_columns]
 
-        return df.values.astype(np.float32)
+        # Map index to class label
+        labels = [
+            self.class_labels.get(int(idx), "UNKNOWN") for idx in predicted_class_idx
+        ]
+        return labels, [float(confidence) for confidence in confidences]
+
+    def _score_rows(
+        self, input_data: npt.NDArray[np.float32]
+    ) -> List[Tuple[str, float]]:
+        """Score a feature matrix and return (label, confidence) per row"""
+        labels, confidences = self.score_matrix(self.load_model(), input_data)
+        return list(zip(labels, confidences))
+
+    def _score_frame(self, df: "pd.DataFrame") -> List[Tuple[str, float]]:
+        """Transform and score a frame of base features"""
+        return self._score_rows(self.preprocess_frame(df))
+
+    async def _infer_rows(
+        self, input_data: npt.NDArray[np.float32]
+    ) -> List[Tuple[str, float]]:
+        """Score a feature matrix on the inference executor"""
+        return await inference_executor.run(
+            "tess_xgb",
+            ServiceCall("tess_prediction_service", "_score_rows"),
+            input_data,
+        )
+
+    async def _predict_row(
+        self, input_row: npt.NDArray[np.float32]
+    ) -> Tuple[str, float]:
+        """Score one feature row through the result cache and micro-batcher"""
+        return await self.cache.get_or_compute(
+            self.cache.key(input_row, await self.model_version()),
+            lambda: self.batcher.submit(input_row),
+        )
 
     async def predict(
         self,
@@ -144,27 +242,16 @@ class TessPredictionService:
     ) -> TessPredictionResponse:
         """Make a prediction using TESS XGBoost model"""
         try:
-            model = self.load_model()
-            input_data = self.preprocess_input(data)
-
-            # Get prediction probabilities
-            prediction_proba = model.predict_proba(input_data)[0]
-            # Get the class with highest probability
-            predicted_class_idx = int(np.argmax(prediction_proba))
-            confidence = float(prediction_proba[predicted_class_idx])
-
-            # Map index to class label
-            prediction_label = self.class_labels.get(predicted_class_idx, "UNKNOWN")
+            with stage_timer("tess", "preprocess"):
+                input_data = self.preprocess_input(data)
+            with stage_timer("tess", "inference"):
+                prediction_label, confidence = await self._predict_row(input_data[0])
 
             prediction_id = str(uuid.uuid4())
 
             # Validate user if user_id is provided
-            if user_id:
-                user_query = select(User).where(User.id == user_id)
-                user_result = await db.execute(user_query)
-                user = user_result.scalar_one_or_none()
-                if not user:
-                    raise ValueError(f"User with ID {user_id} does not exist")
+            if user_id and not await known_users.exists(db, user_id):
+                raise ValueError(f"User with ID {user_id} does not exist")
 
             # Create prediction record
             prediction_record = TessPredictionRecord(
@@ -172,12 +259,9 @@ class TessPredictionService:
                 user_id=user_id,
                 prediction=prediction_label,
                 confidence=confidence,
-                input_data=json.dumps(data.model_dump()),
             )
-
-            db.add(prediction_record)
-            await db.commit()
-            await db.refresh(prediction_record)
+            with stage_timer("tess", "db_commit"):
+                await persist_prediction(db, "tess", data, prediction_record)
 
             log.info(
                 f"TESS XGBoost Prediction: ID={prediction_id}, Result={prediction_label}, Confidence={confidence}"
@@ -194,6 +278,152 @@ class TessPredictionService:
             log.error(f"TESS Prediction failed: {str(e)}")
             raise
 
+    def _parse_chunk(
+        self, header: str, chunk: List[str], id_columns: List[str]
+    ) -> Tuple["pd.DataFrame", List[str], List[int]]:
+        """
+        Parse a chunk of CSV lines. Returns the frame, the error of each row
+        ("" if none) and the chunk line each row starts on: a quoted value
+        can span lines. Feature values that are not numbers are an error of
+        their row, not of the whole upload.
+        """
+        import pandas as pd
+
+        df = pd.read_csv(
+            io.StringIO("\n".join([header, *chunk])),
+            usecols=id_columns + self.feature_columns,
+            dtype={column: str for column in id_columns},
+            keep_default_na=False,
+            na_values=[""],
+        )
+        # Only a column with a value that is not a number is parsed as text
+        invalid = pd.DataFrame(False, index=df.index, columns=self.feature_columns)
+        for column in self.feature_columns:
+            if not pd.api.types.is_numeric_dtype(df[column]):
+                values = pd.to_numeric(df[column], errors="coerce")
+                invalid[column] = values.isna() & df[column].notna()
+                df[column] = values
+
+        errors = [""] * len(df)
+        for i in np.flatnonzero(invalid.to_numpy().any(axis=1)):
+            columns = invalid.columns[invalid.iloc[i].to_numpy()]
+            errors[i] = f"Invalid number in {', '.join(columns)}"
+        return df, errors, self._row_lines(chunk, len(df))
+
+    @staticmethod
+    def _row_lines(chunk: List[str], rows: int) -> List[int]:
+        """The line of the chunk each of its `rows` CSV rows starts on"""
+        if not any('"' in line for line in chunk):
+            starts = list(range(len(chunk)))
+        else:
+            reader = csv.reader(chunk)
+            starts, line = [], 0
+            for _ in reader:
+                starts.append(line)
+                line = reader.line_num
+        if len(starts) != rows:
+            raise ValueError(f"Parsed {rows} rows from {len(starts)} CSV records")
+        return starts
+
+    @staticmethod
+    def _format_results(
+        results: List[Tuple[int, List[Any], Dict[str, Any]]],
+        id_columns: List[str],
+        output_format: str,
+    ) -> str:
+        """(row, ids, prediction or error) tuples as CSV or NDJSON lines"""
+        out = io.StringIO()
+        if output_format == "csv":
+            writer = csv.writer(out, lineterminator="\n")
+            for row, ids, result in results:
+                writer.writerow(
+                    [
+                        row,
+                        *ids,
+                        result.get("prediction", ""),
+                        result.get("confidence", ""),
+                        result.get("error", ""),
+                    ]
+                )
+        else:
+            for row, ids, result in results:
+                record: Dict[str, Any] = {"row": row}
+                record.update(zip(id_columns, ids))
+                record.update(result)
+                out.write(json.dumps(record) + "\n")
+        return out.getvalue()
+
+    async def stream_scores(
+        self,
+        header: str,
+        lines: AsyncIterator[str],
+        output_format: str = "csv",
+        chunk_rows: int = 5000,
+    ) -> AsyncIterator[str]:
+        """
+        Score an uploaded TOI catalog chunk by chunk.
+
+        Each chunk of CSV lines is parsed into a frame, transformed as one
+        feature matrix and scored with a single model call on the inference
+        executor. Only one chunk is held in memory at a time.
+
+        The response has already started when a chunk is read, so failures
+        are reported in the stream: a row with an invalid value gets an
+        error instead of a prediction, and a chunk that cannot be parsed or
+        scored gets one error row naming its line range. Rows are numbered
+        by the data line (not counting blank and comment lines) they start
+        on, whichever chunks failed.
+        """
+        columns = next(csv.reader([header]))
+        id_columns = [column for column in self.id_columns if column in columns]
+
+        if output_format == "csv":
+            yield ",".join(
+                ["row", *id_columns, "prediction", "confidence", "error"]
+            ) + "\n"
+
+        row_offset = 0
+        async for chunk in iter_line_chunks(lines, chunk_rows):
+            try:
+                df, errors, row_lines = self._parse_chunk(header, chunk, id_columns)
+                valid = [i for i, error in enumerate(errors) if not error]
+                scores = iter(
+                    await inference_executor.run(
+                        "tess_xgb",
+                        ServiceCall("tess_prediction_service", "_score_frame"),
+                        df.iloc[valid],
+                    )
+                    if valid
+                    else []
+                )
+            except Exception as e:
+                last = row_offset + len(chunk) - 1
+                log.error(f"TESS upload rows {row_offset}-{last} failed: {str(e)}")
+                error = f"Rows {row_offset}-{last} could not be scored: {e}"
+                yield self._format_results(
+                    [(row_offset, [""] * len(id_columns), {"error": error})],
+                    id_columns,
+                    output_format,
+                )
+                row_offset += len(chunk)
+                continue
+
+            ids = df[id_columns].fillna("").values.tolist()
+            results: List[Tuple[int, List[Any], Dict[str, Any]]] = []
+            for i, error in enumerate(errors):
+                row = row_offset + row_lines[i]
+                if error:
+                    results.append((row, ids[i], {"error": error}))
+                else:
+                    label, confidence = next(scores)
+                    result = {"prediction": label, "confidence": confidence}
+                    results.append((row, ids[i], result))
+
+            row_offset += len(chunk)
+            yield self._format_results(results, id_columns, output_format)
+
+        log.info(f"TESS upload scoring complete: {row_offset} lines")
+
     async def get_predictions(
         self,
         db: AsyncSession,
@@ -201,33 +431,115 @@ class TessPredictionService:
         skip: int = 0,
         limit: int = 100,
     ) -> List[TessPredictionResponse]:
-        """Get TESS prediction history"""
+        """Get prediction history"""
+        predictions, _ = await self.get_prediction_page(db, user_id, limit, skip=skip)
+        return predictions
+
+    async def get_prediction_page(
+        self,
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[List[TessPredictionResponse], Optional[str]]:
+        """
+        Get one page of prediction history, newest first, and the cursor of
+        the next page (None on the last page). With a cursor the page is
+        found by a keyset seek on (user_id, created_at, id) instead of OFFSET.
+        """
         try:
-            query = select(TessPredictionRecord)
+            # sqlmodel's select is only typed for up to four columns
+            query = sa_select(
+                col(TessPredictionRecord.id),
+                col(TessPredictionRecord.prediction),
+                col(TessPredictionRecord.confidence),
+                col(TessPredictionRecord.prediction_id),
+                col(TessPredictionRecord.created_at),
+            )
             if user_id:
-                query = query.where(TessPredictionRecord.user_id == user_id)
+                query = query.where(col(TessPredictionRecord.user_id) == user_id)
+            if cursor:
+                created_at, row_id = decode_cursor(cursor)
+                query = query.where(
+                    tuple_(
+                        col(TessPredictionRecord.created_at),
+                        col(TessPredictionRecord.id),
+                    )
+                    < tuple_(literal(created_at), literal(row_id))
+                )
             query = (
-                query.offset(skip)
-                .limit(limit)
-                .order_by(desc(cast(Any, TessPredictionRecord.created_at)))
+                query.order_by(
+                    desc(cast(Any, TessPredictionRecord.created_at)),
+                    desc(cast(Any, TessPredictionRecord.id)),
+                )
+                .offset(skip)
+                .limit(limit + 1)
             )
 
             result = await db.execute(query)
-            predictions = result.scalars().all()
+            rows = result.all()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
 
-            return [
+            predictions = [
                 TessPredictionResponse(
-                    prediction=pred.prediction,
-                    confidence=pred.confidence,
-                    prediction_id=pred.prediction_id,
-                    timestamp=pred.created_at,
+                    prediction=row.prediction,
+                    confidence=row.confidence,
+                    prediction_id=row.prediction_id,
+                    timestamp=row.created_at,
                 )
-                for pred in predictions
+                for row in rows
             ]
+            return predictions, next_cursor
         except Exception as e:
             log.error(f"Failed to get TESS predictions: {str(e)}")
             raise
 
+    async def count_predictions(
+        self, db: AsyncSession, user_id: Optional[int] = None
+    ) -> int:
+        """Total TESS predictions for a user (or all users) from the maintained summary"""
+        return await get_total(db, "tess", user_id)
+
+    async def get_stats(
+        self, db: AsyncSession, user_id: Optional[int] = None, days: int = 30
+    ) -> PredictionStats:
+        """Class counts, confidence histogram and daily volume of TESS predictions"""
+        since = date.today() - timedelta(days=days - 1)
+        return await get_stats(
+            db, "tess", user_id, list(self.class_labels.values()), since
+        )
+
+    async def get_prediction(
+        self, db: AsyncSession, prediction_id: str, user_id: Optional[int] = None
+    ) -> Optional[TessPredictionResponse]:
+        """Get one TESS prediction by ID (a lookup on the unique prediction_id index)"""
+        try:
+            query = select(
+                TessPredictionRecord.prediction,
+                TessPredictionRecord.confidence,
+                TessPredictionRecord.created_at,
+            ).where(TessPredictionRecord.prediction_id == prediction_id)
+            if user_id:
+                query = query.where(TessPredictionRecord.user_id == user_id)
+            result = await db.execute(query)
+            row = result.one_or_none()
+            if row is None:
+                return None
+
+            return TessPredictionResponse(
+                prediction=row.prediction,
+                confidence=row.confidence,
+                prediction_id=prediction_id,
+                timestamp=row.created_at,
+            )
+        except Exception as e:
+            log.error(f"Failed to get TESS prediction {prediction_id}: {str(e)}")
+            raise
+
     async def delete_prediction(
         self, db: AsyncSession, prediction_id: str, user_id: Optional[int] = None
     ) -> bool:
@@ -243,6 +555,7 @@ class TessPredictionService:
 
             if prediction:
                 await db.delete(prediction)
+                await update_summary(db, "tess", [prediction], sign=-1)
                 await db.commit()
                 log.info(f"Deleted TESS prediction ID={prediction_id}")
                 return True
@@ -252,6 +565,24 @@ class TessPredictionService:
             log.error(f"Failed to delete TESS prediction: {str(e)}")
             raise
 
+    async def get_input_matrix(
+        self, db: AsyncSession, user_id: Optional[int] = None
+    ) -> Tuple[List[str], npt.NDArray[np.float64]]:
+        """Prediction ids and stored request inputs (one row each) for re-scoring"""
+        return await load_input_matrix(
+            db, "tess", TessPredictionRecord.__table__, user_id  # type: ignore[attr-defined]
+        )
+
+    async def purge_predictions(self, user_id: Optional[int] = None) -> PurgeJob:
+        """Start deleting all predictions of a user (or everyone) in the background"""
+        return await purge_manager.start(
+            "tess", TessPredictionRecord.__table__, user_id  # type: ignore[attr-defined]
+        )
+
+    async def get_purge(self, job_id: str) -> Optional[PurgeJob]:
+        """Progress of a purge, whichever worker runs it"""
+        return await purge_manager.get(job_id, "tess")
+
 
 # Global instance
 tess_prediction_service = TessPredictionService()
@@ -0,0 +1,307 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Set, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.inputs import PredictionInput
+from app.services.auth.user_cache import known_users
+from app.services.prediction.inputs import input_rows, store_inputs
+from app.services.prediction.summary import update_summary
+from app.utilities.logger import logger as get_logger
+from app.utilities.sql import insert_ignore
+
+log = get_logger(__name__)
+
+# Rows per multi-row INSERT statement, well under the bind parameter limits
+# of PostgreSQL and SQLite
+INSERT_CHUNK_ROWS = 500
+
+
+class PredictionRow(Protocol):
+    """A prediction history record of either mission, as persisting it uses it"""
+
+    user_id: Optional[int]
+    input_hash: Optional[str]
+
+    def model_dump(self, *, exclude: Optional[Set[str]] = None) -> Dict[str, Any]: ...
+
+
+@dataclass
+class PendingWrite:
+    """One prediction record (and its input payload rows) awaiting a flush"""
+
+    mission: str
+    table: Table
+    record: Dict[str, Any]
+    inputs: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue that persists prediction records in the background.
+
+    Callers enqueue a record and return immediately; a flusher task writes
+    whatever is queued as multi-row INSERTs in one transaction once
+    `flush_rows` records are waiting or `flush_interval_ms` has passed since
+    the first one. When the queue is full, enqueue waits for space, so memory
+    stays bounded under sustained overload.
+
+    A batch the database rejects is retried record by record, and only the
+    rejected records are dropped. Any other failure (a dropped connection, a
+    database restart) retries the whole batch up to `max_retries` times with
+    exponential backoff before its records are counted as failed.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        flush_rows: int = 500,
+        flush_interval_ms: float = 50.0,
+        enabled: bool = False,
+        max_retries: int = 5,
+        retry_backoff_ms: float = 100.0,
+    ) -> None:
+        self.max_size = max_size
+        self.flush_rows = max(1, min(flush_rows, max_size))
+        self.flush_interval_ms = flush_interval_ms
+        self.enabled = enabled
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_ms = retry_backoff_ms
+
+        self._queue: Optional[asyncio.Queue[PendingWrite]] = None
+        self._size_reached: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+        self.flushes_total = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.flush_retries = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._flush_ms_total = 0.0
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> asyncio.Queue[PendingWrite]:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._size_reached = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def enqueue(self, write: PendingWrite) -> None:
+        """Queue a record for the next flush, waiting if the queue is full"""
+        queue = self._ensure_started()
+        await queue.put(write)
+        if queue.qsize() >= self.flush_rows and self._size_reached is not None:
+            self._size_reached.set()
+
+    async def _run(self) -> None:
+        assert self._queue is not None and self._size_reached is not None
+        queue, size_reached = self._queue, self._size_reached
+        while True:
+            first = await queue.get()
+            if queue.qsize() + 1 < self.flush_rows:
+                size_reached.clear()
+                try:
+                    await asyncio.wait_for(
+                        size_reached.wait(), self.flush_interval_ms / 1000
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = [first]
+            while len(batch) < self.flush_rows and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush(self, batch: List[PendingWrite]) -> None:
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                await self._write(batch)
+                break
+            except IntegrityError as e:
+                if len(batch) > 1:
+                    # One bad row (e.g. a since-deleted user) must not drop the rest
+                    log.warning(
+                        f"Write-behind flush rejected ({str(e.orig)}), "
+                        "retrying per record"
+                    )
+                    for write in batch:
+                        await self._flush([write])
+                    return
+                self.rows_failed += 1
+                log.error(f"Write-behind record rejected: {str(e.orig)}")
+                return
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    self.rows_failed += len(batch)
+                    log.error(
+                        f"Write-behind flush of {len(batch)} records failed after "
+                        f"{attempt + 1} attempts, dropping them: {str(e)}"
+                    )
+                    return
+                delay = self.retry_backoff_ms * 2**attempt / 1000
+                attempt += 1
+                self.flush_retries += 1
+                log.warning(
+                    f"Write-behind flush of {len(batch)} records failed ({str(e)}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.flushes_total += 1
+        self.rows_written += len(batch)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._flush_ms_total += elapsed_ms
+
+    async def _write(self, batch: List[PendingWrite]) -> None:
+        """Insert a batch's input payloads and records in one transaction"""
+        inputs: Dict[str, Dict[str, Any]] = {}
+        records: Dict[Tuple[str, Table], List[Dict[str, Any]]] = {}
+        for write in batch:
+            for row in write.inputs:
+                inputs.setdefault(row["input_hash"], row)
+            records.setdefault((write.mission, write.table), []).append(write.record)
+
+        async with self._get_session_factory()() as db:
+            dialect = db.get_bind().dialect.name
+            input_table = PredictionInput.__table__  # type: ignore[attr-defined]
+            payload_rows = list(inputs.values())
+            # Payload rows first: prediction rows reference them
+            for i in range(0, len(payload_rows), INSERT_CHUNK_ROWS):
+                chunk = payload_rows[i : i + INSERT_CHUNK_ROWS]
+                await db.execute(insert_ignore(dialect, input_table).values(chunk))
+            for (mission, table), rows in records.items():
+                for i in range(0, len(rows), INSERT_CHUNK_ROWS):
+                    chunk = rows[i : i + INSERT_CHUNK_ROWS]
+                    await db.execute(insert(table).values(chunk))
+                await update_summary(db, mission, rows)
+            await db.commit()
+
+    def _get_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            # Imported lazily so the services do not create an engine on import
+            from app.utilities.db import async_session
+
+            self._session_factory = async_session
+        return self._session_factory
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the records queued so far are written, keeping the flusher
+        running. Returns False if the queue did not empty within timeout.
+        """
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+        if self._size_reached is not None:
+            self._size_reached.set()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def drain(self) -> None:
+        """Flush everything queued and stop the flusher (call on shutdown)"""
+        if self._queue is None or self._task is None:
+            return
+        if self._loop is asyncio.get_running_loop():
+            if self._size_reached is not None:
+                self._size_reached.set()
+            await self._queue.join()
+            self._task.cancel()
+        if self.backlog:
+            log.error(f"Write-behind queue dropped {self.backlog} unflushed records")
+        self._queue = None
+        self._task = None
+        log.info(f"Write-behind queue drained ({self.rows_written} records written)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue configuration and counters for health/metrics endpoints"""
+        return {
+            "enabled": self.enabled,
+            "backlog": self.backlog,
+            "max_size": self.max_size,
+            "flush_rows": self.flush_rows,
+            "flush_interval_ms": self.flush_interval_ms,
+            "flushes_total": self.flushes_total,
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "flush_retries": self.flush_retries,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "mean_flush_ms": (
+                self._flush_ms_total / self.flushes_total if self.flushes_total else 0.0
+            ),
+        }
+
+
+write_behind_queue = WriteBehindQueue(
+    max_size=settings.write_behind_max_size,
+    flush_rows=settings.write_behind_flush_rows,
+    flush_interval_ms=settings.write_behind_flush_interval_ms,
+    enabled=settings.write_behind_enabled,
+    max_retries=settings.write_behind_max_retries,
+    retry_backoff_ms=settings.write_behind_retry_backoff_ms,
+)
+
+
+async def persist_prediction(
+    db: AsyncSession, mission: str, payload: BaseModel, record: PredictionRow
+) -> None:
+    """
+    Store a prediction record and its input payload. With write-behind
+    enabled the record is queued and this returns without a DB round trip.
+    """
+    if write_behind_queue.enabled:
+        hashes, rows = input_rows(mission, [payload])
+        record.input_hash = hashes[0]
+        table = record.__table__  # type: ignore[attr-defined]
+        await write_behind_queue.enqueue(
+            PendingWrite(mission, table, record.model_dump(exclude={"id"}), rows)
+        )
+        return
+
+    (input_hash,) = await store_inputs(db, mission, [payload])
+    record.input_hash = input_hash
+    db.add(record)
+    await update_summary(db, mission, [record])
+    # Every column is set client-side, so no refresh round trip is needed
+    await commit_predictions(db, record.user_id)
+
+
+async def commit_predictions(db: AsyncSession, user_id: Optional[int]) -> None:
+    """
+    Commit pending prediction rows. A users.id foreign key violation (the
+    user was deleted since it was cached) raises the same ValueError as the
+    up-front user check.
+    """
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if user_id is not None and "foreign key" in str(e.orig).lower():
+            known_users.discard(user_id)
+            raise ValueError(f"User with ID {user_id} does not exist") from e
+        raise
@@ -0,0 +1,66 @@
+import codecs
+from typing import AsyncIterator, List
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+async def iter_lines(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decode an async byte stream (e.g. Request.stream()) into text lines.
+    Only the current partial line is buffered, so memory stays flat no matter
+    how large the body is.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in byte_stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+
+async def read_header(lines: AsyncIterator[str]) -> str:
+    """
+    Return the CSV header line, skipping blank lines and '#' comment lines
+    (NASA Exoplanet Archive exports start with a commented preamble).
+    """
+    async for line in lines:
+        if line.strip() and not line.startswith("#"):
+            return line
+    raise ValueError("CSV body is empty")
+
+
+async def iter_line_chunks(
+    lines: AsyncIterator[str], chunk_rows: int
+) -> AsyncIterator[List[str]]:
+    """Group data lines into fixed-size chunks of at most chunk_rows lines"""
+    chunk: List[str] = []
+    async for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that are still reading the request body.
+
+    Starlette's StreamingResponse listens for client disconnects by calling
+    receive() concurrently with the generator, which can swallow the final
+    body message and deadlock the upload. Here the generator is the only
+    reader; a disconnect surfaces through Request.stream() instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
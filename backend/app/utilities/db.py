@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy import create_engine, Engine
+from sqlalchemy import create_engine, event, Engine
 from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
 
@@ -15,7 +15,13 @@ from app.config import settings
 from app.utilities.logger import logger
 
 # Import models so SQLModel can create tables
-from app.models import User, PredictionRecord, TessPredictionRecord  # noqa: F401
+from app.models import (  # noqa: F401
+    User,
+    PredictionInput,
+    PredictionSummary,
+    PredictionRecord,
+    TessPredictionRecord,
+)
 
 log = logger(__name__)
 
@@ -44,6 +50,16 @@ async_engine: AsyncEngine = create_async_engine(
     pool_pre_ping=True,
 )
 
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection: Any, connection_record: Any) -> None:
+    """SQLite only enforces foreign keys (e.g. predictions.user_id) when asked"""
+    if async_engine.dialect.name == "sqlite":
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=async_engine,
     expire_on_commit=False,
@@ -92,6 +108,8 @@ def get_sync_engine(db_uri: Optional[str] = None) -> Engine:
     uri = db_uri or settings.db_uri
     if "+asyncpg" in uri:
         sync_uri = uri.replace("+asyncpg", "")
+    elif "+aiosqlite" in uri:
+        sync_uri = uri.replace("+aiosqlite", "")
     else:
         sync_uri = uri
 
@@ -0,0 +1,262 @@
+"""
+Prometheus metrics: request latency per route, time per prediction stage
+and mission, model load time, in-flight requests and errors.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (an empty directory, before
+the app is imported) so every worker writes its samples there and
+/metrics aggregates them across workers; gunicorn_conf.py clears it on
+start and drops the gauges of workers that exit.
+"""
+
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Stages timed per mission: request parsing and validation, feature
+# preprocessing, model inference, DB writes up to the commit (or the
+# write-behind enqueue), and response serialization
+STAGES = ("validation", "preprocess", "inference", "db_commit", "serialization")
+
+# Requests that matched no route share one label, so 404 scans cannot blow
+# up the number of series
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+STAGE_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+MODEL_LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_SECONDS = Histogram(
+    "exovision_request_duration_seconds",
+    "Time from receiving a request to sending the response headers",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "exovision_stage_duration_seconds",
+    "Time spent in each stage of a prediction request",
+    ["mission", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+MODEL_LOAD_SECONDS = Histogram(
+    "exovision_model_load_duration_seconds",
+    "Time to read, verify and build a model version",
+    ["model"],
+    buckets=MODEL_LOAD_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "exovision_requests_in_flight",
+    "Requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+ERRORS = Counter(
+    "exovision_errors_total",
+    "Failed requests by route and the exception that caused the failure",
+    ["route", "exception"],
+)
+# Micro-batchers: the configuration is the same in every worker; the rows
+# waiting for a batch add up over the live workers
+BATCHER_WINDOW_SECONDS = Gauge(
+    "exovision_batcher_window_seconds",
+    "Time a micro-batcher waits for more rows after the first pending one",
+    ["batcher"],
+    multiprocess_mode="max",
+)
+BATCHER_MAX_ROWS = Gauge(
+    "exovision_batcher_max_batch_rows",
+    "Rows that dispatch a micro-batch without waiting for the window",
+    ["batcher"],
+    multiprocess_mode="max",
+)
+BATCHER_QUEUE_DEPTH = Gauge(
+    "exovision_batcher_queue_depth",
+    "Rows waiting for the next micro-batch",
+    ["batcher"],
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class RequestTimings:
+    """Points in one request's life, shared between middleware and handler"""
+
+    start: float
+    handler_start: Optional[float] = None
+    handler_end: Optional[float] = None
+    # Set by the first prediction stage timed during the request
+    mission: Optional[str] = None
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request() -> RequestTimings:
+    """Begin timing the current request"""
+    timings = RequestTimings(start=time.perf_counter())
+    _timings.set(timings)
+    return timings
+
+
+def route_label(request: Request) -> str:
+    """Path template of the matched route, e.g. /tess/predictions/{prediction_id}"""
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def observe_request(
+    request: Request, timings: RequestTimings, status_code: int
+) -> float:
+    """
+    Record a finished request, and the validation and serialization time of
+    prediction requests. Returns the request's duration in seconds.
+    """
+    end = time.perf_counter()
+    elapsed = end - timings.start
+    REQUEST_SECONDS.labels(request.method, route_label(request), status_code).observe(
+        elapsed
+    )
+    # Before the handler: body parsing and validation; after it: the response
+    # model check and JSON encoding
+    if (
+        timings.mission is not None
+        and timings.handler_start is not None
+        and timings.handler_end is not None
+    ):
+        STAGE_SECONDS.labels(timings.mission, "validation").observe(
+            timings.handler_start - timings.start
+        )
+        STAGE_SECONDS.labels(timings.mission, "serialization").observe(
+            end - timings.handler_end
+        )
+    return elapsed
+
+
+def count_error(request: Request, error: BaseException) -> None:
+    ERRORS.labels(route_label(request), type(error).__name__).inc()
+
+
+@contextmanager
+def stage_timer(mission: str, stage: str) -> Iterator[None]:
+    """Time a block as one stage of the current prediction request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(mission, stage).observe(time.perf_counter() - start)
+        timings = _timings.get()
+        if timings is not None and timings.mission is None:
+            timings.mission = mission
+
+
+def observe_model_load(name: str, seconds: float) -> None:
+    MODEL_LOAD_SECONDS.labels(name).observe(seconds)
+
+
+def observe_batcher_config(name: str, window_ms: float, max_batch_size: int) -> None:
+    BATCHER_WINDOW_SECONDS.labels(name).set(window_ms / 1000)
+    BATCHER_MAX_ROWS.labels(name).set(max_batch_size)
+
+
+def _timed_call(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint to note when it starts and returns"""
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            timings = _timings.get()
+            if timings is not None:
+                timings.handler_start = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings.handler_end = time.perf_counter()
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args: Any, **kwargs: Any) -> Any:
+        timings = _timings.get()
+        if timings is not None:
+            timings.handler_start = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            if timings is not None:
+                timings.handler_end = time.perf_counter()
+
+    return endpoint
+
+
+class TimedRoute(APIRoute):
+    """
+    An APIRoute that notes when its endpoint runs, which splits the request
+    time into validation, the handler and serialization
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, endpoint, **kwargs)
+        # The request handler reads dependant.call on every request; the
+        # endpoint's signature has already been analysed
+        if self.dependant.call is not None:
+            self.dependant.call = _timed_call(self.dependant.call)
+
+
+def render() -> Tuple[bytes, str]:
+    """The metrics exposition, aggregated over all workers in multiprocess mode"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,39 @@
+"""Dialect-aware SQL statement helpers (no engine or session required)"""
+
+from typing import Sequence, Union
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+
+def insert_ignore(dialect_name: str, table: Table) -> Insert:
+    """
+    Return an INSERT for `table` that silently skips rows whose primary key
+    already exists (ON CONFLICT DO NOTHING on PostgreSQL and SQLite).
+    """
+    if dialect_name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    raise NotImplementedError(f"insert_ignore is not supported on {dialect_name}")
+
+
+def upsert_add(
+    dialect_name: str, table: Table, keys: Sequence[str], columns: Sequence[str]
+) -> Insert:
+    """
+    Return an INSERT for `table` that, when a row with the same `keys` already
+    exists, adds the new values of `columns` onto it instead (counters).
+    """
+    stmt: Union[postgresql.Insert, sqlite.Insert]
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(table)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"upsert_add is not supported on {dialect_name}")
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+    )
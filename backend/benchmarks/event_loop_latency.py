@@ -0,0 +1,146 @@
+"""
+Mixed-traffic latency with inference on and off the event loop.
+
+Usage (from the backend directory, production models in models/):
+    python -m benchmarks.event_loop_latency --duration 10
+
+Heavy clients keep uploading the TESS catalog for scoring (inference-bound,
+no database writes) while other clients send Kepler single predictions and
+health checks. The same traffic runs once with
+INFERENCE_EXECUTOR=inline (inference inside the coroutine, the old behaviour)
+and once per pool mode, and p50/p99 latency is reported per request type.
+Requires aiosqlite for the throwaway SQLite database.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+_db_dir = tempfile.mkdtemp(prefix="exovision-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'bench.db')}"
+)
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.models import PredictionRequest  # noqa: E402
+from app.services.prediction.executor import inference_executor  # noqa: E402
+from app.utilities.db import init_models  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+KEPLER_CSV = os.path.join(DATA_DIR, "kepler_exoplanets.csv")
+TESS_CSV = os.path.join(DATA_DIR, "TESS exoplanet data.csv")
+
+
+def load_kepler_rows(count: int) -> List[Dict[str, float]]:
+    """Sample complete KOI rows from the Kepler catalog as request payloads"""
+    fields = list(PredictionRequest.model_fields)
+    df = pd.read_csv(KEPLER_CSV)
+    # The catalog never fills koi_teq_err*, but the request schema requires them
+    df = df.fillna({"koi_teq_err1": 0.0, "koi_teq_err2": 0.0}).dropna(subset=fields)
+    df = df.sample(n=count, replace=len(df) < count, random_state=42)
+    return [{f: float(v) for f, v in zip(fields, row)} for row in df[fields].values]
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    deadline: float,
+    samples: List[float],
+    pause: float,
+    **request: Any,
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.request(method, url, **request)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+        if pause:
+            await asyncio.sleep(pause)
+
+
+async def run_mode(
+    mode: str, duration: float, rows: List[Dict[str, float]], catalog: bytes
+) -> Dict[str, List[float]]:
+    inference_executor.shutdown()
+    inference_executor.mode = mode
+
+    samples: Dict[str, List[float]] = {"health": [], "predict": [], "upload": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        # Warm up the model and pool outside the measured window
+        await c.post("/predictions/predict", json=rows[0])
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *[
+                _client_loop(
+                    c,
+                    "POST",
+                    "/tess/predictions/predict/upload",
+                    deadline,
+                    samples["upload"],
+                    0.0,
+                    content=catalog,
+                )
+                for _ in range(2)
+            ],
+            *[
+                _client_loop(
+                    c,
+                    "POST",
+                    "/predictions/predict",
+                    deadline,
+                    samples["predict"],
+                    0.01,
+                    json=row,
+                )
+                for row in rows
+            ],
+            _client_loop(
+                c, "GET", "/predictions/health", deadline, samples["health"], 0.005
+            ),
+        )
+    return samples
+
+
+def _summary(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    ms = np.asarray(values) * 1000
+    return (
+        f"n={len(ms):5d}  p50={np.percentile(ms, 50):8.2f}ms  "
+        f"p99={np.percentile(ms, 99):8.2f}ms"
+    )
+
+
+async def main(duration: float, clients: int, modes: List[str]) -> None:
+    await init_models()
+    rows = load_kepler_rows(clients)
+    with open(TESS_CSV, "rb") as f:
+        catalog = f.read()
+    for mode in modes:
+        samples = await run_mode(mode, duration, rows, catalog)
+        print(f"\n== INFERENCE_EXECUTOR={mode}")
+        for kind, values in samples.items():
+            print(f"  {kind:8s} {_summary(values)}")
+    inference_executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--clients", type=int, default=8, help="Concurrent single-predict clients"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", default=["inline", "thread"], help="Executor modes"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.duration, args.clients, args.modes))
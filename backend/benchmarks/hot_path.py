@@ -0,0 +1,332 @@
+"""
+Per-stage microbenchmarks of the prediction hot path, with regression checks.
+
+Usage (from the backend directory, model files in models/):
+    python -m benchmarks.hot_path --output results.json
+    python -m benchmarks.hot_path --baseline results.json [--output new.json]
+
+For each mission, rows sampled from the catalog CSVs are timed through every
+stage a prediction request goes through, at each batch size:
+
+  validate     PredictionRequest / TessPredictionRequest.model_validate
+  preprocess   request objects to the model's float32 feature matrix
+  inference    the service's model call on that matrix
+  serialize    building the response models and dumping them to JSON
+  db_insert    inserting the prediction rows and committing, on a
+               temporary SQLite file
+
+Each stage reports the median time per call (and per row) over several
+rounds. Results are written as JSON; with --baseline, every stage is
+compared with the baseline run and the exit status is 1 if one got slower
+than its threshold allows (see hot_path_thresholds.json).
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Type
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from sqlalchemy import Table, create_engine, insert
+from sqlmodel import SQLModel
+
+from app.config import settings
+from app.models import (
+    PredictionBatchResponse,
+    PredictionRecord,
+    PredictionRequest,
+    PredictionResponse,
+    TessPredictionListResponse,
+    TessPredictionRecord,
+    TessPredictionRequest,
+    TessPredictionResponse,
+)
+from app.services.prediction import prediction_service, tess_prediction_service
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "hot_path_thresholds.json")
+
+# Rows per INSERT statement, as the write-behind flusher uses
+INSERT_CHUNK_ROWS = 500
+
+Stage = Callable[[int], Callable[[], Any]]
+
+
+def sample_rows(
+    filename: str, request_model: Type[BaseModel], count: int
+) -> List[Dict[str, Any]]:
+    """Complete catalog rows as request bodies, sampled reproducibly"""
+    fields = list(request_model.model_fields)
+    df = pd.read_csv(os.path.join(DATA_DIR, filename))
+    # The Kepler catalog never fills koi_teq_err*, but the request requires them
+    df = df.fillna({"koi_teq_err1": 0.0, "koi_teq_err2": 0.0}).dropna(subset=fields)
+    df = df.sample(n=count, replace=len(df) < count, random_state=42)
+    return [dict(zip(fields, map(float, row))) for row in df[fields].values]
+
+
+def measure(
+    fn: Callable[[], Any], rows: int, min_seconds: float, rounds: int
+) -> Dict[str, float]:
+    """Median and best time per call over `rounds` rounds of repeated calls"""
+    start = time.perf_counter()
+    fn()
+    # Enough calls per round for the rounds to take min_seconds in total
+    first = max(time.perf_counter() - start, 1e-9)
+    calls = max(1, int(min_seconds / rounds / first))
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        per_call.append((time.perf_counter() - start) / calls)
+    median = statistics.median(per_call)
+    return {
+        "rows": rows,
+        "calls": calls * rounds,
+        "median_us": median * 1e6,
+        "min_us": min(per_call) * 1e6,
+        "per_row_us": median * 1e6 / rows,
+    }
+
+
+def _insert_stage(table: Table, record: Callable[[], Dict[str, Any]]) -> Stage:
+    """Insert and commit `size` prediction rows on a temporary SQLite database"""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="hot_path_"), "bench.db")
+    # Built here rather than through app.utilities.db, whose module-level
+    # engine needs an async DATABASE_URL
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    connection = engine.connect()
+
+    def stage(size: int) -> Callable[[], Any]:
+        def run() -> None:
+            rows = [record() for _ in range(size)]
+            for i in range(0, size, INSERT_CHUNK_ROWS):
+                connection.execute(insert(table), rows[i : i + INSERT_CHUNK_ROWS])
+            connection.commit()
+
+        return run
+
+    return stage
+
+
+def kepler_stages(rows: List[Dict[str, Any]]) -> Dict[str, Stage]:
+    service = prediction_service
+    requests = [PredictionRequest.model_validate(row) for row in rows]
+    matrix = service.preprocess_batch(requests)
+    scores = service._score_rows(matrix)
+
+    def serialize(size: int) -> Callable[[], Any]:
+        now = datetime.now()
+
+        def run() -> bytes:
+            predictions = [
+                PredictionResponse(
+                    prediction=prediction,
+                    confidence=confidence,
+                    prediction_id=str(uuid.uuid4()),
+                    timestamp=now,
+                )
+                for prediction, confidence in scores[:size]
+            ]
+            if size == 1:
+                return predictions[0].model_dump_json().encode()
+            response = PredictionBatchResponse(predictions=predictions, total=size)
+            return response.model_dump_json().encode()
+
+        return run
+
+    def record() -> Dict[str, Any]:
+        return {
+            "prediction_id": str(uuid.uuid4()),
+            "prediction": 1,
+            "confidence": 0.9,
+            "created_at": datetime.now(),
+        }
+
+    return {
+        "validate": lambda size: lambda: [
+            PredictionRequest.model_validate(row) for row in rows[:size]
+        ],
+        "preprocess": lambda size: (
+            (lambda: service.preprocess_input(requests[0]))
+            if size == 1
+            else (lambda: service.preprocess_batch(requests[:size]))
+        ),
+        "inference": lambda size: lambda: service._score_rows(matrix[:size]),
+        "serialize": serialize,
+        "db_insert": _insert_stage(PredictionRecord.__table__, record),
+    }
+
+
+def tess_stages(rows: List[Dict[str, Any]]) -> Dict[str, Stage]:
+    service = tess_prediction_service
+    requests = [TessPredictionRequest.model_validate(row) for row in rows]
+    matrix = service.features.from_models(requests)
+    scores = service._score_rows(matrix)
+
+    def serialize(size: int) -> Callable[[], Any]:
+        now = datetime.now()
+
+        def run() -> bytes:
+            predictions = [
+                TessPredictionResponse(
+                    prediction=label,
+                    confidence=confidence,
+                    prediction_id=str(uuid.uuid4()),
+                    timestamp=now,
+                )
+                for label, confidence in scores[:size]
+            ]
+            if size == 1:
+                return predictions[0].model_dump_json().encode()
+            response = TessPredictionListResponse(
+                predictions=predictions, total=size, page=1, size=size
+            )
+            return response.model_dump_json().encode()
+
+        return run
+
+    def record() -> Dict[str, Any]:
+        return {
+            "prediction_id": str(uuid.uuid4()),
+            "prediction": "CP",
+            "confidence": 0.9,
+            "created_at": datetime.now(),
+        }
+
+    return {
+        "validate": lambda size: lambda: [
+            TessPredictionRequest.model_validate(row) for row in rows[:size]
+        ],
+        "preprocess": lambda size: (
+            (lambda: service.preprocess_input(requests[0]))
+            if size == 1
+            else (lambda: service.features.from_models(requests[:size]))
+        ),
+        "inference": lambda size: lambda: service._score_rows(matrix[:size]),
+        "serialize": serialize,
+        "db_insert": _insert_stage(
+            TessPredictionRecord.__table__, record  # type: ignore[attr-defined]
+        ),
+    }
+
+
+MISSIONS = {
+    "kepler": ("kepler_exoplanets.csv", PredictionRequest, kepler_stages),
+    "tess": ("TESS exoplanet data.csv", TessPredictionRequest, tess_stages),
+}
+
+
+def run(
+    missions: List[str], batch_sizes: List[int], min_seconds: float, rounds: int
+) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, float]] = {}
+    for mission in missions:
+        filename, request_model, build = MISSIONS[mission]
+        stages = build(sample_rows(filename, request_model, max(batch_sizes)))
+        for name, stage in stages.items():
+            for size in batch_sizes:
+                key = f"{mission}.{name}.{size}"
+                results[key] = measure(stage(size), size, min_seconds, rounds)
+                print(
+                    f"{key:28s} {results[key]['median_us']:12,.1f} us "
+                    f"{results[key]['per_row_us']:10,.2f} us/row",
+                    flush=True,
+                )
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "kepler_rf_engine": settings.kepler_rf_engine,
+            "tess_xgb_engine": settings.tess_xgb_engine,
+            "min_seconds": min_seconds,
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+def _threshold(thresholds: Dict[str, Any], key: str) -> float:
+    for pattern, limit in thresholds.get("stages", {}).items():
+        if fnmatch.fnmatch(key, pattern):
+            return float(limit)
+    return float(thresholds["default"])
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], thresholds: Dict[str, Any]
+) -> List[str]:
+    """Stages slower than the baseline by more than their threshold"""
+    min_delta_us = float(thresholds.get("min_delta_us", 0))
+    regressions = []
+    print(f"\n{'stage':28s} {'baseline us':>12s} {'current us':>12s} {'change':>8s}")
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        change = result["median_us"] / base["median_us"] - 1
+        limit = _threshold(thresholds, key)
+        regressed = (
+            change > limit and result["median_us"] - base["median_us"] > min_delta_us
+        )
+        print(
+            f"{key:28s} {base['median_us']:12,.1f} {result['median_us']:12,.1f} "
+            f"{change:+7.0%}{'  REGRESSION (limit +%.0f%%)' % (limit * 100) if regressed else ''}"
+        )
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--missions", nargs="+", choices=list(MISSIONS), default=list(MISSIONS)
+    )
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000]
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=0.5, help="Time spent per stage"
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="Median of N rounds")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON to check for regressions")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    args = parser.parse_args()
+
+    results = run(args.missions, args.batch_sizes, args.min_seconds, args.rounds)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+        regressions = compare(results, baseline, thresholds)
+        if regressions:
+            print(f"\n{len(regressions)} stages regressed: {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Storage size and bulk decode throughput of stored prediction inputs.
+
+Usage (from the backend directory):
+    python -m benchmarks.input_storage --rows 100000
+
+Catalog rows are stored the way prediction_inputs keeps them, once as the
+legacy JSON text and once as packed features, in an in-memory SQLite table.
+For each format the bytes per row are reported, and the time to read every
+row back from the table into a (rows, fields) NumPy matrix: json.loads plus
+a per-field rebuild for JSON, one frombuffer for packed rows.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, List, Tuple, Type
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from app.models import PredictionRequest, TessPredictionRequest
+from app.services.prediction.inputs import CURRENT_SCHEMAS, decode_inputs
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+CATALOGS: List[Tuple[str, str, Type[BaseModel]]] = [
+    ("kepler", "kepler_exoplanets.csv", PredictionRequest),
+    ("tess", "TESS exoplanet data.csv", TessPredictionRequest),
+]
+
+
+def load_payloads(
+    filename: str, request_model: Type[BaseModel], count: int
+) -> List[BaseModel]:
+    """Sample complete catalog rows as request payloads"""
+    fields = list(request_model.model_fields)
+    df = pd.read_csv(os.path.join(DATA_DIR, filename))
+    # The Kepler catalog never fills koi_teq_err*, but the request requires them
+    df = df.fillna({"koi_teq_err1": 0.0, "koi_teq_err2": 0.0}).dropna(subset=fields)
+    df = df.sample(n=count, replace=len(df) < count, random_state=42)
+    return [
+        request_model.model_validate(dict(zip(fields, row)))
+        for row in df[fields].values
+    ]
+
+
+def _best_of(runs: int, fn: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(mission: str, payloads: List[BaseModel], runs: int) -> None:
+    schema = CURRENT_SCHEMAS[mission]
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE json_inputs (input_data TEXT)")
+    db.execute("CREATE TABLE packed_inputs (schema_id INTEGER, features BLOB)")
+    db.executemany(
+        "INSERT INTO json_inputs VALUES (?)",
+        [(json.dumps(p.model_dump()),) for p in payloads],
+    )
+    db.executemany(
+        "INSERT INTO packed_inputs VALUES (?, ?)",
+        [(schema.schema_id, schema.pack(p)) for p in payloads],
+    )
+
+    def size(query: str) -> float:
+        return float(db.execute(query).fetchone()[0]) / len(payloads)
+
+    def read_json() -> np.ndarray:
+        rows = db.execute("SELECT input_data FROM json_inputs").fetchall()
+        records = [json.loads(text) for (text,) in rows]
+        return np.array([[record[c] for c in schema.columns] for record in records])
+
+    def read_packed() -> np.ndarray:
+        rows = db.execute("SELECT schema_id, features FROM packed_inputs").fetchall()
+        return decode_inputs(schema, [(sid, blob, None) for sid, blob in rows])
+
+    assert np.array_equal(read_json(), read_packed())
+    json_s = _best_of(runs, read_json)
+    packed_s = _best_of(runs, read_packed)
+
+    print(f"\n== {mission}: {len(payloads)} rows x {len(schema.columns)} fields")
+    print(
+        f"  json    {size('SELECT sum(length(input_data)) FROM json_inputs'):7.1f} "
+        f"B/row  decode {len(payloads) / json_s:12,.0f} rows/s"
+    )
+    print(
+        f"  packed  {size('SELECT sum(length(features)) FROM packed_inputs'):7.1f} "
+        f"B/row  decode {len(payloads) / packed_s:12,.0f} rows/s "
+        f"({json_s / packed_s:.1f}x)"
+    )
+
+
+def main(rows: int, runs: int) -> None:
+    for mission, filename, request_model in CATALOGS:
+        run(mission, load_payloads(filename, request_model, rows), runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3, help="Best of N timings")
+    args = parser.parse_args()
+    main(args.rows, args.runs)
@@ -0,0 +1,132 @@
+"""
+Kepler ANN inference: TensorFlow/Keras versus the NumPy forward pass.
+
+Usage (from the backend directory):
+    python -m benchmarks.kepler_ann_engine [--model models/kepler_ann.h5]
+
+Reports throughput per batch size on Kepler catalog rows for the NumPy
+DenseNetwork and, when TensorFlow is installed, for the Keras model after
+checking that both give the same probabilities. The cost of getting a
+fresh process ready to predict (imports, model load and first call) and
+its peak RSS is measured for each in a subprocess.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.prediction.dense import DenseNetwork
+from app.services.prediction.features import KEPLER_FEATURE_SPEC
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/kepler_ann.keras")
+
+# Float32 results of TensorFlow and NumPy may differ in the last bits
+TOLERANCE = 1e-6
+
+COLD_SCRIPT = """
+import resource, sys, time
+import numpy as np
+start = time.perf_counter()
+if sys.argv[1] == "tensorflow":
+    import tensorflow as tf
+    model = tf.keras.models.load_model(sys.argv[2], compile=False)
+    model(np.zeros((1, model.input_shape[1]), dtype=np.float32), training=False)
+else:
+    from app.services.prediction.dense import DenseNetwork
+    model = DenseNetwork.load(sys.argv[2])
+    model.predict_proba(np.zeros((1, model.n_features), dtype=np.float32))
+elapsed = time.perf_counter() - start
+# VmHWM starts over at exec; ru_maxrss would include the parent's peak
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmHWM:"):
+            rss = int(line.split()[1]) / 1024
+print(f"{elapsed * 1000:.0f} {rss:.0f}")
+"""
+
+
+def _rate(fn: Callable[[], Any], rows: int, min_seconds: float = 1.0) -> float:
+    """Rows per second of fn, repeated for at least min_seconds"""
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls * rows / elapsed
+
+
+def _cold_start(engine: str, model_path: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_SCRIPT, engine, model_path],
+        capture_output=True,
+        text=True,
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+    )
+    if result.returncode != 0:
+        return "failed"
+    ms, rss = result.stdout.split()[-2:]
+    return f"ready in {ms} ms, peak RSS {rss} MB"
+
+
+def _keras_model(model_path: str) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    try:
+        import tensorflow as tf
+    except ImportError:
+        return None
+    model = tf.keras.models.load_model(model_path, compile=False)
+    return lambda X: model(X, training=False).numpy()[:, 0]
+
+
+def main(model_path: str, batch_sizes: List[int]) -> None:
+    features = KEPLER_FEATURE_SPEC.compile()
+    df = pd.read_csv(os.path.join(DATA_DIR, "kepler_exoplanets.csv"))
+    X = features.from_frame(df.dropna(subset=list(features.base_columns)))
+
+    network = DenseNetwork.load(model_path)
+    keras = _keras_model(model_path)
+    if keras is not None:
+        diff = np.abs(keras(X) - network.predict_proba(X)[:, 1]).max()
+        assert diff <= TOLERANCE, f"NumPy and Keras differ by {diff}"
+        print(f"Max difference from Keras on {len(X)} catalog rows: {diff:.2e}")
+    else:
+        print("TensorFlow is not installed; timing the NumPy network only")
+
+    print(
+        f"{len(network.layers)} dense layers, {network.nbytes / 1024:.0f} KiB of weights"
+    )
+    print(f"{'batch':>6s} {'keras rows/s':>13s} {'numpy rows/s':>13s} {'speedup':>8s}")
+    for size in batch_sizes:
+        batch = X[:size]
+        numpy_rate = _rate(partial(network.predict_proba, batch), len(batch))
+        if keras is not None:
+            keras_rate = _rate(partial(keras, batch), len(batch))
+            print(
+                f"{len(batch):6d} {keras_rate:13,.0f} {numpy_rate:13,.0f} "
+                f"{numpy_rate / keras_rate:7.1f}x"
+            )
+        else:
+            print(f"{len(batch):6d} {'-':>13s} {numpy_rate:13,.0f}")
+
+    print(f"numpy:      {_cold_start('numpy', model_path)}")
+    if keras is not None:
+        print(f"tensorflow: {_cold_start('tensorflow', model_path)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 256, 1024, 8192]
+    )
+    args = parser.parse_args()
+    main(os.path.abspath(args.model), args.batch_sizes)
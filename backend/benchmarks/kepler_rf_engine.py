@@ -0,0 +1,132 @@
+"""
+Kepler RF inference: sklearn RandomForestClassifier versus the flat engine.
+
+Usage (from the backend directory, rf_model.joblib in models/):
+    python -m benchmarks.kepler_rf_engine
+
+Reports throughput for batch sizes the API and the bulk scorer use, on
+Kepler catalog rows, after checking that both engines return the same
+probabilities: sklearn, flat, and the service's routing between them by
+batch size (KEPLER_RF_SKLEARN_MIN_ROWS), which should match the faster of
+the two at every size. The last batch size at which flat is faster is
+printed as the measured crossover. Resident memory is measured in fresh
+processes: loading the pickled sklearn forest (which imports sklearn and
+scipy) versus loading the flattened arrays.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, List
+
+import numpy as np
+import pandas as pd
+from joblib import load
+
+from app.config import settings
+from app.services.prediction.features import KEPLER_FEATURE_SPEC
+from app.services.prediction.forest import FlatForest, SizedForest
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/rf_model.joblib")
+
+RSS_SCRIPT = """
+import sys
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS"):
+                return int(line.split()[1]) / 1024
+import numpy as np
+before = rss_mb()
+if sys.argv[1] == "sklearn":
+    from joblib import load
+    model = load(sys.argv[2])
+else:
+    from app.services.prediction.forest import FlatForest
+    model = FlatForest.load(sys.argv[2])
+print(f"{rss_mb() - before:.1f}")
+"""
+
+
+def _rate(fn: Callable[[], Any], rows: int, min_seconds: float = 1.0) -> float:
+    """Rows per second of fn, repeated for at least min_seconds"""
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls * rows / elapsed
+
+
+def _rss(engine: str, path: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", RSS_SCRIPT, engine, path],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def main(batch_sizes: List[int]) -> None:
+    features = KEPLER_FEATURE_SPEC.compile()
+    df = pd.read_csv(os.path.join(DATA_DIR, "kepler_exoplanets.csv"))
+    X = features.from_frame(df.dropna(subset=list(features.base_columns)))
+
+    model = load(MODEL_PATH)
+    model.n_jobs = 1
+    forest = FlatForest.from_sklearn(model)
+    assert np.array_equal(model.predict_proba(X), forest.predict_proba(X))
+    min_rows = settings.kepler_rf_sklearn_min_rows
+    routed = SizedForest(forest, lambda: model, min_rows, sklearn=model)
+
+    print(f"{forest.n_trees} trees, {len(forest.left)} nodes, {len(X)} catalog rows")
+    print(
+        f"{'batch':>6s} {'sklearn rows/s':>15s} {'flat rows/s':>12s} {'speedup':>8s} "
+        f"{'routed rows/s':>14s} {'vs best':>8s}"
+    )
+    crossover = 0
+    for size in batch_sizes:
+        batch = X[:size]
+        sklearn_rate = _rate(partial(model.predict_proba, batch), len(batch))
+        flat_rate = _rate(partial(forest.predict_proba, batch), len(batch))
+        routed_rate = _rate(partial(routed.predict_proba, batch), len(batch))
+        if flat_rate > sklearn_rate:
+            crossover = len(batch)
+        print(
+            f"{len(batch):6d} {sklearn_rate:15,.0f} {flat_rate:12,.0f} "
+            f"{flat_rate / sklearn_rate:7.1f}x {routed_rate:14,.0f} "
+            f"{routed_rate / max(sklearn_rate, flat_rate):7.2f}x"
+        )
+    print(
+        f"Flat is faster up to {crossover} rows; "
+        f"KEPLER_RF_SKLEARN_MIN_ROWS={min_rows}"
+    )
+
+    flat_path = os.path.join(os.path.dirname(MODEL_PATH), "bench_rf.flat.npz")
+    forest.save(flat_path)
+    try:
+        print(
+            f"RSS after load: sklearn {_rss('sklearn', MODEL_PATH)} MB, "
+            f"flat {_rss('flat', flat_path)} MB"
+        )
+    finally:
+        os.remove(flat_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 8, 64, 128, 256, 384, 512, 1024, 8192],
+    )
+    args = parser.parse_args()
+    main(args.batch_sizes)
@@ -0,0 +1,108 @@
+"""
+Worker startup time: importing the app, creating tables and loading models.
+
+Usage (from the backend directory, with the model files in models/):
+    python -m benchmarks.startup [--runs 5]
+
+Each run boots the app in a fresh interpreter the way a worker does
+(import app.main, init_models, load_models) and reports the median time of
+every phase. "forked" measures the same startup in a process forked from
+one that already loaded the models, as gunicorn workers are with
+PRELOAD_MODELS=true, i.e. the cost of adding a worker when scaling out.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+BOOT_SCRIPT = """
+import asyncio, gc, json, os, sys, time
+
+def boot(started):
+    from app.main import load_models
+    from app.services.prediction import model_registry
+    from app.utilities.db import init_models
+
+    timings = {}
+    start = time.perf_counter()
+    asyncio.run(init_models())
+    timings["init_models"] = time.perf_counter() - start
+    before = {info.name: info.loaded_at for info in model_registry.info()}
+    start = time.perf_counter()
+    load_models()
+    timings["load_models"] = time.perf_counter() - start
+    for info in model_registry.info():
+        loaded_here = before.get(info.name) != info.loaded_at
+        timings[f"  {info.name}"] = info.load_ms / 1000 if loaded_here else 0.0
+    timings["total"] = time.perf_counter() - started
+    return timings
+
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter() - started
+
+if sys.argv[1] == "cold":
+    timings = {"import": imported, **boot(started)}
+else:
+    from app.main import load_models
+    load_models()
+    gc.freeze()
+    pid = os.fork()
+    if pid:
+        os.waitpid(pid, 0)
+        sys.exit(0)
+    timings = {"import": 0.0, **boot(time.perf_counter())}
+print("TIMINGS " + json.dumps(timings))
+"""
+
+
+def run(mode: str, env: Dict[str, str]) -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT_SCRIPT, mode],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    line = next(
+        line for line in result.stdout.splitlines() if line.startswith("TIMINGS ")
+    )
+    timings: Dict[str, float] = json.loads(line[len("TIMINGS ") :])
+    return timings
+
+
+def main(runs: int) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "startup.db")
+    env = dict(
+        os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{db_path}", LOG_LEVEL="warning"
+    )
+    # Create the tables once, so every run times the same no-op check
+    run("cold", env)
+
+    results: Dict[str, List[Dict[str, float]]] = {
+        mode: [run(mode, env) for _ in range(runs)] for mode in ("cold", "forked")
+    }
+    phases = list(results["cold"][0])
+    print(f"median of {runs} runs, ms")
+    print(f"{'phase':<14s} {'cold':>8s} {'forked':>8s}")
+    for phase in phases:
+        cells = []
+        for mode in ("cold", "forked"):
+            values = [timings.get(phase, 0.0) for timings in results[mode]]
+            cells.append(f"{statistics.median(values) * 1000:8.0f}")
+        print(f"{phase:<14s} {' '.join(cells)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.runs)
@@ -0,0 +1,114 @@
+"""
+TESS XGBoost inference: the sklearn wrapper versus the native booster.
+
+Usage (from the backend directory, tess_xgb_improved_model.pkl in models/):
+    python -m benchmarks.tess_xgb_engine
+
+Reports throughput per batch size on TESS catalog rows, after checking that
+both paths return the same probabilities, for three paths: unpickling the
+model on every call (what the service did before it kept the loaded model),
+the cached XGBClassifier, and the native booster's in-place prediction.
+Also reports the time to load each model file.
+"""
+
+import argparse
+import os
+import pickle
+import time
+from functools import partial
+from typing import Any, Callable, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.prediction.booster import NativeBooster
+from app.services.prediction.features import TESS_FEATURE_SPEC
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), "../models/tess_xgb_improved_model.pkl"
+)
+
+# The per-call unpickle path is only measured on small batches: it is there
+# to show the fixed cost of a call
+RELOAD_MAX_BATCH = 64
+
+
+def _rate(fn: Callable[[], Any], rows: int, min_seconds: float = 1.0) -> float:
+    """Rows per second of fn, repeated for at least min_seconds"""
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls * rows / elapsed
+
+
+def _load_pickle() -> Any:
+    with open(MODEL_PATH, "rb") as f:
+        model = pickle.load(f)
+    model.set_params(n_jobs=1)
+    return model
+
+
+def _reload_and_predict(batch: np.ndarray) -> Any:
+    """The per-call model load the service did before the booster was cached"""
+    return _load_pickle().predict_proba(batch)
+
+
+def _load_seconds(fn: Callable[[], Any], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(batch_sizes: List[int]) -> None:
+    features = TESS_FEATURE_SPEC.compile()
+    df = pd.read_csv(os.path.join(DATA_DIR, "TESS exoplanet data.csv"))
+    X = features.from_frame(df.dropna(subset=list(features.base_columns)))
+
+    model = _load_pickle()
+    booster = NativeBooster.from_sklearn(model, n_threads=1)
+    assert np.array_equal(model.predict_proba(X), booster.predict_proba(X))
+
+    print(f"{booster.booster.num_boosted_rounds()} rounds, {len(X)} catalog rows")
+    print(
+        f"{'batch':>6s} {'reload rows/s':>14s} {'sklearn rows/s':>15s} "
+        f"{'native rows/s':>14s} {'speedup':>8s}"
+    )
+    for size in batch_sizes:
+        batch = X[:size]
+        reload_rate = (
+            f"{_rate(partial(_reload_and_predict, batch), len(batch)):14,.0f}"
+            if size <= RELOAD_MAX_BATCH
+            else f"{'-':>14s}"
+        )
+        sklearn_rate = _rate(partial(model.predict_proba, batch), len(batch))
+        native_rate = _rate(partial(booster.predict_proba, batch), len(batch))
+        print(
+            f"{len(batch):6d} {reload_rate} {sklearn_rate:15,.0f} "
+            f"{native_rate:14,.0f} {native_rate / sklearn_rate:7.2f}x"
+        )
+
+    ubj_path = os.path.join(os.path.dirname(MODEL_PATH), "bench_tess.ubj")
+    booster.save(ubj_path)
+    try:
+        print(
+            f"Load: pickle {_load_seconds(_load_pickle) * 1000:.0f} ms, "
+            f"native {_load_seconds(lambda: NativeBooster.load(ubj_path)) * 1000:.0f} ms"
+        )
+    finally:
+        os.remove(ubj_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 256, 1024, 8192]
+    )
+    args = parser.parse_args()
+    main(args.batch_sizes)
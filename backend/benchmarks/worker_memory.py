@@ -0,0 +1,169 @@
+"""
+Memory of gunicorn workers with and without PRELOAD_MODELS.
+
+Usage (from the backend directory, with the model files in models/):
+    python -m benchmarks.worker_memory [--workers 4]
+
+Starts gunicorn with gunicorn_conf.py twice, once loading the models in
+every worker and once preloading them in the master, sends a few
+predictions so each worker has scored, then reads /proc/<pid>/smaps_rollup
+of every worker. USS (private pages) is what each additional worker costs;
+PSS splits shared pages between the processes that map them.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List
+
+import pandas as pd
+
+from app.models import PredictionRequest, TessPredictionRequest
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../exo-model/data")
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0].endswith(":") and len(parts) == 3:
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def _post(url: str, payload: object) -> None:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    urllib.request.urlopen(request, timeout=30).read()
+
+
+def _rows(csv_name: str, columns: List[str]) -> List[Dict[str, float]]:
+    df = pd.read_csv(os.path.join(DATA_DIR, csv_name), nrows=1000)
+    # Columns left empty throughout the catalog are sent as 0
+    df = df[columns].fillna({c: 0.0 for c in columns if df[c].isna().all()})
+    return [
+        {column: float(row[column]) for column in columns}
+        for _, row in df.dropna().head(100).iterrows()
+    ]
+
+
+def measure(
+    preload: bool,
+    workers: int,
+    kepler_rows: List[Dict[str, float]],
+    tess_rows: List[Dict[str, float]],
+) -> None:
+    port = _free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), "worker_memory.db")
+    env = dict(
+        os.environ,
+        PRELOAD_MODELS="true" if preload else "false",
+        WEB_CONCURRENCY=str(workers),
+        BIND=f"127.0.0.1:{port}",
+        DATABASE_URL=f"sqlite+aiosqlite:///{db_path}",
+        LOG_LEVEL="warning",
+        ACCESS_LOG="",
+    )
+    # Create the schema up front: workers racing to create it on a fresh
+    # SQLite file can fail to boot
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import asyncio; from app.utilities.db import init_models; "
+            "asyncio.run(init_models())",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                urllib.request.urlopen(f"{base}/predictions/health", timeout=5).read()
+                break
+            except OSError:
+                if time.monotonic() > deadline or master.poll() is not None:
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.5)
+        # Enough requests to reach every worker several times
+        for i in range(workers * 20):
+            _post(f"{base}/predictions/predict", kepler_rows[i % len(kepler_rows)])
+            _post(f"{base}/tess/predictions/predict", tess_rows[i % len(tess_rows)])
+        time.sleep(1)
+
+        pids = _children(master.pid)
+        memory = [_memory_kb(pid) for pid in pids]
+        master_memory = _memory_kb(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=60)
+
+    mode = "preload" if preload else "per-worker load"
+    print(f"{mode}: {len(pids)} workers")
+    print(f"  {'pid':>8s} {'RSS MB':>8s} {'PSS MB':>8s} {'USS MB':>8s}")
+    for pid, m in zip(pids, memory):
+        print(
+            f"  {pid:8d} {m['rss'] / 1024:8.1f} {m['pss'] / 1024:8.1f} "
+            f"{m['uss'] / 1024:8.1f}"
+        )
+    total_pss = sum(m["pss"] for m in memory) + master_memory["pss"]
+    mean_uss = sum(m["uss"] for m in memory) / len(memory)
+    print(
+        f"  mean worker USS {mean_uss / 1024:.1f} MB, "
+        f"total PSS (master + workers) {total_pss / 1024:.1f} MB"
+    )
+
+
+def main(workers: int) -> None:
+    kepler_rows = _rows("kepler_exoplanets.csv", list(PredictionRequest.model_fields))
+    tess_rows = _rows(
+        "TESS exoplanet data.csv", list(TessPredictionRequest.model_fields)
+    )
+    for preload in (False, True):
+        measure(preload, workers, kepler_rows, tess_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.workers)
@@ -1,7 +1,10 @@
+import gc
 import json
 import logging
 import multiprocessing
 import os
+import shutil
+from typing import Any
 
 from app.utilities.logger import ColoredFormatter, _level_from_string
 
@@ -81,6 +84,11 @@ use_errorlog = errorlog_var or None
 graceful_timeout_str = os.getenv("GRACEFUL_TIMEOUT", "60")
 timeout_str = os.getenv("TIMEOUT", "60")
 keepalive_str = os.getenv("KEEP_ALIVE", "5")
+# Prometheus multiprocess mode: each worker writes its metrics to files in
+# this directory and /metrics aggregates them
+prometheus_multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+# Load the models once in the master so forked workers share their memory
+preload_models = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
 
 # Gunicorn config variables
 worker_class = "uvicorn.workers.UvicornWorker"
@@ -93,6 +101,47 @@ accesslog = use_accesslog
 graceful_timeout = int(graceful_timeout_str)
 timeout = int(timeout_str)
 keepalive = int(keepalive_str)
+preload_app = preload_models
+
+if preload_models:
+    # Collections in the master would leave freed holes in the pages the
+    # workers are about to share; workers re-enable GC after the fork
+    gc.disable()
+
+
+def on_starting(server: Any) -> None:
+    """Start from an empty metrics directory; old files would add stale counts"""
+    if not prometheus_multiproc_dir:
+        return
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir)
+
+
+def when_ready(server: Any) -> None:
+    """Load the models in the master, right before the first workers fork"""
+    if not preload_models:
+        return
+    from app.main import load_models
+
+    load_models()
+    # Keep the collector in the workers off the master's objects, so it
+    # never writes to (and un-shares) their pages
+    gc.freeze()
+    server.log.info(f"Models preloaded; {gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    if preload_models:
+        gc.enable()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """Drop the in-flight gauge of a worker that exited"""
+    if prometheus_multiproc_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
+
 
 # For debugging and testing
 log_data = {
@@ -102,6 +151,7 @@ log_data = {
     "graceful_timeout": graceful_timeout,
     "timeout": timeout,
     "keepalive": keepalive,
+    "preload_app": preload_app,
     "errorlog": errorlog,
     "accesslog": accesslog,
     # Additional, non-gunicorn variables
@@ -109,6 +159,7 @@ log_data = {
     "use_max_workers": use_max_workers,
     "host": host,
     "port": port,
+    "prometheus_multiproc_dir": prometheus_multiproc_dir,
 }
 
 print(json.dumps(log_data))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from app.services.prediction.cascade import (
+    FLAGGED_PROBABILITY,
+    KEPLER_FLAG_COLUMNS,
+    FlagRules,
+    ModelCascade,
+)
+
+COLUMNS = ("koi_period",) + KEPLER_FLAG_COLUMNS
+
+
+def _rows(*flags: int) -> npt.NDArray[np.float32]:
+    """One row per entry: no flag (-1) or the index of the flag set"""
+    matrix = np.zeros((len(flags), len(COLUMNS)), dtype=np.float32)
+    matrix[:, 0] = 10.0
+    for row, flag in enumerate(flags):
+        if flag >= 0:
+            matrix[row, 1 + flag] = 1.0
+    return matrix
+
+
+def test_flagged_rows_are_answered_by_the_rules() -> None:
+    escalated: List[int] = []
+
+    async def model(matrix: npt.NDArray[np.float32]) -> List[float]:
+        escalated.append(len(matrix))
+        return [0.9] * len(matrix)
+
+    cascade = ModelCascade("test", FlagRules(COLUMNS), "model", margin=0.4)
+    probabilities, stages = asyncio.run(cascade.run(_rows(0, -1, 3, -1), model))
+
+    assert stages == ["rules", "model", "rules", "model"]
+    assert probabilities == pytest.approx(
+        [FLAGGED_PROBABILITY, 0.9, FLAGGED_PROBABILITY, 0.9]
+    )
+    # The uncertain rows reach the model together, once
+    assert escalated == [2]
+
+    stats = cascade.stats()
+    assert stats["stages"]["rules"]["hit_rate"] == 0.5
+    assert stats["stages"]["model"]["answered"] == 2
+    assert stats["requests_total"] == 1
+
+
+def test_nothing_is_escalated_when_the_rules_settle_every_row() -> None:
+    async def model(matrix: npt.NDArray[np.float32]) -> List[float]:
+        raise AssertionError("escalated")
+
+    cascade = ModelCascade("test", FlagRules(COLUMNS), "model", margin=0.4)
+    _, stages = asyncio.run(cascade.run(_rows(1, 2), model))
+
+    assert stages == ["rules", "rules"]
+    assert cascade.stats()["stages"]["model"]["p99_ms"] == 0.0
+
+
+def test_margin_must_fit_the_threshold() -> None:
+    with pytest.raises(ValueError):
+        ModelCascade("test", FlagRules(COLUMNS), "model", margin=0.6)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, List
+
+from app.utilities.csv_stream import (
+    iter_line_chunks,
+    iter_lines,
+    read_header,
+)
+
+
+async def _byte_stream(body: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _collect(body: bytes, size: int, chunk_rows: int) -> List[List[str]]:
+    lines = iter_lines(_byte_stream(body, size))
+    header = await read_header(lines)
+    assert header == "a,b"
+    return [chunk async for chunk in iter_line_chunks(lines, chunk_rows)]
+
+
+def test_lines_survive_arbitrary_byte_boundaries() -> None:
+    body = "﻿# preamble\n\na,b\r\n1,2\n3,4\n\n5,6".encode("utf-8")
+    for size in (1, 2, 3, 7, len(body)):
+        chunks = asyncio.run(_collect(body, size, chunk_rows=2))
+        assert chunks == [["1,2", "3,4"], ["5,6"]]
+
+
+def test_multibyte_characters_split_across_chunks() -> None:
+    body = "a,b\nÅ,é\n".encode("utf-8")
+    chunks = asyncio.run(_collect(body, 1, chunk_rows=10))
+    assert chunks == [["Å,é"]]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import h5py
+import numpy as np
+import pytest
+
+from app.services.prediction.dense import DenseNetwork
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "models"
+
+
+def _write_h5(
+    path: Path, layers: List[Dict[str, Any]], weights: Dict[str, Any]
+) -> None:
+    """A legacy Keras HDF5 model file with the given layers and weights"""
+    config = {"class_name": "Sequential", "config": {"layers": layers}}
+    with h5py.File(path, "w") as f:
+        f.attrs["model_config"] = json.dumps(config)
+        group = f.create_group("model_weights")
+        for name, arrays in weights.items():
+            layer = group.create_group(name)
+            names = [f"sequential/{name}/{kind}" for kind in arrays]
+            layer.attrs["weight_names"] = [n.encode() for n in names]
+            for full_name, array in zip(names, arrays.values()):
+                layer.create_dataset(full_name, data=array)
+
+
+def test_shipped_keras_and_h5_files_give_the_same_network() -> None:
+    keras_net = DenseNetwork.load(str(MODEL_DIR / "kepler_ann.keras"))
+    h5_net = DenseNetwork.load(str(MODEL_DIR / "kepler_ann.h5"))
+    X = np.random.default_rng(0).standard_normal((32, 20)).astype(np.float32)
+
+    assert [layer.activation for layer in keras_net.layers] == [
+        "relu",
+        "relu",
+        "sigmoid",
+    ]
+    np.testing.assert_array_equal(keras_net.forward(X), h5_net.forward(X))
+
+    proba = keras_net.predict_proba(X)
+    assert proba.shape == (32, 2)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+
+
+def test_forward_pass_matches_the_layer_maths(tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    kernel1 = rng.standard_normal((4, 3)).astype(np.float32)
+    bias1 = rng.standard_normal(3).astype(np.float32)
+    kernel2 = rng.standard_normal((3, 2)).astype(np.float32)
+    layers = [
+        {"class_name": "InputLayer", "config": {"name": "input"}},
+        {"class_name": "Dense", "config": {"name": "d1", "activation": "tanh"}},
+        {"class_name": "Dropout", "config": {"name": "drop", "rate": 0.5}},
+        {
+            "class_name": "Dense",
+            "config": {"name": "d2", "activation": "linear", "use_bias": False},
+        },
+        {"class_name": "Activation", "config": {"name": "a", "activation": "softmax"}},
+    ]
+    path = tmp_path / "model.h5"
+    _write_h5(
+        path,
+        layers,
+        {"d1": {"kernel:0": kernel1, "bias:0": bias1}, "d2": {"kernel:0": kernel2}},
+    )
+
+    X = rng.standard_normal((5, 4)).astype(np.float32)
+    logits = np.tanh(X @ kernel1 + bias1) @ kernel2
+    expected = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(
+        DenseNetwork.load(str(path)).predict_proba(X), expected, rtol=1e-5
+    )
+
+
+def test_unsupported_layers_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "model.h5"
+    _write_h5(path, [{"class_name": "Conv1D", "config": {"name": "conv"}}], {})
+    with pytest.raises(ValueError, match="Conv1D"):
+        DenseNetwork.load(str(path))
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, List
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from app.services.prediction.ensemble import (
+    EnsembleUnavailableError,
+    ModelEnsemble,
+    parse_weights,
+)
+
+COLUMNS = ("a", "b", "c")
+
+
+def _ensemble(weights: Dict[str, float], budget_ms: float = 1000) -> ModelEnsemble:
+    return ModelEnsemble(
+        "test",
+        COLUMNS,
+        {"first": ("a",), "second": ("c", "b"), "slow": ("a",), "broken": ("b",)},
+        weights,
+        budget_ms=budget_ms,
+    )
+
+
+async def _score(name: str, matrix: npt.NDArray[np.float32]) -> List[float]:
+    if name == "slow":
+        await asyncio.sleep(0.5)
+    if name == "broken":
+        raise RuntimeError("model exploded")
+    # Constant per member, so the combination is easy to check
+    return [{"first": 0.2, "second": 0.8, "slow": 1.0}[name]] * len(matrix)
+
+
+def test_members_are_combined_with_their_weights() -> None:
+    ensemble = _ensemble({"first": 1.0, "second": 3.0})
+    result = asyncio.run(ensemble.run(_score, np.zeros((2, 3), dtype=np.float32)))
+
+    assert result.probabilities == pytest.approx([0.65, 0.65])
+    assert [member.status for member in result.members] == ["ok", "ok"]
+    assert result.member_probabilities == {"first": [0.2, 0.2], "second": [0.8, 0.8]}
+
+
+def test_member_input_selects_its_columns_in_order() -> None:
+    ensemble = _ensemble({"first": 1.0, "second": 1.0})
+    matrix = np.array([[1, 2, 3], [4, 5, 6]], dtype=np.float32)
+
+    np.testing.assert_array_equal(
+        ensemble.member_input("second", matrix), [[3, 2], [6, 5]]
+    )
+
+
+def test_slow_and_failing_members_are_left_out() -> None:
+    ensemble = _ensemble(
+        {"first": 1.0, "second": 0.0, "slow": 5.0, "broken": 5.0}, budget_ms=50
+    )
+    start = time.perf_counter()
+    result = asyncio.run(ensemble.run(_score, np.zeros((1, 3), dtype=np.float32)))
+
+    assert time.perf_counter() - start < 0.5 + 0.2
+    # Only "first" counts: "second" runs in shadow, the others have no result
+    assert result.probabilities == pytest.approx([0.2])
+    statuses = {member.name: member.status for member in result.members}
+    assert statuses == {
+        "first": "ok",
+        "second": "ok",
+        "slow": "timeout",
+        "broken": "error",
+    }
+    assert result.members[1].probability == pytest.approx(0.8)
+    assert ensemble.stats()["members"]["slow"]["timeout"] == 1
+
+
+def test_no_weighted_result_raises() -> None:
+    ensemble = _ensemble({"first": 0.0, "broken": 1.0})
+    with pytest.raises(EnsembleUnavailableError):
+        asyncio.run(ensemble.run(_score, np.zeros((1, 3), dtype=np.float32)))
+
+
+def test_parse_weights() -> None:
+    assert parse_weights("kepler_rf=0.6, kepler_xgb=0.4,") == {
+        "kepler_rf": 0.6,
+        "kepler_xgb": 0.4,
+    }
+    with pytest.raises(ValueError):
+        parse_weights("kepler_rf")
+    with pytest.raises(ValueError):
+        _ensemble({"unknown": 1.0})
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.prediction.features import (
+    TESS_FEATURE_SPEC,
+    DerivedFeature,
+    FeatureSpec,
+)
+
+
+def _tess_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0.1, 5000.0, size=(rows, len(TESS_FEATURE_SPEC.base_columns)))
+    return pd.DataFrame(values, columns=list(TESS_FEATURE_SPEC.base_columns))
+
+
+def _pandas_reference(df: pd.DataFrame) -> np.ndarray:
+    """The per-request DataFrame transform the compiled spec replaces"""
+    df = df[list(TESS_FEATURE_SPEC.base_columns)].copy()
+    df["pl_orbper_log"] = np.log(df["pl_orbper"] + 1)
+    df["pl_trandep_log"] = np.log(df["pl_trandep"] + 1)
+    return df[list(TESS_FEATURE_SPEC.columns)].values.astype(np.float32)
+
+
+def test_tess_spec_matches_pandas_transform() -> None:
+    features = TESS_FEATURE_SPEC.compile()
+    df = _tess_frame(500)
+    rows = [SimpleNamespace(**record) for record in df.to_dict("records")]
+
+    expected = _pandas_reference(df)
+    assert np.array_equal(features.from_frame(df), expected)
+    assert np.array_equal(features.from_models(rows), expected)
+    assert np.array_equal(features.from_models(rows[:1]), expected[:1])
+
+
+def test_preallocated_buffer_is_filled_in_place() -> None:
+    features = TESS_FEATURE_SPEC.compile()
+    out = features.allocate(3)
+    result = features.from_frame(_tess_frame(3), out=out)
+
+    assert result is out
+    assert out.dtype == np.float32 and out.shape == (3, 11)
+
+
+def test_explicit_order_and_invalid_specs() -> None:
+    spec = FeatureSpec(
+        base_columns=("a", "b"),
+        derived=(DerivedFeature("a_log", "a", "log_plus_one"),),
+        order=("a_log", "b", "a"),
+    )
+    out = spec.compile().from_models([SimpleNamespace(a=np.e - 1, b=2.0)])
+    assert out.tolist() == [[pytest.approx(1.0), 2.0, pytest.approx(np.e - 1)]]
+
+    with pytest.raises(ValueError):
+        FeatureSpec(("a",), (DerivedFeature("x", "missing", "log_plus_one"),)).compile()
+    with pytest.raises(ValueError):
+        FeatureSpec(("a",), (DerivedFeature("x", "a", "sqrt"),)).compile()
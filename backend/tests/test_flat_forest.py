@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from app.services.prediction.forest import (
+    EVAL_CHUNK_ROWS,
+    FlatForest,
+    SizedForest,
+)
+
+
+def _data(n_classes: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(42)
+    X = rng.standard_normal((600, 6)) * [1, 10, 100, 1e-3, 1e4, 1]
+    y = (X[:, 0] + X[:, 1] / 10 > 0).astype(int) + (X[:, 2] > 50) * (n_classes - 2)
+    return X, y
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("estimator", [RandomForestClassifier, ExtraTreesClassifier])
+def test_matches_sklearn_predict_proba(estimator: type, n_classes: int) -> None:
+    X, y = _data(n_classes)
+    model = estimator(n_estimators=25, min_samples_leaf=2, random_state=0).fit(X, y)
+    forest = FlatForest.from_sklearn(model)
+
+    # More rows than one evaluation chunk, plus inputs far outside the training range
+    rng = np.random.default_rng(1)
+    test = np.vstack([X, rng.standard_normal((EVAL_CHUNK_ROWS, 6)) * 1e4])
+    np.testing.assert_array_equal(forest.predict_proba(test), model.predict_proba(test))
+    np.testing.assert_array_equal(forest.predict(test[:50]), model.predict(test[:50]))
+    np.testing.assert_array_equal(
+        forest.predict_proba(test[:1]), model.predict_proba(test[:1])
+    )
+
+
+def test_save_and_load_round_trip(tmp_path: Path) -> None:
+    X, y = _data(2)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    forest = FlatForest.from_sklearn(model, source_version="abc123")
+    path = str(tmp_path / "forest.flat.npz")
+
+    forest.save(path)
+    loaded = FlatForest.load(path)
+
+    assert loaded.source_version == "abc123"
+    assert loaded.max_depth == forest.max_depth
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+
+
+def test_memory_mapped_load(tmp_path: Path) -> None:
+    X, y = _data(3)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    forest = FlatForest.from_sklearn(model, source_version="abc123")
+    path = str(tmp_path / "forest.flat.npz")
+    forest.save(path)
+
+    mapped = FlatForest.load(path, memory_map=True)
+
+    for name in ("feature", "threshold", "value", "classes"):
+        array = getattr(mapped, name)
+        assert not array.flags.writeable
+        assert array.ctypes.data % 64 == 0
+        np.testing.assert_array_equal(array, getattr(forest, name))
+    assert mapped.source_version == "abc123"
+    np.testing.assert_array_equal(mapped.predict_proba(X), model.predict_proba(X))
+
+    # Saving again replaces the file rather than rewriting the mapped pages
+    FlatForest.from_sklearn(
+        RandomForestClassifier(n_estimators=2, random_state=1).fit(X, y)
+    ).save(path)
+    np.testing.assert_array_equal(mapped.predict_proba(X), model.predict_proba(X))
+
+
+def test_rejects_wrong_number_of_features() -> None:
+    X, y = _data(2)
+    forest = FlatForest.from_sklearn(
+        RandomForestClassifier(n_estimators=2, random_state=0).fit(X, y)
+    )
+    with pytest.raises(ValueError, match="Expected input of shape"):
+        forest.predict_proba(X[:, :5])
+
+
+def test_sized_forest_scores_large_batches_with_sklearn() -> None:
+    X, y = _data(2)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    loads = []
+
+    def load_sklearn() -> RandomForestClassifier:
+        loads.append(1)
+        return model
+
+    forest = SizedForest(FlatForest.from_sklearn(model), load_sklearn, 100)
+    np.testing.assert_array_equal(
+        forest.predict_proba(X[:99]), model.predict_proba(X[:99])
+    )
+    assert loads == []
+
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+    assert loads == [1]
+
+    flat_only = SizedForest(FlatForest.from_sklearn(model), load_sklearn, 0)
+    np.testing.assert_array_equal(flat_only.predict_proba(X), model.predict_proba(X))
+    assert loads == [1]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict
+
+from fastapi import Request, Response
+
+from app.utilities.http_cache import conditional_response, make_etag
+
+MODIFIED = datetime(2025, 10, 4, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def _request(headers: Dict[str, str]) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_fresh_request_gets_validators_on_the_response() -> None:
+    etag = make_etag("id", 1, 0.9)
+    response = Response()
+
+    assert conditional_response(_request({}), response, etag, MODIFIED) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["last-modified"] == "Sat, 04 Oct 2025 12:30:15 GMT"
+
+
+def test_matching_validators_return_304() -> None:
+    etag = make_etag("id", 1, 0.9)
+    cases = [
+        {"If-None-Match": etag},
+        {"If-None-Match": f'"other", W/{etag}'},
+        {"If-None-Match": "*"},
+        {"If-Modified-Since": "Sat, 04 Oct 2025 12:30:15 GMT"},
+    ]
+    for headers in cases:
+        result = conditional_response(_request(headers), Response(), etag, MODIFIED)
+        assert result is not None and result.status_code == 304, headers
+        assert result.headers["etag"] == etag
+
+
+def test_stale_validators_return_none() -> None:
+    etag = make_etag("id", 1, 0.9)
+    cases = [
+        {"If-None-Match": make_etag("id", 0, 0.9)},
+        {"If-Modified-Since": "Fri, 03 Oct 2025 00:00:00 GMT"},
+        {"If-Modified-Since": "not a date"},
+        # If-None-Match takes precedence over If-Modified-Since
+        {
+            "If-None-Match": '"other"',
+            "If-Modified-Since": "Sat, 04 Oct 2025 13:00:00 GMT",
+        },
+    ]
+    for headers in cases:
+        assert (
+            conditional_response(_request(headers), Response(), etag, MODIFIED) is None
+        )
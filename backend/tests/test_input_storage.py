@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from app.models import TessPredictionRequest
+from app.services.prediction.inputs import (
+    CURRENT_SCHEMAS,
+    INPUT_SCHEMAS,
+    InputSchema,
+    decode_inputs,
+    input_rows,
+)
+
+PAYLOADS = [
+    TessPredictionRequest(
+        pl_orbper=2.17 + i,
+        pl_trandurh=2.0,
+        pl_trandep=656.9 * i,
+        pl_rade=5.8,
+        pl_insol=22601.9,
+        pl_eqt=3127.2,
+        st_teff=9727.0,
+        st_logg=4.1,
+        st_rad=2.3,
+    )
+    for i in range(3)
+]
+SCHEMA = CURRENT_SCHEMAS["tess"]
+EXPECTED = np.array([[getattr(p, c) for c in SCHEMA.columns] for p in PAYLOADS])
+
+
+def test_new_inputs_are_packed_and_decode_exactly() -> None:
+    _, rows = input_rows("tess", PAYLOADS)
+    assert all(row["input_data"] is None for row in rows)
+    assert all(len(row["features"]) == SCHEMA.row_bytes for row in rows)
+
+    stored = [(row["schema_id"], row["features"], None) for row in rows]
+    np.testing.assert_array_equal(decode_inputs(SCHEMA, stored), EXPECTED)
+
+
+def test_legacy_json_and_missing_rows_decode_alongside_packed_rows() -> None:
+    stored = [
+        (SCHEMA.schema_id, SCHEMA.pack(PAYLOADS[0]), None),
+        (None, None, json.dumps(PAYLOADS[1].model_dump())),
+        (None, None, None),
+    ]
+    matrix = decode_inputs(SCHEMA, stored)
+
+    np.testing.assert_array_equal(matrix[:2], EXPECTED[:2])
+    assert np.isnan(matrix[2]).all()
+
+
+def test_rows_packed_with_an_older_layout_are_mapped_by_name() -> None:
+    old = InputSchema(99, "tess", tuple(reversed(SCHEMA.columns[:-1])))
+    stored = [(old.schema_id, old.pack(PAYLOADS[2]), None)]
+
+    INPUT_SCHEMAS[old.schema_id] = old
+    try:
+        matrix = decode_inputs(SCHEMA, stored)
+    finally:
+        del INPUT_SCHEMAS[old.schema_id]
+
+    np.testing.assert_array_equal(matrix[0, :-1], EXPECTED[2, :-1])
+    assert np.isnan(matrix[0, -1])
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+
+from app.utilities import metrics
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+WORKER_SCRIPT = """
+import sys
+from app.utilities import metrics
+with metrics.stage_timer("kepler", "inference"):
+    pass
+metrics.IN_FLIGHT.labels("POST").inc(int(sys.argv[1]))
+print(__import__("os").getpid())
+"""
+
+COLLECT_SCRIPT = """
+import sys
+from prometheus_client import multiprocess
+from app.utilities import metrics
+for pid in sys.argv[1:]:
+    multiprocess.mark_process_dead(int(pid))
+print(metrics.render()[0].decode())
+"""
+
+
+class Body(BaseModel):
+    value: float
+
+
+def _sample(name: str, labels: Dict[str, str]) -> float:
+    value: Optional[float] = REGISTRY.get_sample_value(name, labels)
+    return value or 0.0
+
+
+def test_timed_route_splits_the_request_into_stages() -> None:
+    router = APIRouter(route_class=metrics.TimedRoute)
+
+    @router.post("/score")
+    async def score(body: Body) -> Dict[str, float]:
+        with metrics.stage_timer("test", "inference"):
+            return {"value": body.value * 2}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.middleware("http")
+    async def observe(
+        request: Request, call_next: Callable[[Request], Any]
+    ) -> Response:
+        timings = metrics.start_request()
+        response: Response = await call_next(request)
+        metrics.observe_request(request, timings, response.status_code)
+        return response
+
+    labels = {"method": "POST", "route": "/score", "status": "200"}
+    before = _sample("exovision_request_duration_seconds_count", labels)
+    with TestClient(app) as client:
+        assert client.post("/score", json={"value": 2}).json() == {"value": 4}
+
+    assert _sample("exovision_request_duration_seconds_count", labels) == before + 1
+    for stage in ("validation", "inference", "serialization"):
+        count = _sample(
+            "exovision_stage_duration_seconds_count",
+            {"mission": "test", "stage": stage},
+        )
+        assert count == 1, stage
+
+
+def test_multiprocess_metrics_aggregate_across_workers(tmp_path: Path) -> None:
+    env = {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PATH": ""}
+
+    def run(script: str, *args: str) -> str:
+        result = subprocess.run(
+            [sys.executable, "-c", script, *args],
+            capture_output=True,
+            text=True,
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+        )
+        return result.stdout
+
+    pids = [run(WORKER_SCRIPT, str(n)).strip() for n in (1, 2, 3)]
+
+    # The first worker exited; its in-flight requests no longer count
+    exposition = run(COLLECT_SCRIPT, pids[0])
+    assert (
+        'exovision_stage_duration_seconds_count{mission="kepler",stage="inference"} 3.0'
+        in exposition
+    )
+    assert 'exovision_requests_in_flight{method="POST"} 5.0' in exposition
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.prediction.batching import MicroBatcher
+
+
+async def _row_sums(matrix: npt.NDArray[np.float32]) -> List[float]:
+    return [float(value) for value in matrix.sum(axis=1)]
+
+
+async def _submit_all(batcher: MicroBatcher[float], count: int) -> List[float]:
+    rows = [np.full(3, i, dtype=np.float32) for i in range(count)]
+    return list(await asyncio.gather(*[batcher.submit(row) for row in rows]))
+
+
+def test_concurrent_rows_share_one_call_and_keep_their_results() -> None:
+    batcher = MicroBatcher("test", _row_sums, window_ms=50, max_batch_size=64)
+    results = asyncio.run(_submit_all(batcher, 10))
+
+    assert results == [3.0 * i for i in range(10)]
+    assert batcher.batches_total == 1
+    assert batcher.stats()["last_batch_size"] == 10
+    assert batcher.queue_depth == 0
+
+
+def test_max_batch_size_flushes_before_the_window() -> None:
+    batcher = MicroBatcher("test", _row_sums, window_ms=10_000, max_batch_size=4)
+    results = asyncio.run(asyncio.wait_for(_submit_all(batcher, 8), timeout=5))
+
+    assert results == [3.0 * i for i in range(8)]
+    assert batcher.batches_total == 2
+
+
+def test_inference_errors_reach_every_caller() -> None:
+    async def fail(matrix: npt.NDArray[np.float32]) -> List[float]:
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher("test", fail, window_ms=1, max_batch_size=8)
+    with pytest.raises(RuntimeError, match="model exploded"):
+        asyncio.run(_submit_all(batcher, 3))
+
+
+def test_config_and_queue_depth_are_exported() -> None:
+    def gauge(name: str) -> float | None:
+        value: float | None = REGISTRY.get_sample_value(name, {"batcher": "gauges"})
+        return value
+
+    async def run() -> None:
+        batcher = MicroBatcher("gauges", _row_sums, window_ms=20, max_batch_size=8)
+        assert gauge("exovision_batcher_window_seconds") == 0.02
+        assert gauge("exovision_batcher_max_batch_rows") == 8
+
+        pending = [
+            asyncio.create_task(batcher.submit(np.ones(3, dtype=np.float32)))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        assert gauge("exovision_batcher_queue_depth") == 3
+        await asyncio.gather(*pending)
+        assert gauge("exovision_batcher_queue_depth") == 0
+
+    asyncio.run(run())
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.services.prediction.registry import ModelRegistry
+
+
+def _registry(tmp_path: Path, loads: List[str]) -> ModelRegistry:
+    def loader(path: str, version: str) -> str:
+        loads.append(version)
+        return Path(path).read_text()
+
+    # Any positive interval: every get() after the first checks for changes
+    registry = ModelRegistry(str(tmp_path), check_interval_seconds=1e-9)
+    registry.register("demo", "demo.txt", loader)
+    return registry
+
+
+def _publish(tmp_path: Path, file: str, version: str, sha256: str = "") -> None:
+    content = (tmp_path / file).read_bytes()
+    spec = {
+        "path": file,
+        "version": version,
+        "sha256": sha256 or hashlib.sha256(content).hexdigest(),
+    }
+    (tmp_path / "manifest.json").write_text(json.dumps({"models": {"demo": spec}}))
+
+
+def test_loads_default_file_once(tmp_path: Path) -> None:
+    (tmp_path / "demo.txt").write_text("v0")
+    loads: List[str] = []
+    registry = _registry(tmp_path, loads)
+
+    assert registry.active("demo") is None
+    first = registry.get("demo")
+    assert first.model == "v0"
+    assert first.version == "unversioned"
+    assert first.tag == hashlib.sha256(b"v0").hexdigest()[:16]
+    assert registry.get("demo") is first
+    assert registry.current("demo") is first
+    assert len(loads) == 1
+    assert [info.name for info in registry.info()] == ["demo"]
+
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_switches_to_published_version(tmp_path: Path) -> None:
+    (tmp_path / "demo.txt").write_text("v0")
+    registry = _registry(tmp_path, [])
+    old = registry.get("demo")
+
+    (tmp_path / "demo_v1.txt").write_text("v1")
+    _publish(tmp_path, "demo_v1.txt", "1.0")
+    new = registry.get("demo")
+
+    assert new.model == "v1" and new.version == "1.0"
+    assert new.entry.path == str(tmp_path / "demo_v1.txt")
+    # Holders of the previous version keep a complete, unchanged model
+    assert old.model == "v0" and old.version == "unversioned"
+    assert registry.get("demo") is new
+
+
+def test_rejected_version_keeps_active_one(tmp_path: Path) -> None:
+    (tmp_path / "demo.txt").write_text("v0")
+    loads: List[str] = []
+    registry = _registry(tmp_path, loads)
+    old = registry.get("demo")
+
+    (tmp_path / "demo_v1.txt").write_text("v1")
+    _publish(tmp_path, "demo_v1.txt", "1.0", sha256="0" * 64)
+
+    with pytest.raises(ValueError, match="checksum"):
+        registry.load("demo")
+    assert registry.get("demo") is old
+    # The failed version is not retried until the manifest or file changes
+    assert registry.get("demo") is old
+    assert len(loads) == 1
+
+    _publish(tmp_path, "demo_v1.txt", "1.1")
+    assert registry.get("demo").model == "v1"
+
+
+def test_replaced_file_is_reloaded(tmp_path: Path) -> None:
+    (tmp_path / "demo.txt").write_text("v0")
+    registry = _registry(tmp_path, [])
+    registry.get("demo")
+
+    replacement = tmp_path / "demo.txt.new"
+    replacement.write_text("v0 retrained")
+    replacement.replace(tmp_path / "demo.txt")
+
+    assert registry.get("demo").model == "v0 retrained"
+
+
+def test_resolve_loads_off_the_event_loop(tmp_path: Path) -> None:
+    (tmp_path / "demo.txt").write_text("v0")
+    threads: List[threading.Thread] = []
+    registry = ModelRegistry(str(tmp_path))
+    registry.register(
+        "demo",
+        "demo.txt",
+        lambda path, version: threads.append(threading.current_thread()),
+    )
+
+    async def resolve_twice() -> None:
+        first = await registry.resolve("demo")
+        assert await registry.resolve("demo") is first
+
+    asyncio.run(resolve_twice())
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
+
+
+def test_concurrent_first_loads_load_once(tmp_path: Path) -> None:
+    (tmp_path / "demo.txt").write_text("v0")
+    started = threading.Event()
+    release = threading.Event()
+    loads: List[str] = []
+
+    def slow_loader(path: str, version: str) -> str:
+        loads.append(version)
+        started.set()
+        release.wait(5)
+        return "v0"
+
+    registry = ModelRegistry(str(tmp_path))
+    registry.register("demo", "demo.txt", slow_loader)
+
+    async def resolve_together() -> None:
+        tasks = [asyncio.create_task(registry.resolve("demo")) for _ in range(4)]
+        await asyncio.to_thread(started.wait, 5)
+        # Let the other resolves reach the lock before the first load ends
+        await asyncio.sleep(0.1)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert all(loaded is results[0] for loaded in results)
+
+    asyncio.run(resolve_together())
+    assert len(loads) == 1
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from xgboost import XGBClassifier
+
+from app.services.prediction.booster import NativeBooster
+
+
+def _data(n_classes: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(42)
+    X = rng.standard_normal((600, 5)) * [1, 10, 100, 1e-3, 1e4]
+    y = (X[:, 0] + X[:, 1] / 10 > 0).astype(int) + (X[:, 2] > 50) * (n_classes - 2)
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "n_classes,objective",
+    [(2, "binary:logistic"), (3, "multi:softprob"), (3, "multi:softmax")],
+)
+def test_matches_sklearn_predict_proba(n_classes: int, objective: str) -> None:
+    X, y = _data(n_classes)
+    model = XGBClassifier(
+        n_estimators=20, max_depth=3, objective=objective, n_jobs=1
+    ).fit(X, y)
+    booster = NativeBooster.from_sklearn(model)
+
+    # Missing values take the default branch, as in the wrapper
+    test = np.vstack([X, np.full((1, 5), np.nan)])
+    np.testing.assert_allclose(
+        booster.predict_proba(test), model.predict_proba(test), rtol=1e-6
+    )
+    np.testing.assert_array_equal(booster.classes_, model.classes_)
+
+
+def test_early_stopping_uses_best_iteration() -> None:
+    X, y = _data(3)
+    model = XGBClassifier(
+        n_estimators=200, max_depth=3, early_stopping_rounds=3, n_jobs=1
+    ).fit(X[:400], y[:400], eval_set=[(X[400:], y[400:])], verbose=False)
+    assert model.best_iteration < 199
+
+    booster = NativeBooster.from_sklearn(model)
+    np.testing.assert_array_equal(booster.predict_proba(X), model.predict_proba(X))
+
+
+def test_save_load_round_trip(tmp_path: Path) -> None:
+    X, y = _data(3)
+    model = XGBClassifier(n_estimators=10, max_depth=3, n_jobs=1).fit(X, y)
+    path = str(tmp_path / "model.ubj")
+    NativeBooster.from_sklearn(model).save(path, source_version="abc123")
+
+    loaded = NativeBooster.load(path, n_threads=2)
+    assert loaded.source_version == "abc123"
+    assert loaded.n_threads == 2
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
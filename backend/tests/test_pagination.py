@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from app.utilities.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips() -> None:
+    created_at = datetime(2025, 10, 4, 12, 30, 15, 250000)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_malformed_cursor_raises_value_error() -> None:
+    for cursor in ["zzz", encode_cursor(datetime(2025, 1, 1), 1)[:-3], "!!"]:
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            decode_cursor(cursor)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from app.services.prediction.cache import PredictionCache
+
+
+def test_concurrent_identical_requests_share_one_inference() -> None:
+    calls: List[int] = []
+
+    async def infer() -> float:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 0.9
+
+    async def run() -> List[float]:
+        cache: PredictionCache[float] = PredictionCache("test")
+        key = cache.key(np.ones(4, dtype=np.float32), "v1")
+        results = await asyncio.gather(
+            *[cache.get_or_compute(key, infer) for _ in range(5)]
+        )
+        assert cache.stats()["coalesced"] == 4
+        # Served from the cache once the first inference completed
+        results.append(await cache.get_or_compute(key, infer))
+        assert cache.hits == 1
+        return list(results)
+
+    assert asyncio.run(run()) == [0.9] * 6
+    assert len(calls) == 1
+
+
+def test_key_depends_on_values_and_model_version() -> None:
+    row = np.array([0.0, 1.5], dtype=np.float32)
+    key = PredictionCache.key(row, "v1")
+
+    assert PredictionCache.key(np.array([-0.0, 1.5]), "v1") == key
+    assert PredictionCache.key(row, "v2") != key
+    assert PredictionCache.key(np.array([0.0, 1.25]), "v1") != key
+
+
+def test_lru_eviction_ttl_and_invalidation() -> None:
+    cache: PredictionCache[int] = PredictionCache("test", max_entries=2)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    assert cache.lookup("a") == 1
+    cache.store("c", 3)
+
+    # "b" was least recently used
+    assert cache.lookup("b") is None
+    assert cache.evictions == 1
+
+    cache.invalidate()
+    assert cache.lookup("a") is None and cache.stats()["entries"] == 0
+
+    expired: PredictionCache[int] = PredictionCache("test", ttl_seconds=-1)
+    expired.store("a", 1)
+    assert expired.lookup("a") is None
+    assert expired.expirations == 1
+
+
+def test_failures_are_not_cached() -> None:
+    async def fail() -> int:
+        raise RuntimeError("model exploded")
+
+    cache: PredictionCache[int] = PredictionCache("test")
+    with pytest.raises(RuntimeError, match="model exploded"):
+        asyncio.run(cache.get_or_compute("k", fail))
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, col
+
+from app.config import settings
+from app.models import PredictionStats, TessPredictionRecord
+from app.services.prediction.summary import (
+    confidence_bucket,
+    get_stats,
+    get_total,
+    rebuild_summary,
+    summary_deltas,
+    update_summary,
+)
+
+TABLE = TessPredictionRecord.__table__  # type: ignore[attr-defined]
+
+
+def test_summary_deltas_count_all_users_and_each_user() -> None:
+    day = datetime(2025, 10, 4, 23, 59)
+    records = [
+        {"user_id": 7, "prediction": 1, "confidence": 0.95, "created_at": day},
+        {"user_id": 7, "prediction": 0, "confidence": 0.3, "created_at": day},
+        {"user_id": None, "prediction": 1, "confidence": 1.0, "created_at": day},
+    ]
+    rows = {
+        (row["scope"], row["dimension"], row["key"]): row["count"]
+        for row in summary_deltas("kepler", records, sign=-1)
+    }
+    assert rows == {
+        (0, "total", ""): -3,
+        (0, "class", "1"): -2,
+        (0, "class", "0"): -1,
+        (0, "confidence", "0.9"): -2,
+        (0, "confidence", "0.3"): -1,
+        (0, "day", "2025-10-04"): -3,
+        (7, "total", ""): -2,
+        (7, "class", "1"): -1,
+        (7, "class", "0"): -1,
+        (7, "confidence", "0.9"): -1,
+        (7, "confidence", "0.3"): -1,
+        (7, "day", "2025-10-04"): -2,
+    }
+
+
+def test_confidence_buckets_are_closed_at_the_lower_bound() -> None:
+    assert [confidence_bucket(c) for c in (0.0, 0.1, 0.3, 0.7, 0.99, 1.0)] == [
+        "0.0",
+        "0.1",
+        "0.3",
+        "0.7",
+        "0.9",
+        "0.9",
+    ]
+
+
+def test_all_users_counts_go_to_the_given_shard() -> None:
+    day = datetime(2025, 10, 4, 12, 0)
+    records = [{"user_id": 7, "prediction": 1, "confidence": 0.5, "created_at": day}]
+    rows = summary_deltas("kepler", records, shard=3)
+
+    assert {row["shard"] for row in rows if row["scope"] == 0} == {3}
+    assert {row["shard"] for row in rows if row["scope"] == 7} == {0}
+    # Sorted, so concurrent writers lock shared rows in the same order
+    keys = [(row["scope"], row["dimension"], row["key"]) for row in rows]
+    assert keys == sorted(keys)
+
+
+def test_rebuild_reproduces_the_incremental_counts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "summary_shards", 4)
+    start = datetime(2025, 10, 1, 12, 0)
+    records = [
+        TessPredictionRecord(
+            prediction_id=str(i),
+            user_id=(None, 1, 2)[i % 3],
+            prediction=("PC", "FP", "APC")[i % 4 % 3],
+            confidence=(i % 10) / 10 + 0.05,
+            created_at=start + timedelta(hours=7 * i),
+        )
+        for i in range(60)
+    ]
+
+    async def stats(db: AsyncSession) -> list[tuple[int, PredictionStats]]:
+        return [
+            (
+                await get_total(db, "tess", user_id),
+                await get_stats(db, "tess", user_id, ["PC", "FP", "APC"], start.date()),
+            )
+            for user_id in (None, 1, 2)
+        ]
+
+    async def run() -> None:
+        db_path = tmp_path / "db.sqlite"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        factory = async_sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+
+        # Written in small batches, as requests do, then partly purged
+        async with factory() as db:
+            for i in range(0, len(records), 7):
+                batch = records[i : i + 7]
+                db.add_all(batch)
+                await update_summary(db, "tess", batch)
+                await db.commit()
+            purged = [record for record in records if record.user_id == 2][:8]
+            await db.execute(
+                delete(TessPredictionRecord).where(
+                    col(TessPredictionRecord.id).in_([r.id for r in purged])
+                )
+            )
+            await update_summary(db, "tess", purged, sign=-1)
+            await db.commit()
+            incremental = await stats(db)
+
+        # As python -m app.cli.rebuild_summary does, on a sync engine
+        sync_engine = create_engine(f"sqlite:///{db_path}")
+        with sync_engine.begin() as conn:
+            rebuild_summary(conn, "tess", TABLE)
+        sync_engine.dispose()
+        async with factory() as db:
+            rebuilt = await stats(db)
+        await engine.dispose()
+
+        assert [total for total, _ in incremental] == [52, 20, 12]
+        assert rebuilt == incremental
+
+    asyncio.run(run())
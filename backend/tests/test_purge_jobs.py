@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, col
+
+from app.models import PurgeJobRecord, TessPredictionRecord
+from app.services.prediction.purge import STALE_JOB_SECONDS, PurgeManager
+
+TABLE = TessPredictionRecord.__table__  # type: ignore[attr-defined]
+
+
+def test_workers_share_purge_jobs(tmp_path: Path) -> None:
+    async def run() -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        factory = async_sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+        async with factory() as db:
+            db.add_all(
+                TessPredictionRecord(
+                    prediction_id=str(i), prediction="PC", confidence=0.9
+                )
+                for i in range(25)
+            )
+            await db.commit()
+
+        # Two managers on one database, as in two gunicorn workers
+        first, second = PurgeManager(chunk_rows=10), PurgeManager(chunk_rows=10)
+        first._session_factory = second._session_factory = factory
+
+        job = await first.start("tess", TABLE, None)
+        # Another worker sees the running job instead of starting its own
+        assert (await second.start("tess", TABLE, None)).job_id == job.job_id
+        await asyncio.gather(*first._tasks)
+
+        done = await second.get(job.job_id, "tess")
+        assert done is not None
+        assert (done.status, done.deleted, done.total) == ("completed", 25, 25)
+        assert await second.get(job.job_id, "kepler") is None
+        async with factory() as db:
+            count = await db.execute(select(func.count()).select_from(TABLE))
+            assert count.scalar_one() == 0
+
+        # A job whose worker died stops blocking its scope once it goes stale
+        orphan = await first.start("tess", TABLE, 7)
+        for task in first._tasks:
+            task.cancel()
+        await asyncio.gather(*first._tasks, return_exceptions=True)
+        async with factory() as db:
+            await db.execute(
+                update(PurgeJobRecord)
+                .where(col(PurgeJobRecord.job_id) == orphan.job_id)
+                .values(
+                    status="running",
+                    updated_at=datetime.now()
+                    - timedelta(seconds=STALE_JOB_SECONDS + 1),
+                )
+            )
+            await db.commit()
+        restarted = await second.start("tess", TABLE, 7)
+        assert restarted.job_id != orphan.job_id
+        stale = await second.get(orphan.job_id, "tess")
+        assert stale is not None and stale.status == "failed"
+        await asyncio.gather(*second._tasks)
+        await engine.dispose()
+
+    asyncio.run(run())
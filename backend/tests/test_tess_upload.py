@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterator, List
+
+import numpy as np
+
+from app.services.prediction.tess import tess_prediction_service
+
+
+def _line(values: List[str]) -> str:
+    return ",".join(["7", *values])
+
+
+def test_invalid_numbers_are_row_errors() -> None:
+    columns = tess_prediction_service.feature_columns
+    header = ",".join(["toi", *columns])
+    good = [str(i + 1.5) for i in range(len(columns))]
+    bad = list(good)
+    bad[0] = "abc"
+    bad[2] = "1.2.3"
+    missing = list(good)
+    missing[1] = ""
+
+    df, errors, row_lines = tess_prediction_service._parse_chunk(
+        header, [_line(good), _line(bad), _line(missing)], ["toi"]
+    )
+
+    assert errors == ["", f"Invalid number in {columns[0]}, {columns[2]}", ""]
+    assert df[columns].dtypes.map(lambda dtype: dtype.kind == "f").all()
+    assert np.isnan(df[columns[0]][1]) and np.isnan(df[columns[1]][2])
+    assert df["toi"].tolist() == ["7", "7", "7"]
+    assert row_lines == [0, 1, 2]
+
+
+def test_rows_are_numbered_by_data_line() -> None:
+    columns = tess_prediction_service.feature_columns
+    header = ",".join(["toi", *columns])
+    values = [str(i + 1.5) for i in range(len(columns))]
+    lines = [
+        _line(values),
+        # A quoted identifier spanning two lines is one row
+        '"7',
+        'b",' + ",".join(values),
+        # An unterminated quote: the whole second chunk cannot be parsed
+        '"7,' + ",".join(values),
+        _line(values),
+        "",
+        _line(values),
+        _line(values),
+    ]
+
+    async def stream() -> List[str]:
+        async def body() -> AsyncIterator[str]:
+            for line in lines:
+                yield line
+
+        return [
+            chunk
+            async for chunk in tess_prediction_service.stream_scores(
+                header, body(), "ndjson", chunk_rows=3
+            )
+        ]
+
+    results = [
+        json.loads(line)
+        for chunk in asyncio.run(stream())
+        for line in chunk.splitlines()
+    ]
+    assert [result["row"] for result in results] == [0, 1, 3, 6]
+    assert results[1]["toi"] == "7\nb"
+    assert results[2]["error"].startswith("Rows 3-5 could not be scored")
+    assert "prediction" in results[3]
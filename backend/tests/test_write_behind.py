@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+from sqlalchemy import MetaData, Table
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services.prediction.write_behind import PendingWrite, WriteBehindQueue
+
+TABLE = Table("predictions", MetaData())
+
+
+class FlakyQueue(WriteBehindQueue):
+    """Fails the first `failures` writes as if the connection dropped"""
+
+    def __init__(self, failures: int, bad_record: int = -1) -> None:
+        super().__init__(flush_rows=10, enabled=True, max_retries=2, retry_backoff_ms=1)
+        self.failures = failures
+        self.bad_record = bad_record
+        self.written: List[int] = []
+
+    async def _write(self, batch: List[PendingWrite]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+        ids = [write.record["id"] for write in batch]
+        if self.bad_record in ids:
+            raise IntegrityError("INSERT", {}, Exception("foreign key"))
+        self.written.extend(ids)
+
+
+def _run(queue: FlakyQueue, records: int) -> None:
+    async def run() -> None:
+        for i in range(records):
+            await queue.enqueue(PendingWrite("tess", TABLE, {"id": i}))
+        assert await queue.flush(timeout=5)
+        await queue.drain()
+
+    asyncio.run(run())
+
+
+def test_transient_failures_are_retried() -> None:
+    queue = FlakyQueue(failures=2)
+    _run(queue, 5)
+    assert sorted(queue.written) == [0, 1, 2, 3, 4]
+    assert (queue.rows_failed, queue.flush_retries) == (0, 2)
+
+
+def test_batch_is_dropped_after_the_retries() -> None:
+    queue = FlakyQueue(failures=3)
+    _run(queue, 5)
+    assert queue.written == []
+    assert (queue.rows_failed, queue.flush_retries) == (5, 2)
+
+
+def test_only_the_rejected_record_is_dropped() -> None:
+    queue = FlakyQueue(failures=0, bad_record=3)
+    _run(queue, 5)
+    assert sorted(queue.written) == [0, 1, 2, 4]
+    assert (queue.rows_failed, queue.flush_retries) == (1, 0)